@@ -24,6 +24,7 @@ from labstructanalyzer.models.template import Template
 from labstructanalyzer.models.template_element import TemplateElement
 from labstructanalyzer.models.report import Report
 from labstructanalyzer.models.answer import Answer
+from labstructanalyzer.models.structure_profile import StructureProfile
 target_metadata = SQLModel.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,195 @@
+"""Генератор синтетических docx документов для бенчмарков парсера.
+Размер и состав документа задаются профилем DocumentProfile: количество абзацев, таблиц и их размер,
+схема объединения ячеек, количество изображений, глубина нумерации и количество уровней заголовков.
+"""
+import io
+import random
+import zipfile
+from dataclasses import dataclass
+from typing import Literal
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture"'
+)
+NUMBERING_FORMATS = ("decimal", "lowerLetter", "lowerRoman", "upperLetter", "upperRoman", "bullet")
+MAX_NUMBERING_DEPTH = 9
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# Минимальный корректный PNG 1x1
+PNG_HEADER = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+MergePattern = Literal["none", "horizontal", "vertical", "mixed"]
+
+
+@dataclass
+class DocumentProfile:
+    """Параметры синтетического документа
+
+    Attributes:
+        paragraphs: Количество абзацев текста, включая заголовки и пункты списков
+        tables: Количество таблиц
+        table_rows: Количество строк в каждой таблице
+        table_cols: Количество столбцов в каждой таблице
+        merge_pattern: Схема объединения ячеек таблиц
+        images: Количество изображений
+        image_size: Размер данных каждого изображения в байтах
+        numbering_depth: Глубина многоуровневой нумерации, 0 - без нумерации
+        heading_levels: Количество уровней заголовков, 0 - без заголовков
+        seed: Начальное значение генератора случайных чисел
+    """
+    paragraphs: int = 200
+    tables: int = 5
+    table_rows: int = 10
+    table_cols: int = 4
+    merge_pattern: MergePattern = "mixed"
+    images: int = 5
+    image_size: int = 16 * 1024
+    numbering_depth: int = 3
+    heading_levels: int = 3
+    seed: int = 0
+
+
+def generate_docx(profile: DocumentProfile) -> bytes:
+    """Собирает docx документ по профилю
+
+    Returns:
+        Байты docx документа
+    """
+    random_generator = random.Random(profile.seed)
+    body = _build_body(profile, random_generator)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as document:
+        _write(
+            document,
+            "word/document.xml",
+            f'<?xml version="1.0" encoding="UTF-8"?><w:document {NAMESPACES}><w:body>{body}</w:body></w:document>'
+        )
+        _write(document, "word/styles.xml", _build_styles(profile.heading_levels))
+        _write(document, "word/numbering.xml", _build_numbering(profile.numbering_depth))
+        _write(document, "word/_rels/document.xml.rels", _build_relationships(profile.images))
+        for index in range(profile.images):
+            _write(document, f"word/media/image{index}.png", _build_image(profile.image_size, random_generator))
+    return buffer.getvalue()
+
+
+def _write(document: zipfile.ZipFile, file_name: str, data: str | bytes) -> None:
+    """Записывает файл в архив с фиксированной датой, чтобы документ был воспроизводим"""
+    document.writestr(zipfile.ZipInfo(file_name, date_time=ZIP_DATE_TIME), data, zipfile.ZIP_DEFLATED)
+
+
+def _build_body(profile: DocumentProfile, random_generator: random.Random) -> str:
+    """Распределяет таблицы и изображения равномерно между абзацами"""
+    blocks = [_build_paragraph(index, profile, random_generator) for index in range(profile.paragraphs)]
+    insertions = (
+            [_build_table(profile, random_generator) for _ in range(profile.tables)] +
+            [_build_image_paragraph(f"rIdImage{index}") for index in range(profile.images)]
+    )
+    step = max(1, len(blocks) // (len(insertions) + 1))
+    for offset, insertion in enumerate(insertions):
+        blocks.insert(min(len(blocks), (offset + 1) * step + offset), insertion)
+    return "".join(blocks)
+
+
+def _build_paragraph(index: int, profile: DocumentProfile, random_generator: random.Random) -> str:
+    kind = index % 4
+    if kind == 0 and profile.heading_levels:
+        style = f"Heading{random_generator.randint(1, profile.heading_levels)}"
+        return _paragraph(f"Раздел {index}", f'<w:pStyle w:val="{style}"/>')
+    if kind == 1 and profile.numbering_depth:
+        level = random_generator.randrange(profile.numbering_depth)
+        return _paragraph(
+            f"Пункт {index}", f'<w:numPr><w:ilvl w:val="{level}"/><w:numId w:val="1"/></w:numPr>'
+        )
+    if kind == 2:
+        return _paragraph(f"Ответ {index}: ________________")
+    return _paragraph(f"Текст абзаца {index} " * random_generator.randint(1, 8), line_break=index % 7 == 0)
+
+
+def _paragraph(text: str, properties: str = "", line_break: bool = False) -> str:
+    runs = f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+    if line_break:
+        runs += "<w:r><w:br/><w:t>продолжение</w:t></w:r>"
+    return f"<w:p><w:pPr>{properties}</w:pPr>{runs}</w:p>"
+
+
+def _build_table(profile: DocumentProfile, random_generator: random.Random) -> str:
+    """Собирает таблицу, объединяя ячейки по схеме профиля"""
+    rows = []
+    for row_index in range(profile.table_rows):
+        cells = []
+        col_index = 0
+        while col_index < profile.table_cols:
+            properties = ""
+            span = 1
+            can_merge_horizontally = profile.merge_pattern in ("horizontal", "mixed")
+            if can_merge_horizontally and col_index + 1 < profile.table_cols and random_generator.random() < 0.2:
+                span = 2
+                properties += '<w:gridSpan w:val="2"/>'
+            if profile.merge_pattern in ("vertical", "mixed") and col_index == 0:
+                properties += '<w:vMerge w:val="restart"/>' if row_index % 3 == 0 else "<w:vMerge/>"
+            content = _paragraph(f"Ячейка {row_index}.{col_index}")
+            cells.append(f"<w:tc><w:tcPr>{properties}</w:tcPr>{content}</w:tc>")
+            col_index += span
+        rows.append(f"<w:tr>{''.join(cells)}</w:tr>")
+    return f"<w:tbl><w:tblPr/>{''.join(rows)}</w:tbl>"
+
+
+def _build_image_paragraph(embed_id: str) -> str:
+    return (
+        "<w:p><w:r><w:drawing><wp:inline><a:graphic><a:graphicData><pic:pic>"
+        f'<pic:blipFill><a:blip r:embed="{embed_id}"/></pic:blipFill>'
+        "</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>"
+    )
+
+
+def _build_image(size: int, random_generator: random.Random) -> bytes:
+    return PNG_HEADER + random_generator.randbytes(max(0, size - len(PNG_HEADER)))
+
+
+def _build_styles(heading_levels: int) -> str:
+    headings = "".join(
+        f'<w:style w:type="paragraph" w:styleId="Heading{level}"><w:name w:val="heading {level}"/>'
+        f'<w:pPr><w:outlineLvl w:val="{level - 1}"/></w:pPr></w:style>'
+        for level in range(1, heading_levels + 1)
+    )
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?><w:styles {NAMESPACES}>'
+        '<w:style w:type="paragraph" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/></w:style>'
+        f"{headings}</w:styles>"
+    )
+
+
+def _build_numbering(depth: int) -> str:
+    levels = "".join(
+        f'<w:lvl w:ilvl="{level}"><w:start w:val="1"/>'
+        f'<w:numFmt w:val="{NUMBERING_FORMATS[level % len(NUMBERING_FORMATS)]}"/>'
+        f'<w:lvlText w:val="%{level + 1}."/></w:lvl>'
+        for level in range(min(depth, MAX_NUMBERING_DEPTH))
+    )
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?><w:numbering {NAMESPACES}>'
+        f'<w:abstractNum w:abstractNumId="0">{levels}</w:abstractNum>'
+        '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num></w:numbering>'
+    )
+
+
+def _build_relationships(images: int) -> str:
+    relationships = "".join(
+        f'<Relationship Id="rIdImage{index}" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" '
+        f'Target="media/image{index}.png"/>'
+        for index in range(images)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{relationships}'
+        "</Relationships>"
+    )
@@ -0,0 +1,168 @@
+"""Бенчмарк памяти и сериализации элементов парсера: элементы со слотами и однопроходным to_dict
+против прежних классов со словарем экземпляра и сборкой общих свойств через промежуточные словари.
+
+Запуск из папки backend: `python -m benchmarks.parser_elements [количество ячеек]`
+"""
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from labstructanalyzer.utils.parser.base_definitions import ParserElementType
+from labstructanalyzer.utils.parser.common_elements import CellElement, RowElement, TableElement, TextElement
+
+COLUMNS = 10
+CELL_TEXT = "Текст ячейки"
+
+
+class LegacyElement:
+    """Базовый класс элементов в прежнем виде: общие свойства - атрибуты класса, экземпляр хранит словарь"""
+
+    nesting_level: Optional[int] = None
+    numbering_level: Optional[int] = None
+    numbering_bullet_text: Optional[str] = None
+    is_cell_element: bool = False
+
+    _property_to_json_map = [
+        ("nestingLevel", "nesting_level"),
+        ("numberingBulletText", "numbering_bullet_text"),
+    ]
+
+    def __init__(self, element_type: ParserElementType, data) -> None:
+        self.element_type = element_type
+        self.data = data
+
+    def collect_common_fields(self) -> dict:
+        return {
+            "type": self.element_type.value,
+            **{
+                key: getattr(self, attr)
+                for key, attr in self._property_to_json_map
+                if getattr(self, attr) is not None
+            },
+        }
+
+
+@dataclass
+class LegacyText(LegacyElement):
+    data: str
+    style_id: Optional[str] = None
+    header_level: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        super().__init__(ParserElementType.TEXT, self.data)
+
+    def to_dict(self) -> dict:
+        data = {"type": self.element_type.value, "data": self.data, **self.collect_common_fields()}
+        if self.header_level:
+            data.update({"headerLevel": self.header_level})
+        return data
+
+
+@dataclass
+class LegacyCell(LegacyElement):
+    data: List[LegacyElement] = field(default_factory=list)
+    merged: Optional[bool] = None
+    rows: Optional[int] = 1
+    cols: Optional[int] = 1
+
+    def __post_init__(self) -> None:
+        if self.rows > 1 or self.cols > 1:
+            self.merged = True
+        super().__init__(ParserElementType.CELL, self.data)
+
+    def to_dict(self) -> dict:
+        data = {
+            "type": self.element_type.value,
+            "data": [x.to_dict() for x in self.data],
+            **self.collect_common_fields(),
+        }
+        if self.merged:
+            data.update({"merged": True, **{k: v for k, v in [("rows", self.rows), ("cols", self.cols)] if v > 1}})
+        return data
+
+
+@dataclass
+class LegacyRow(LegacyElement):
+    data: List[LegacyCell]
+
+    def __post_init__(self) -> None:
+        super().__init__(ParserElementType.ROW, self.data)
+
+    def to_dict(self) -> dict:
+        return {
+            "type": self.element_type.value,
+            "data": [cell.to_dict() for cell in self.data],
+            **self.collect_common_fields(),
+        }
+
+
+@dataclass
+class LegacyTable(LegacyElement):
+    data: List[LegacyRow]
+
+    def __post_init__(self) -> None:
+        super().__init__(ParserElementType.TABLE, self.data)
+
+    def to_dict(self) -> dict:
+        return {
+            "type": self.element_type.value,
+            **self.collect_common_fields(),
+            "data": [row.to_dict() for row in self.data],
+        }
+
+
+def build_table(cells_count: int, table_class, row_class, cell_class, text_class):
+    """Создает таблицу из cells_count ячеек с одним абзацем в каждой, как это делает TableParser.
+    Текст ячеек - одна общая строка, чтобы замер памяти отражал только накладные расходы элементов"""
+    rows = []
+    for row_index in range(cells_count // COLUMNS):
+        cells = []
+        for col_index in range(COLUMNS):
+            text = text_class(CELL_TEXT)
+            text.nesting_level = 1
+            text.is_cell_element = True
+            cells.append(cell_class(data=[text], rows=2 if col_index == 0 else 1))
+        rows.append(row_class(cells))
+    return table_class(rows)
+
+
+def measure_memory(build: Callable) -> int:
+    """Возвращает объем памяти, занятой построенной таблицей, в байтах"""
+    tracemalloc.start()
+    try:
+        table = build()
+        size = tracemalloc.get_traced_memory()[0]
+        del table
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+def measure_serialization(table, repeat: int = 5) -> float:
+    """Возвращает лучшее из нескольких измерений времени to_dict всей таблицы в миллисекундах"""
+    return min(timeit.Timer(table.to_dict).repeat(repeat=repeat, number=1)) * 1000
+
+
+def main() -> None:
+    cells_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    variants = {
+        "До (dataclass со словарем)": lambda: build_table(cells_count, LegacyTable, LegacyRow, LegacyCell, LegacyText),
+        "После (slots=True)": lambda: build_table(cells_count, TableElement, RowElement, CellElement, TextElement),
+    }
+
+    print(f"Ячеек: {cells_count}, элементов: {cells_count * 2 + cells_count // COLUMNS + 1}")
+    results = {}
+    for name, build in variants.items():
+        memory = measure_memory(build)
+        serialization = measure_serialization(build())
+        results[name] = (memory, serialization)
+        print(f"{name:<28} память: {memory / 1024 / 1024:7.2f} МБ   to_dict: {serialization:7.2f} мс")
+
+    (legacy_memory, legacy_time), (slots_memory, slots_time) = results.values()
+    print(f"Память: x{legacy_memory / slots_memory:.2f} меньше, сериализация: x{legacy_time / slots_time:.2f} быстрее")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Бенчмарк этапов обработки шаблона на синтетических документах: распаковка архива, загрузка XML,
+парсинг DocxParser.parse, StructureManager.apply_structure и TemplateElementService.bulk_create_elements.
+Для каждого профиля выводится медианное время этапов, пропускная способность и пиковое потребление памяти.
+
+Запуск из папки backend: `python -m benchmarks.parser_stages [профили...] [--repeat N]`
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from typing import Callable
+
+from lxml import etree
+
+from benchmarks.docx_generator import DocumentProfile, generate_docx
+from labstructanalyzer.configs.config import CONFIG_DIR
+from labstructanalyzer.services.parser.docx import DocxParser
+from labstructanalyzer.services.template import TemplateElementService
+from labstructanalyzer.utils.file_utils import FileUtils
+from labstructanalyzer.utils.parser.structure.structure_manager import StructureManager
+
+PROFILES = {
+    "small": DocumentProfile(paragraphs=50, tables=1, table_rows=5, table_cols=3, images=2, numbering_depth=2),
+    "medium": DocumentProfile(),
+    "large": DocumentProfile(
+        paragraphs=2000, tables=20, table_rows=30, table_cols=6, images=30, numbering_depth=5, heading_levels=4
+    ),
+    "tables": DocumentProfile(
+        paragraphs=20, tables=10, table_rows=200, table_cols=8, images=0, merge_pattern="mixed"
+    ),
+}
+XML_PARTS = ("word/document.xml", "word/_rels/document.xml.rels", "word/styles.xml", "word/numbering.xml")
+IMAGES_DIR = "images"
+
+
+def load_structure_manager() -> StructureManager:
+    with open(os.path.join(CONFIG_DIR, "structure.json"), "r", encoding="utf-8") as file:
+        return StructureManager(json.load(file))
+
+
+def unzip(document: bytes) -> list[bytes]:
+    with zipfile.ZipFile(io.BytesIO(document)) as archive:
+        return [archive.read(part) for part in XML_PARTS]
+
+
+def load_xml(parts: list[bytes]) -> list[etree.Element]:
+    return [etree.fromstring(part) for part in parts]
+
+
+def run_stages(document: bytes, structure_manager: StructureManager) -> dict[str, float]:
+    """Выполняет все этапы один раз и возвращает время каждого этапа в секундах.
+    Этап parse включает сохранение изображений на диск"""
+    timings = {}
+
+    def timed(stage: str, function: Callable):
+        start = time.perf_counter()
+        result = function()
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    parts = timed("unzip", lambda: unzip(document))
+    timed("xml_load", lambda: load_xml(parts))
+    parser = timed("parser_init", lambda: DocxParser(document, structure_manager, IMAGES_DIR))
+    elements = timed("parse", lambda: list(parser.parse(parser.xml_manager.main_content_root)))
+    components = timed("apply_structure", lambda: list(structure_manager.apply_structure(iter(elements))))
+    timed("bulk_create_elements", lambda: TemplateElementService(None).bulk_create_elements(components))
+    return timings
+
+
+def run_end_to_end(document: bytes, structure_manager: StructureManager) -> int:
+    """Выполняет полный прогон и возвращает количество созданных элементов шаблона"""
+    components = DocxParser(document, structure_manager, IMAGES_DIR).get_structure_components()
+    return len(TemplateElementService(None).bulk_create_elements(components))
+
+
+def measure_peak_memory(document: bytes, structure_manager: StructureManager) -> int:
+    """Возвращает пиковое потребление памяти Python-объектами за один полный прогон в байтах"""
+    tracemalloc.start()
+    try:
+        run_end_to_end(document, structure_manager)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_profile(name: str, profile: DocumentProfile, repeat: int, structure_manager: StructureManager) -> None:
+    document = generate_docx(profile)
+    elements_count = run_end_to_end(document, structure_manager)
+
+    runs = [run_stages(document, structure_manager) for _ in range(repeat)]
+    medians = {stage: statistics.median(run[stage] for run in runs) for stage in runs[0]}
+    end_to_end = statistics.median(
+        _time(lambda: run_end_to_end(document, structure_manager)) for _ in range(repeat)
+    )
+    peak_memory = measure_peak_memory(document, structure_manager)
+
+    print(f"\n[{name}] {profile}")
+    print(f"  размер документа: {len(document) / 1024:.1f} КБ, элементов шаблона: {elements_count}")
+    for stage, seconds in medians.items():
+        print(f"  {stage:<22}{seconds * 1000:>10.2f} мс")
+    print(f"  {'end_to_end':<22}{end_to_end * 1000:>10.2f} мс")
+    print(f"  пропускная способность: {1 / end_to_end:.1f} док/с, "
+          f"{len(document) / 1024 / 1024 / end_to_end:.2f} МБ/с, "
+          f"{elements_count / end_to_end:.0f} элементов/с")
+    print(f"  пиковая память: {peak_memory / 1024 / 1024:.2f} МБ")
+
+
+def _time(function: Callable) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argument_parser.add_argument("profiles", nargs="*", help=f"Профили документов: {', '.join(PROFILES)}")
+    argument_parser.add_argument("--repeat", type=int, default=5, help="Количество замеров каждого этапа")
+    arguments = argument_parser.parse_args()
+    unknown_profiles = set(arguments.profiles) - PROFILES.keys()
+    if unknown_profiles:
+        argument_parser.error(f"Неизвестные профили: {', '.join(sorted(unknown_profiles))}")
+
+    structure_manager = load_structure_manager()
+    with tempfile.TemporaryDirectory() as images_root:
+        FileUtils.BASE_PROJECT_DIR = images_root
+        for name in arguments.profiles or PROFILES:
+            benchmark_profile(name, PROFILES[name], arguments.repeat, structure_manager)
+
+
+if __name__ == "__main__":
+    main()
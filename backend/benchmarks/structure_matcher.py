@@ -0,0 +1,93 @@
+"""Бенчмарк сопоставления составных компонентов: перебор всех составных компонентов для каждого окна элементов
+против префиксного дерева CompositeMatcher. Структура дополняется синтетическими составными компонентами,
+как если бы кафедры добавляли собственные шаблоны разделов.
+
+Запуск из папки backend: `python -m benchmarks.structure_matcher [количество добавленных компонентов]`
+"""
+import json
+import os
+import sys
+import tempfile
+import timeit
+from collections import deque
+
+from benchmarks.docx_generator import DocumentProfile, generate_docx
+from labstructanalyzer.configs.config import CONFIG_DIR
+from labstructanalyzer.services.parser.docx import DocxParser
+from labstructanalyzer.utils.file_utils import FileUtils
+from labstructanalyzer.utils.parser.structure.structure_manager import StructureManager
+
+
+def build_structure(extra_composites: int) -> dict:
+    """Добавляет в структуру составные компоненты из заголовка с префиксом текста и следующего элемента.
+    Компоненты с одинаковым заголовком различаются вторым элементом и разделяют общий префикс"""
+    with open(os.path.join(CONFIG_DIR, "structure.json"), "r", encoding="utf-8") as file:
+        structure = json.load(file)
+    second_elements = ({"type": "table", "contentType": "table"}, {"type": "image", "contentType": "image"})
+    for index in range(extra_composites):
+        structure["composite"].append({
+            "type": f"section{index}",
+            "data": [
+                {"type": "header", "contentType": "text", "startsWith": f"Раздел {index // 2}."},
+                second_elements[index % 2],
+            ]
+        })
+    return structure
+
+
+def build_windows(structure_manager: StructureManager) -> list[deque]:
+    """Возвращает окна элементов документа в том виде, в котором их проверяет apply_structure"""
+    document = generate_docx(DocumentProfile(paragraphs=1000, tables=10, images=10))
+    parser = DocxParser(document, structure_manager, "images")
+    elements = list(parser.parse(parser.xml_manager.main_content_root))
+    for element in elements:
+        for base in structure_manager.base.values():
+            if base.validate(element):
+                element.structure_type = base.structure_type
+                break
+
+    window = deque(maxlen=structure_manager.max_chunk_count)
+    windows = []
+    for element in elements:
+        window.append(element)
+        if len(window) == window.maxlen:
+            windows.append(deque(window))
+    return windows
+
+
+def match_linear(structure_manager: StructureManager, windows: list) -> int:
+    """Сопоставление в прежнем виде: копия окна и проверка каждого составного компонента целиком"""
+    matched = 0
+    for window in windows:
+        for composite in structure_manager.composite:
+            if composite.validate(list(window)):
+                matched += 1
+                break
+    return matched
+
+
+def match_trie(structure_manager: StructureManager, windows: list) -> int:
+    return sum(structure_manager.composite_matcher.match(window) is not None for window in windows)
+
+
+def main() -> None:
+    extra_composites = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    structure_manager = StructureManager(build_structure(extra_composites))
+    with tempfile.TemporaryDirectory() as images_root:
+        FileUtils.BASE_PROJECT_DIR = images_root
+        windows = build_windows(structure_manager)
+    if match_linear(structure_manager, windows) != match_trie(structure_manager, windows):
+        raise AssertionError("Результаты сопоставления различаются")
+
+    print(f"Составных компонентов: {len(structure_manager.composite)}, окон: {len(windows)}")
+    results = {}
+    for name, match in (("Перебор", match_linear), ("Префиксное дерево", match_trie)):
+        seconds = min(timeit.Timer(lambda: match(structure_manager, windows)).repeat(repeat=5, number=1))
+        results[name] = seconds
+        print(f"{name:<20} {seconds / len(windows) * 1_000_000:8.2f} мкс на окно")
+    linear, trie = results.values()
+    print(f"Ускорение: x{linear / trie:.1f}")
+
+
+if __name__ == "__main__":
+    main()
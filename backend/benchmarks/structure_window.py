@@ -0,0 +1,135 @@
+"""Бенчмарк применения структуры: прежний цикл StructureManager.apply_structure с копированием окна элементов
+для каждого составного компонента и глубоким копированием текста вопроса против окна без копий.
+Измеряются время на элемент документа и пиковый объем временной памяти: результат не сохраняется,
+поэтому пик отражает только промежуточные копии.
+
+Запуск из папки backend: `python -m benchmarks.structure_window [количество абзацев]`
+"""
+import copy
+import json
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from collections import deque
+
+from benchmarks.docx_generator import DocumentProfile, generate_docx
+from labstructanalyzer.configs.config import CONFIG_DIR
+from labstructanalyzer.services.parser.docx import DocxParser
+from labstructanalyzer.utils.file_utils import FileUtils
+from labstructanalyzer.utils.parser.common_elements import QuestionElement
+from labstructanalyzer.utils.parser.structure.structure_manager import StructureManager
+
+
+class LegacyStructureManager(StructureManager):
+    """Применение структуры в прежнем виде: копия окна при каждой проверке составного компонента,
+    срез копии для сборки компонента и глубокое копирование элемента вопроса"""
+
+    def apply_structure(self, elements):
+        chunk = deque(maxlen=self.max_chunk_count)
+
+        for item in elements:
+            for base in self.base.values():
+                if base.validate(item):
+                    item.structure_type = base.structure_type
+                    if self.contain_answer_mark(item):
+                        item.structure_type = "question"
+                    break
+
+            chunk.append(item)
+
+            while len(chunk) == self.max_chunk_count:
+                for composite in self.composite:
+                    if composite.validate(list(chunk)):
+                        composite_element = composite.get_structure_template()
+                        composite_element["data"] = [
+                            self.recursive_apply_structure(child_element) for child_element in
+                            list(chunk)[:composite.chunk_count]
+                        ]
+                        yield composite_element
+                        for _ in range(composite.chunk_count):
+                            chunk.popleft()
+                        break
+                else:
+                    current_element = chunk.popleft()
+                    next_element = chunk[0] if len(chunk) else None
+                    if current_element.structure_type == "text" and self.is_only_answer_mark(next_element):
+                        current_element.structure_type = "question"
+                        current_element.data += next_element.data
+                        chunk.popleft()
+                    yield self.recursive_apply_structure(current_element)
+
+        while chunk:
+            yield self.recursive_apply_structure(chunk.popleft())
+
+    def extract_question_from_text(self, element):
+        index = element.data.find(self.answer_delimiter)
+        answer_template = self.extract_answer_template(element)
+
+        text_component = copy.deepcopy(element)
+        text_component.data = element.data[:index].strip()
+        text_component.structure_type = "text"
+
+        question_element = QuestionElement(data=[text_component, self.create_answer_element(None, answer_template)])
+        question_element.structure_type = "question"
+        question_element.nesting_level = element.nesting_level
+        return question_element
+
+
+def parse_elements(document: bytes, structure_manager: StructureManager) -> list:
+    """Возвращает элементы документа до применения структуры"""
+    parser = DocxParser(document, structure_manager, "images")
+    return list(parser.parse(parser.xml_manager.main_content_root))
+
+
+def measure_time(structure_manager: StructureManager, elements: list, repeat: int = 5) -> float:
+    """Возвращает лучшее из нескольких измерений времени применения структуры в секундах.
+    Применение изменяет тип структуры и текст элементов, поэтому каждый запуск получает свою копию элементов"""
+    prepared = [copy.deepcopy(elements) for _ in range(repeat)]
+    return min(timeit.Timer(lambda: list(structure_manager.apply_structure(iter(prepared.pop())))).repeat(
+        repeat=repeat, number=1))
+
+
+def measure_memory(structure_manager: StructureManager, elements: list) -> int:
+    """Возвращает пиковый объем временной памяти при применении структуры в байтах.
+    Готовые компоненты сразу отбрасываются, как при записи результата в поток"""
+    prepared = copy.deepcopy(elements)
+    tracemalloc.start()
+    try:
+        deque(structure_manager.apply_structure(iter(prepared)), maxlen=0)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    document = generate_docx(DocumentProfile(paragraphs=paragraphs, tables=10, images=10))
+    with open(f"{CONFIG_DIR}/structure.json", "r", encoding="utf-8") as file:
+        structure = json.load(file)
+
+    variants = {"До (копии окна)": LegacyStructureManager(structure), "После (без копий)": StructureManager(structure)}
+    with tempfile.TemporaryDirectory() as images_root:
+        FileUtils.BASE_PROJECT_DIR = images_root
+        elements = parse_elements(document, variants["После (без копий)"])
+
+    legacy_result, result = (list(structure_manager.apply_structure(iter(copy.deepcopy(elements))))
+                             for structure_manager in variants.values())
+    if legacy_result != result:
+        raise AssertionError("Результаты применения структуры различаются")
+
+    print(f"Элементов: {len(elements)}")
+    results = {}
+    for name, structure_manager in variants.items():
+        seconds = measure_time(structure_manager, elements)
+        memory = measure_memory(structure_manager, elements)
+        results[name] = (seconds, memory)
+        print(f"{name:<20} {seconds / len(elements) * 1_000_000:7.2f} мкс на элемент   "
+              f"пик временной памяти: {memory / 1024:7.1f} КБ")
+
+    (legacy_time, _), (time, _) = results.values()
+    print(f"Ускорение: x{legacy_time / time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Микробенчмарк стоимости обработки одного абзаца: XPath выражения, собираемые при каждом вызове,
+против чтения свойств абзаца за один проход (read_paragraph_properties) с тегами из реестра docx_xpath.
+
+Запуск из папки backend: `python -m benchmarks.xpath_registry [количество абзацев]`
+"""
+import sys
+import timeit
+
+from lxml import etree
+
+from labstructanalyzer.services.parser.docx import read_paragraph_properties
+from labstructanalyzer.services.parser.docx_xpath import NAMESPACES
+
+
+def build_paragraphs(count: int) -> list[etree.Element]:
+    """Создает абзацы со стилем, нумерацией и несколькими фрагментами текста"""
+    body = "".join(
+        '<w:p><w:pPr><w:pStyle w:val="ListParagraph"/>'
+        f'<w:numPr><w:ilvl w:val="{index % 3}"/><w:numId w:val="1"/></w:numPr></w:pPr>'
+        f'<w:r><w:t>Пункт {index}</w:t></w:r><w:r><w:br/><w:t>продолжение</w:t></w:r>'
+        '<w:r><w:t xml:space="preserve"> текста абзаца</w:t></w:r></w:p>'
+        for index in range(count)
+    )
+    root = etree.fromstring(f'<w:body xmlns:w="{NAMESPACES["w"]}">{body}</w:body>')
+    return list(root)
+
+
+def inline_queries(paragraph: etree.Element) -> None:
+    """Запросы к абзацу в виде, в котором они выполнялись до появления реестра"""
+    if paragraph.tag == f'{{{NAMESPACES["w"]}}}tbl':
+        return
+    paragraph.find(".//pic:blipFill", namespaces=NAMESPACES)
+    numbering_element = paragraph.find(".//w:numPr", namespaces=NAMESPACES)
+    numbering_element.xpath("./w:numId/@w:val", namespaces=NAMESPACES)
+    numbering_element.xpath("./w:ilvl/@w:val", namespaces=NAMESPACES)
+    for node in paragraph.xpath(".//w:t | .//w:br", namespaces=NAMESPACES):
+        if node.tag == f'{{{NAMESPACES["w"]}}}br':
+            continue
+    paragraph.xpath(".//w:pStyle/@w:val", namespaces=NAMESPACES)
+
+
+def measure(queries, paragraphs: list[etree.Element], repeat: int = 5) -> float:
+    """Возвращает лучшее из нескольких измерений времени обработки одного абзаца в микросекундах"""
+    timer = timeit.Timer(lambda: [queries(paragraph) for paragraph in paragraphs])
+    return min(timer.repeat(repeat=repeat, number=1)) / len(paragraphs) * 1_000_000
+
+
+def main() -> None:
+    paragraphs_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    paragraphs = build_paragraphs(paragraphs_count)
+
+    inline_cost = measure(inline_queries, paragraphs)
+    single_pass_cost = measure(read_paragraph_properties, paragraphs)
+
+    print(f"Абзацев: {paragraphs_count}")
+    print(f"До (выражения собираются при вызове): {inline_cost:.2f} мкс/абзац")
+    print(f"После (read_paragraph_properties):    {single_pass_cost:.2f} мкс/абзац")
+    print(f"Ускорение: x{inline_cost / single_pass_cost:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
+import os
+
 from fastapi import Depends
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from labstructanalyzer.configs.config import CONFIG_DIR
 from labstructanalyzer.core.database import get_session
 from labstructanalyzer.services.answer import AnswerService
+from labstructanalyzer.services.parser.parse_service import ParseService
 from labstructanalyzer.services.report import ReportService
+from labstructanalyzer.services.structure_profile import StructureProfileService
 from labstructanalyzer.services.template import TemplateService, TemplateElementService
 
+parse_service = ParseService(os.path.join(CONFIG_DIR, "structure.json"))
+
 
 def get_template_service(session: AsyncSession = Depends(get_session)) -> TemplateService:
     return TemplateService(session)
@@ -17,3 +24,11 @@ def get_report_service(session: AsyncSession = Depends(get_session)) -> ReportSe
 
 def get_answer_service(session: AsyncSession = Depends(get_session)) -> AnswerService:
     return AnswerService(session)
+
+
+def get_structure_profile_service(session: AsyncSession = Depends(get_session)) -> StructureProfileService:
+    return StructureProfileService(session)
+
+
+def get_parse_service() -> ParseService:
+    return parse_service
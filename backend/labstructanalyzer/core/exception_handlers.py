@@ -1,5 +1,6 @@
 from fastapi import HTTPException
 from starlette import status
+from starlette.responses import JSONResponse
 
 
 async def invalid_jwt_state(request, exc):
@@ -17,3 +18,11 @@ async def no_existing_template(request, exc):
 
 async def no_lti_service_access(request, exc):
     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=exc.message)
+
+
+async def parse_worker_crashed(request, exc):
+    return JSONResponse({"detail": str(exc)}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+async def invalid_document(request, exc):
+    return JSONResponse({"detail": str(exc)}, status_code=status.HTTP_400_BAD_REQUEST)
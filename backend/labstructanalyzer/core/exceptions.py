@@ -16,4 +16,27 @@ class AgsNotSupportedException(Exception):
 class NrpsNotSupportedException(Exception):
     """Исключение, возникающее при отсутствии доступа к службе имен и ролей LTI 1.3"""
     def __init__(self):
-        super.__init__("Нет доступа к службе имен и ролей")
\ No newline at end of file
+        super.__init__("Нет доступа к службе имен и ролей")
+
+class ParseWorkerCrashedException(Exception):
+    """Исключение, возникающее при аварийном завершении процесса, обрабатывавшего документ"""
+
+    def __init__(self):
+        super().__init__("Процесс обработки документа завершился аварийно, попробуйте загрузить файл еще раз")
+
+class InvalidDocumentException(Exception):
+    """Исключение, возникающее при обработке файла, который не является корректным docx документом"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(f"Некорректный docx документ: {reason}")
+
+    def __reduce__(self):
+        """Исключение передается из процесса-обработчика, поэтому восстанавливается по исходной причине"""
+        return self.__class__, (self.reason,)
+
+class InvalidStructureException(Exception):
+    """Исключение, возникающее при сохранении структуры, которую невозможно применить к документам"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Некорректная структура: {reason}")
@@ -1,3 +1,4 @@
+import logging
 import os
 from contextlib import asynccontextmanager
 
@@ -7,24 +8,31 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi_another_jwt_auth.exceptions import AuthJWTException
 from pylti1p3.exception import LtiException
 
-from .core.exception_handlers import invalid_jwt_state, invalid_lti_state, no_existing_template, no_lti_service_access
-from .core.exceptions import TemplateNotFoundException, AgsNotSupportedException, NrpsNotSupportedException
+from .core.exception_handlers import invalid_jwt_state, invalid_lti_state, no_existing_template, \
+    no_lti_service_access, parse_worker_crashed, invalid_document
+from .core.exceptions import TemplateNotFoundException, AgsNotSupportedException, NrpsNotSupportedException, \
+    ParseWorkerCrashedException, InvalidDocumentException
 from .routers.jwt_router import router as jwt_router
 from .routers.lti_router import router as lti_router
 from .routers.template_router import router as template_router
 from .routers.file_router import router as file_router
 from .routers.users_router import router as users_router
 from .routers.report_router import router as report_router
+from .routers.structure_router import router as structure_router
 
 from dotenv import load_dotenv
 
 load_dotenv()
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s %(message)s")
 from labstructanalyzer.core.database import close_db
+from labstructanalyzer.core.dependencies import parse_service
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    parse_service.start()
     yield
+    parse_service.shutdown()
     await close_db()
 
 
@@ -35,12 +43,15 @@ app.add_exception_handler(LtiException, invalid_lti_state)
 app.add_exception_handler(TemplateNotFoundException, no_existing_template)
 app.add_exception_handler(AgsNotSupportedException, no_lti_service_access)
 app.add_exception_handler(NrpsNotSupportedException, no_lti_service_access)
+app.add_exception_handler(ParseWorkerCrashedException, parse_worker_crashed)
+app.add_exception_handler(InvalidDocumentException, invalid_document)
 
 app.include_router(jwt_router, prefix='/api/v1/jwt')
 app.include_router(lti_router, prefix='/api/v1/lti')
 app.include_router(template_router, prefix='/api/v1/templates')
 app.include_router(users_router, prefix='/api/v1/users')
 app.include_router(report_router, prefix='/api/v1/reports')
+app.include_router(structure_router, prefix='/api/v1/structure')
 app.include_router(file_router)
 
 app.add_middleware(
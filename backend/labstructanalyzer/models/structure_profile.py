@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import Column, TIMESTAMP, text, FetchedValue, JSON
+from sqlmodel import SQLModel, Field
+
+
+class StructureProfile(SQLModel, table=True):
+    __tablename__ = 'structure_profiles'
+
+    course_id: str = Field(max_length=255, primary_key=True)
+    version: int = Field(default=1)
+    structure: dict = Field(sa_column=Column(JSON, nullable=False))
+    user_id: str = Field(max_length=255)
+
+    updated_at: datetime = Field(
+        default=None,
+        sa_column=Column(
+            TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=text("CURRENT_TIMESTAMP"),
+            server_onupdate=FetchedValue(),
+        )
+    )
@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi_another_jwt_auth import AuthJWT
+from sqlalchemy.exc import SQLAlchemyError
+from starlette import status
+from starlette.responses import JSONResponse
+
+from labstructanalyzer.core.dependencies import get_parse_service, get_structure_profile_service
+from labstructanalyzer.core.exceptions import InvalidStructureException
+from labstructanalyzer.services.parser.parse_service import ParseService
+from labstructanalyzer.services.structure_profile import StructureProfileService
+from labstructanalyzer.utils.rbac_decorator import roles_required
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    summary="Получить структуру курса",
+    description="Возвращает структуру, применяемую к документам текущего курса. Если курс не задал собственную "
+                "структуру, возвращается общая структура с версией null.",
+    tags=["Structure"],
+    responses={
+        200: {
+            "description": "Структура курса",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "course_id": "course_id",
+                        "version": 3,
+                        "structure": {"answer": {"charDelimiter": "_", "minRepeatCount": 5}, "base": [],
+                                      "composite": []}
+                    }
+                }
+            }
+        },
+        401: {
+            "description": "Неавторизованный доступ",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Не авторизован"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен. Требуется роль преподавателя",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Доступ запрещен"}
+                }
+            }
+        },
+    },
+)
+@roles_required(["teacher"])
+async def get_structure(
+        authorize: AuthJWT = Depends(),
+        structure_profile_service: StructureProfileService = Depends(get_structure_profile_service),
+        parse_service: ParseService = Depends(get_parse_service)
+):
+    """
+    Получить структуру курса из JWT.
+
+    - Требуется роль **teacher**.
+    """
+    course_id = authorize.get_raw_jwt().get("course_id")
+    profile = await structure_profile_service.get(course_id)
+    if profile is not None:
+        return {"course_id": course_id, "version": profile.version, "structure": profile.structure}
+
+    return {"course_id": course_id, "version": None, "structure": parse_service.structure.get().structure}
+
+
+@router.put(
+    "",
+    summary="Сохранить структуру курса",
+    description="Сохраняет структуру, которая будет применяться к документам текущего курса, и увеличивает ее "
+                "версию. Структура проверяется при сохранении, перезапуск сервера не требуется.",
+    tags=["Structure"],
+    responses={
+        200: {
+            "description": "Структура сохранена",
+            "content": {
+                "application/json": {
+                    "example": {"course_id": "course_id", "version": 4}
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка запроса. Структура некорректна",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Некорректная структура: Wrong JSON structure"}
+                }
+            }
+        },
+        401: {
+            "description": "Неавторизованный доступ",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Не авторизован"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен. Требуется роль преподавателя",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Доступ запрещен"}
+                }
+            }
+        },
+        500: {
+            "description": "Ошибка со стороны БД",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Произошла ошибка при сохранении данных, попробуйте еще раз"}
+                }
+            }
+        },
+    },
+)
+@roles_required(["teacher"])
+async def save_structure(
+        authorize: AuthJWT = Depends(),
+        structure: dict = Body(..., description="Структура в формате structure.json"),
+        structure_profile_service: StructureProfileService = Depends(get_structure_profile_service)
+):
+    """
+    Сохранить структуру курса из JWT.
+
+    - **structure**: Структура с ключами answer, base и composite.
+    - Требуется роль **teacher**.
+    """
+    raw_jwt = authorize.get_raw_jwt()
+    course_id = raw_jwt.get("course_id")
+
+    try:
+        profile = await structure_profile_service.save(course_id, raw_jwt.get("sub"), structure)
+        return {"course_id": course_id, "version": profile.version}
+    except InvalidStructureException as exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exception))
+    except SQLAlchemyError:
+        return JSONResponse({"detail": "Произошла ошибка при сохранении данных, попробуйте еще раз"},
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+import traceback
 import uuid
 
 from fastapi import APIRouter, UploadFile, HTTPException, Depends
@@ -8,10 +10,12 @@ from fastapi_another_jwt_auth import AuthJWT
 from sqlalchemy.exc import SQLAlchemyError
 from starlette import status
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 
-from labstructanalyzer.configs.config import CONFIG_DIR, tool_conf
-from labstructanalyzer.core.dependencies import get_template_service, get_report_service, get_answer_service
+from labstructanalyzer.configs.config import tool_conf
+from labstructanalyzer.core.dependencies import get_template_service, get_report_service, get_answer_service, \
+    get_parse_service, get_structure_profile_service
+from labstructanalyzer.core.exceptions import InvalidDocumentException, ParseWorkerCrashedException
 from labstructanalyzer.models.dto.modify_template import TemplateToModify
 from labstructanalyzer.models.dto.report import MinimalReportInfoDto, AllReportsDto
 from labstructanalyzer.models.dto.template import TemplateWithElementsDto, AllTemplatesDto, \
@@ -24,15 +28,22 @@ from labstructanalyzer.services.lti.nrps import NrpsService
 from labstructanalyzer.services.pylti1p3.cache import FastAPICacheDataStorage
 from labstructanalyzer.services.pylti1p3.message_launch import FastAPIMessageLaunch
 from labstructanalyzer.services.pylti1p3.request import FastAPIRequest
-from labstructanalyzer.services.parser.docx import DocxParser
+from labstructanalyzer.services.parser.parse_service import ParseService
 from labstructanalyzer.services.report import ReportService, ReportStatus
+from labstructanalyzer.services.structure_profile import StructureProfileService
 from labstructanalyzer.services.template import TemplateService
 from labstructanalyzer.utils.rbac_decorator import roles_required
+from labstructanalyzer.utils.stage_timer import StageTimer
 
 router = APIRouter()
 template_prefix = "images\\template"
 
 
+def is_server_timing_enabled() -> bool:
+    """Добавлять ли заголовок Server-Timing с замерами этапов загрузки шаблона (переменная окружения SERVER_TIMING)"""
+    return os.getenv("SERVER_TIMING", "").lower() in ("1", "true")
+
+
 @router.post(
     "",
     summary="Преобразовать шаблон из docx в json",
@@ -79,16 +90,28 @@ template_prefix = "images\\template"
                 }
             }
         },
+        503: {
+            "description": "Процесс обработки документа завершился аварийно",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Процесс обработки документа завершился аварийно, попробуйте загрузить файл еще раз"
+                    }
+                }
+            }
+        },
     },
 )
 @roles_required(["teacher"])
 async def parse_template(
         authorize: AuthJWT = Depends(),
         template: UploadFile = File(..., description="DOCX файл для обработки"),
-        template_service: TemplateService = Depends(get_template_service)
+        template_service: TemplateService = Depends(get_template_service),
+        parse_service: ParseService = Depends(get_parse_service),
+        structure_profile_service: StructureProfileService = Depends(get_structure_profile_service)
 ):
     """
-    Преобразовать шаблон из docx в json, применяя структуру.
+    Преобразовать шаблон из docx в json, применяя структуру курса.
 
     - **template**: Файл формата `.docx` для обработки.
     - Требуется роль **teacher**.
@@ -107,19 +130,356 @@ async def parse_template(
             detail="Тип файла не поддерживается"
         )
 
-    file_path = os.path.join(CONFIG_DIR, "structure.json")
-    with open(file_path, 'r', encoding='utf-8') as file:
-        data_dict = json.load(file)
-    docx_parser = DocxParser(await template.read(), data_dict, template_prefix)
-    template_components = docx_parser.get_structure_components()
+    raw_jwt = authorize.get_raw_jwt()
+    course_id = raw_jwt.get("course_id")
+    user_id = raw_jwt.get("sub")
+
+    timer = StageTimer()
+    course_structure = await structure_profile_service.get_course_structure(course_id)
+    template_components = await parse_service.parse(await template.read(), template_prefix, timer, course_structure)
+
+    try:
+        with timer.stage("db_insert"):
+            template_model = await template_service.create(user_id, course_id, file_name_parts[0], template_components)
+        timer.log("template_upload", file_name=template.filename, template_id=str(template_model.template_id))
+        response = JSONResponse({"template_id": str(template_model.template_id)})
+        if is_server_timing_enabled():
+            response.headers["Server-Timing"] = timer.to_server_timing()
+            response.headers["Timing-Allow-Origin"] = os.getenv("FRONTEND_URL", "*")
+        return response
+    except SQLAlchemyError:
+        return JSONResponse({"detail": "Произошла ошибка при сохранении данных, попробуйте еще раз"},
+                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@router.post(
+    "/batch",
+    summary="Преобразовать несколько шаблонов из docx в json",
+    description="Принимает несколько файлов формата `.docx`, обрабатывает их параллельно и сохраняет каждый "
+                "шаблон отдельно. Возвращает результат обработки каждого файла в порядке загрузки: `created`, "
+                "`unsupported`, `parse_error` (некорректный документ), `db_error` или `error` (внутренняя ошибка).",
+    tags=["Template"],
+    responses={
+        200: {
+            "description": "Файлы обработаны, статус каждого файла указан в ответе",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "templates": [
+                            {"file_name": "lab1.docx", "status": "created",
+                             "template_id": "c72869cb-8ac0-48b7-936f-370917e82b8e"},
+                            {"file_name": "lab2.doc", "status": "unsupported", "detail": "Тип файла не поддерживается"}
+                        ]
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка запроса. Файлы отсутствуют",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Нет файлов шаблонов"}
+                }
+            }
+        },
+        401: {
+            "description": "Неавторизованный доступ",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Не авторизован"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен. Требуется роль преподавателя",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Доступ запрещен"}
+                }
+            }
+        },
+    },
+)
+@roles_required(["teacher"])
+async def parse_templates_batch(
+        authorize: AuthJWT = Depends(),
+        templates: list[UploadFile] = File(..., description="DOCX файлы для обработки"),
+        template_service: TemplateService = Depends(get_template_service),
+        parse_service: ParseService = Depends(get_parse_service),
+        structure_profile_service: StructureProfileService = Depends(get_structure_profile_service)
+):
+    """
+    Преобразовать несколько шаблонов из docx в json, применяя структуру.
+    Документы разбираются параллельно в пуле процессов, каждый шаблон сохраняется в отдельной транзакции,
+    поэтому ошибка в одном файле не отменяет сохранение остальных.
+
+    - **templates**: Файлы формата `.docx` для обработки.
+    - Требуется роль **teacher**.
+    """
+    if not templates:
+        raise HTTPException(
+            status_code=400,
+            detail="Нет файлов шаблонов"
+        )
 
     raw_jwt = authorize.get_raw_jwt()
     course_id = raw_jwt.get("course_id")
     user_id = raw_jwt.get("sub")
+    course_structure = await structure_profile_service.get_course_structure(course_id)
+
+    results = [{"file_name": template.filename} for template in templates]
+    timers = [StageTimer() for _ in templates]
+    parse_tasks = {}
+    for index, template in enumerate(templates):
+        if os.path.splitext(template.filename)[1].lower() != ".docx":
+            results[index].update(status="unsupported", detail="Тип файла не поддерживается")
+            continue
+        parse_tasks[index] = parse_service.parse(
+            await template.read(), template_prefix, timers[index], course_structure
+        )
+
+    parsed_templates = await asyncio.gather(*parse_tasks.values(), return_exceptions=True)
+
+    for index, template_components in zip(parse_tasks.keys(), parsed_templates):
+        if isinstance(template_components, BaseException):
+            results[index].update(get_parse_error_result(templates[index].filename, template_components))
+            continue
+
+        name = os.path.splitext(os.path.basename(templates[index].filename))[0]
+        try:
+            with timers[index].stage("db_insert"):
+                template_model = await template_service.create(user_id, course_id, name, template_components)
+            results[index].update(status="created", template_id=str(template_model.template_id))
+            timers[index].log("template_upload", **results[index])
+        except SQLAlchemyError:
+            await template_service.session.rollback()
+            results[index].update(status="db_error", detail="Произошла ошибка при сохранении данных")
+
+    return JSONResponse({"templates": results})
+
+
+def get_parse_error_result(file_name: str, error: BaseException) -> dict:
+    """
+    Возвращает статус файла пакетной загрузки, который не удалось разобрать.
+    Некорректный документ и аварийное завершение процесса-обработчика - ожидаемые ошибки,
+    остальные ошибки выводятся вместе с именем файла и трассировкой
+
+    Args:
+        file_name: Имя загруженного файла
+        error: Ошибка, полученная при разборе файла
+
+    Returns:
+        Статус и описание ошибки
+
+    Raises:
+        BaseException: Полученная ошибка, если она не является исключением, например, отмена запроса
+    """
+    if isinstance(error, (InvalidDocumentException, ParseWorkerCrashedException)):
+        return {"status": "parse_error", "detail": str(error)}
+    if not isinstance(error, Exception):
+        raise error
+
+    print(f"Произошла ошибка при обработке шаблона {file_name}: {error}")
+    traceback.print_exception(type(error), error, error.__traceback__)
+    return {"status": "error", "detail": "Внутренняя ошибка при обработке файла"}
+
+
+@router.post(
+    "/preview",
+    summary="Предпросмотр шаблона в потоковом режиме",
+    description="Принимает файл формата `.docx` и передает структурные компоненты в формате NDJSON - "
+                "по одной компоненте в строке - по мере их получения. Шаблон не сохраняется, изображения "
+                "передаются в компонентах как data URL.",
+    tags=["Template"],
+    responses={
+        200: {
+            "description": "Поток структурных компонент. При ошибке обработки последняя строка содержит поле detail",
+            "content": {
+                "application/x-ndjson": {
+                    "example": '{"type": "header", "data": [...]}\n{"type": "text", "data": "..."}\n'
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка запроса. Файл отсутствует или имеет неподдерживаемый формат",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Тип файла не поддерживается"}
+                }
+            }
+        },
+        401: {
+            "description": "Неавторизованный доступ",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Не авторизован"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен. Требуется роль преподавателя",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Доступ запрещен"}
+                }
+            }
+        },
+    },
+)
+@roles_required(["teacher"])
+async def preview_template(
+        authorize: AuthJWT = Depends(),
+        template: UploadFile = File(..., description="DOCX файл для обработки"),
+        parse_service: ParseService = Depends(get_parse_service),
+        structure_profile_service: StructureProfileService = Depends(get_structure_profile_service)
+):
+    """
+    Передать структурные компоненты шаблона по мере их получения, не сохраняя шаблон.
+    Компоненты не накапливаются на сервере, поэтому первые разделы большого документа доступны сразу.
+
+    - **template**: Файл формата `.docx` для обработки.
+    - Требуется роль **teacher**.
+    """
+    if not template:
+        raise HTTPException(
+            status_code=400,
+            detail="Нет файла шаблона"
+        )
+
+    if os.path.splitext(template.filename)[1].lower() != ".docx":
+        raise HTTPException(
+            status_code=400,
+            detail="Тип файла не поддерживается"
+        )
+
+    document = await template.read()
+    timer = StageTimer()
+    course_structure = await structure_profile_service.get_course_structure(authorize.get_raw_jwt().get("course_id"))
+
+    async def stream_components():
+        try:
+            async for component in parse_service.stream(document, template_prefix, timer, course_structure):
+                yield component + "\n"
+        except (InvalidDocumentException, ParseWorkerCrashedException) as error:
+            yield json.dumps({"detail": str(error)}, ensure_ascii=False) + "\n"
+            return
+        except Exception as error:
+            print(f"Произошла ошибка при потоковой обработке шаблона {template.filename}: {error}")
+            traceback.print_exception(type(error), error, error.__traceback__)
+            yield json.dumps({"detail": "Внутренняя ошибка при обработке файла"}, ensure_ascii=False) + "\n"
+            return
+        timer.log("template_preview", file_name=template.filename)
+
+    return StreamingResponse(stream_components(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/{template_id}/reimport",
+    summary="Обновить шаблон по новой версии документа",
+    description="Принимает исправленный файл формата `.docx` для существующего шаблона и изменяет только "
+                "отличающиеся элементы. Неизмененные элементы и ответы отчетов, привязанные к ним, сохраняются.",
+    tags=["Template"],
+    responses={
+        200: {
+            "description": "Шаблон обновлен, в ответе указано количество измененных элементов",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "template_id": "c72869cb-8ac0-48b7-936f-370917e82b8e",
+                        "inserted": 1, "updated": 2, "deleted": 0, "unchanged": 120
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Ошибка запроса. Файл отсутствует или имеет неподдерживаемый формат",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Тип файла не поддерживается"}
+                }
+            }
+        },
+        401: {
+            "description": "Неавторизованный доступ",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Не авторизован"}
+                }
+            }
+        },
+        403: {
+            "description": "Доступ запрещен. Требуется роль преподавателя",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Доступ запрещен"}
+                }
+            }
+        },
+        404: {
+            "description": "Ошибка запроса. Шаблон не найден",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Шаблон не найден"}
+                }
+            }
+        },
+        500: {
+            "description": "Ошибка со стороны БД",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Произошла ошибка при сохранении данных, попробуйте еще раз"}
+                }
+            }
+        },
+        503: {
+            "description": "Процесс обработки документа завершился аварийно",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Процесс обработки документа завершился аварийно, попробуйте загрузить файл еще раз"
+                    }
+                }
+            }
+        },
+    },
+)
+@roles_required(["teacher"])
+async def reimport_template(
+        template_id: uuid.UUID,
+        authorize: AuthJWT = Depends(),
+        template: UploadFile = File(..., description="Новая версия DOCX файла шаблона"),
+        template_service: TemplateService = Depends(get_template_service),
+        parse_service: ParseService = Depends(get_parse_service),
+        structure_profile_service: StructureProfileService = Depends(get_structure_profile_service)
+):
+    """
+    Обновить элементы существующего шаблона по исправленному документу.
+
+    - **template_id**: id шаблона.
+    - **template**: Файл формата `.docx` с новой версией шаблона.
+    - Требуется роль **teacher**.
+    """
+    if not template:
+        raise HTTPException(
+            status_code=400,
+            detail="Нет файла шаблона"
+        )
+
+    if os.path.splitext(template.filename)[1].lower() != ".docx":
+        raise HTTPException(
+            status_code=400,
+            detail="Тип файла не поддерживается"
+        )
+
+    timer = StageTimer()
+    course_structure = await structure_profile_service.get_course_structure(authorize.get_raw_jwt().get("course_id"))
+    template_components = await parse_service.parse(await template.read(), template_prefix, timer, course_structure)
 
     try:
-        template_model = await template_service.create(user_id, course_id, file_name_parts[0], template_components)
-        return JSONResponse({"template_id": str(template_model.template_id)})
+        with timer.stage("db_reimport"):
+            changes = await template_service.reimport(template_id, template_components)
+        timer.log("template_reimport", file_name=template.filename, template_id=str(template_id), **changes.to_dict())
+        return JSONResponse({"template_id": str(template_id), **changes.to_dict()})
     except SQLAlchemyError:
         return JSONResponse({"detail": "Произошла ошибка при сохранении данных, попробуйте еще раз"},
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
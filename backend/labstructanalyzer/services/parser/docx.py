@@ -1,10 +1,15 @@
+import hashlib
 import io
 import os, zipfile
+from collections import namedtuple
+from functools import cached_property
 from urllib.parse import urljoin
 
 from lxml import etree
-from typing import Generator, List, Optional
+from typing import IO, Generator, List, Optional
 from zipfile import ZipFile
+
+from labstructanalyzer.core.exceptions import InvalidDocumentException
 from labstructanalyzer.utils.parser.common_elements import (
     ImageElement,
     TextElement,
@@ -20,40 +25,122 @@ from labstructanalyzer.utils.parser.numbering_manager import (
     NumberingProps,
 )
 
+from labstructanalyzer.services.parser import docx_xpath
 from labstructanalyzer.utils.parser.nesting_manager import NestingManager
 from labstructanalyzer.utils.file_utils import FileUtils
+from labstructanalyzer.utils.file_writer import BackgroundFileWriter
+from labstructanalyzer.utils.lru_cache import LRUCache
+from labstructanalyzer.utils.stage_timer import StageTimer
 from labstructanalyzer.utils.parser.structure.structure_manager import StructureManager
 
 
+Relationship = namedtuple("Relationship", ["type", "target", "target_mode"])
+ResolvedStyle = namedtuple(
+    "ResolvedStyle", ["style_id", "name", "based_on", "outline_level", "numbering", "heading_level"]
+)
+ParagraphProperties = namedtuple("ParagraphProperties", ["style_id", "numbering", "has_drawing", "embed_id", "text"])
+
+
+def read_paragraph_properties(paragraph: etree.Element) -> ParagraphProperties:
+    """Читает все данные абзаца, необходимые парсерам, за один проход: стиль и нумерацию - из `<w:pPr>`,
+    текст, переносы строк и изображение - из содержимого абзаца. Парсеры используют полученную запись
+    вместо повторных поисков по всем потомкам абзаца
+
+    Arguments:
+      paragraph: Элемент-абзац `<w:p>`
+
+    Returns:
+      Свойства абзаца - идентификатор стиля, свойства нумерации самого абзаца, наличие изображения,
+      идентификатор отношения изображения и текст
+    """
+    style_id = None
+    numbering = None
+    paragraph_props = paragraph.find(docx_xpath.W_P_PR)
+    if paragraph_props is not None:
+        style = paragraph_props.find(docx_xpath.W_P_STYLE)
+        if style is not None:
+            style_id = style.get(docx_xpath.W_VAL)
+        numbering_element = paragraph_props.find(docx_xpath.W_NUM_PR)
+        if numbering_element is not None:
+            numbering = read_numbering_props(numbering_element)
+
+    has_drawing = False
+    embed_id = None
+    text_parts = []
+    for node in paragraph.iter(docx_xpath.W_T, docx_xpath.W_BR, docx_xpath.PIC_BLIP_FILL):
+        if node.tag == docx_xpath.W_T:
+            if node.text:
+                text_parts.append(node.text)
+        elif node.tag == docx_xpath.W_BR:
+            text_parts.append("\n")
+        elif not has_drawing:
+            has_drawing = True
+            blip = node.find(docx_xpath.A_BLIP)
+            embed_id = blip.get(docx_xpath.ODR_EMBED) if blip is not None else None
+
+    return ParagraphProperties(
+        style_id=style_id,
+        numbering=numbering,
+        has_drawing=has_drawing,
+        embed_id=embed_id,
+        text="".join(text_parts).strip(),
+    )
+
+
+def read_numbering_props(numbering_element: etree.Element) -> Optional[NumberingProps]:
+    """Читает свойства нумерации - идентификатор и уровень - из элемента `<w:numPr>`
+
+    Arguments:
+      numbering_element: Элемент `<w:numPr>` абзаца или стиля
+
+    Returns:
+      Свойства нумерации или None, если идентификатор нумерации не указан
+    """
+    numbering_id = numbering_element.find(docx_xpath.W_NUM_ID)
+    if numbering_id is None or numbering_id.get(docx_xpath.W_VAL) is None:
+        return None
+
+    numbering_level = numbering_element.find(docx_xpath.W_ILVL)
+    numbering_level = numbering_level.get(docx_xpath.W_VAL) if numbering_level is not None else None
+    return NumberingProps(id=numbering_id.get(docx_xpath.W_VAL), ilvl=int(numbering_level) if numbering_level else 0)
+
+
 class DocxXmlManager:
     """Менеджер xml-файлов внутри документа docx.
     Сохраняет все необходимые для обработки docx xml-файлы в виде lxml дерева
 
     Attributes:
       NAMESPACES: Все используемые пространства имен внутри xml-файлов
-      images_raw_data: Словарь взаимоотношений имени файла изображения к сырым данным изображения
+      archive: docx документ, открытый как zip-архив. Остается открытым для ленивого чтения изображений
+      media_files: Словарь взаимоотношений имени файла изображения к пути до файла внутри архива
       main_content_root: Корень xml файла с главным содержимым документа
-      styles_root: Корень xml файла с содержимым стилей
-      numberings_root: Корень xml файла с содержимым нумерации документа
-      relations_root: Корень xml файла с содержимым файла отношений
+      styles_data: Исходные байты xml файла стилей
+      numberings_data: Исходные байты xml файла нумерации документа
+      styles_root: Корень xml файла с содержимым стилей, разбирается при первом обращении
+      numberings_root: Корень xml файла с содержимым нумерации документа, разбирается при первом обращении
+      relationships: Словарь взаимоотношений идентификатора отношения (rId) к данным отношения - типу, цели и режиму цели
     """
 
-    NAMESPACES = {
-        "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
-        "r": "http://schemas.openxmlformats.org/package/2006/relationships",
-        "pic": "http://schemas.openxmlformats.org/drawingml/2006/picture",
-        "odr": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
-    }
+    NAMESPACES = docx_xpath.NAMESPACES
 
     def __init__(self, document: bytes) -> None:
         """Инициализирует объект класса DocxXmlManager
 
         Arguments:
           document: Байты docx документа
+
+        Raises:
+          InvalidDocumentException: Документ не является zip-архивом, содержит некорректный xml
+            или не содержит главного файла содержимого
         """
-        with zipfile.ZipFile(io.BytesIO(document), "r") as template:
-            self.load_template_files(template)
-            self.images_raw_data = self.load_images(template, "word/media")
+        try:
+            self.archive = zipfile.ZipFile(io.BytesIO(document), "r")
+            self.load_template_files(self.archive)
+        except (zipfile.BadZipFile, etree.XMLSyntaxError) as error:
+            raise InvalidDocumentException(str(error)) from error
+        if self.main_content_root is None:
+            raise InvalidDocumentException("отсутствует файл word/document.xml")
+        self.media_files = self.load_media_index(self.archive, "word/media")
 
     def load_template_files(self, template: ZipFile) -> None:
         """Читает все необходимые для обработки docx документа xml-файлы в виде lxml деревьев
@@ -62,116 +149,501 @@ class DocxXmlManager:
           template: docx документ, открытый как zip-архив
         """
         self.main_content_root = self.file_to_etree(template, "word/document.xml")
-        self.relations_root = self.file_to_etree(
-            template, "word/_rels/document.xml.rels"
+        self.relationships = self.load_relationships(
+            self.file_to_etree(template, "word/_rels/document.xml.rels")
         )
-        self.styles_root = self.file_to_etree(template, "word/styles.xml")
-        self.numberings_root = self.file_to_etree(template, "word/numbering.xml")
+        self.styles_data = self.read_file(template, "word/styles.xml")
+        self.numberings_data = self.read_file(template, "word/numbering.xml")
+
+    @cached_property
+    def styles_root(self) -> Optional[etree.Element]:
+        return etree.fromstring(self.styles_data) if self.styles_data is not None else None
+
+    @cached_property
+    def numberings_root(self) -> Optional[etree.Element]:
+        return etree.fromstring(self.numberings_data) if self.numberings_data is not None else None
 
-    def load_images(self, template: ZipFile, media_folder: str) -> dict:
-        """Читает все изображения из указанной папки как сырые данные
+    def load_relationships(self, relations_root: Optional[etree.Element]) -> dict[str, Relationship]:
+        """Составляет словарь отношений документа за один проход по файлу отношений.
+        Включает отношения любых типов - изображения, гиперссылки и прочие
+
+        Arguments:
+          relations_root: Корень xml файла с содержимым файла отношений
+
+        Returns:
+          Словарь взаимоотношений идентификатора отношения и данных отношения
+        """
+        if relations_root is None:
+            return {}
+
+        return {
+            relation.get("Id"): Relationship(
+                type=relation.get("Type"),
+                target=relation.get("Target"),
+                target_mode=relation.get("TargetMode"),
+            )
+            for relation in relations_root.iterchildren(docx_xpath.R_RELATIONSHIP)
+        }
+
+    def get_relationship_target(self, relationship_id: str) -> Optional[str]:
+        """Возвращает цель отношения по его идентификатору
+
+        Arguments:
+          relationship_id: Идентификатор отношения, например, значение `r:embed` или `r:id`
+
+        Returns:
+          Цель отношения (путь до файла внутри документа или внешний адрес), если отношение существует
+        """
+        relationship = self.relationships.get(relationship_id)
+        return relationship.target if relationship else None
+
+    def load_media_index(self, template: ZipFile, media_folder: str) -> dict[str, str]:
+        """Составляет перечень изображений из указанной папки без чтения их содержимого
 
         Arguments:
           template: docx документ, открытый как zip-архив
           media_folder: Путь до папки с изображениями
 
         Returns:
-          Словарь взаимоотношений имени файла изображения и сырых данных изображения
+          Словарь взаимоотношений имени файла изображения и пути до файла внутри архива
         """
-        images = {}
+        media_files = {}
         for filename in template.namelist():
             if not filename.startswith(media_folder):
                 continue
-            images[os.path.basename(filename)] = template.read(filename)
-        return images
+            media_files[os.path.basename(filename)] = filename
+        return media_files
+
+    def open_media(self, file_name: str) -> Optional[IO[bytes]]:
+        """Открывает изображение из архива для потокового чтения
+
+        Arguments:
+          file_name: Имя файла изображения
+
+        Returns:
+          Файловый объект изображения, если изображение существует, иначе None
+        """
+        archive_path = self.media_files.get(file_name)
+        if archive_path is None:
+            return None
+        return self.archive.open(archive_path)
+
+    def get_media_size(self, file_name: str) -> int:
+        """Возвращает размер изображения из архива без чтения его содержимого
+
+        Arguments:
+          file_name: Имя файла изображения
+
+        Returns:
+          Размер изображения в байтах, 0 если изображение не существует
+        """
+        archive_path = self.media_files.get(file_name)
+        return self.archive.getinfo(archive_path).file_size if archive_path is not None else 0
 
     @staticmethod
-    def file_to_etree(template: ZipFile, file_path: str) -> Optional[etree.ElementTree]:
-        """Метод для чтения xml файла и его преобразования в дерево lxml"""
+    def read_file(template: ZipFile, file_path: str) -> Optional[bytes]:
+        """Метод для чтения файла из архива документа"""
         try:
-            file = template.read(file_path)
-            return etree.fromstring(file)
+            return template.read(file_path)
         except KeyError:
             print(f"Файл '{file_path}' не найден.")
             return None
 
+    @classmethod
+    def file_to_etree(cls, template: ZipFile, file_path: str) -> Optional[etree.ElementTree]:
+        """Метод для чтения xml файла и его преобразования в дерево lxml"""
+        file = cls.read_file(template, file_path)
+        return etree.fromstring(file) if file is not None else None
+
+
+class NumberingIndex:
+    """Индекс данных нумерации документа.
+    Строится один раз по numbering.xml: для каждой нумерации определения уровней абстрактной нумерации
+    объединяются с переопределениями уровней, после чего любое получение данных нумерации - обращение к словарю
+
+    Attributes:
+      numberings: Словарь данных нумерации, использует схему [id нумерации][уровень нумерации] = NumberingItem
+    """
+
+    def __init__(self, numberings_root: Optional[etree.Element]) -> None:
+        """Инициализирует объект класса NumberingIndex и строит индекс
+
+        Args:
+          numberings_root: Корень xml файла с содержимым нумерации документа
+        """
+        self.numberings: dict[str, dict[int, NumberingItem]] = {}
+        if numberings_root is not None:
+            self._build(numberings_root)
+
+    def get(self, numbering_props: NumberingProps) -> Optional[NumberingItem]:
+        """Возвращает данные нумерации
+
+        Args:
+          numbering_props: Свойства нумерации - идентификатор и уровень
+
+        Returns:
+          Данные нумерации при существовании нумерации
+        """
+        return self.numberings.get(numbering_props.id, {}).get(numbering_props.ilvl)
+
+    def _build(self, numberings_root: etree.Element) -> None:
+        """Строит индекс: id нумерации -> id абстрактной нумерации -> определения уровней с учетом переопределений
+
+        Args:
+          numberings_root: Корень xml файла с содержимым нумерации документа
+        """
+        abstract_levels = {}
+        for abstract_numbering in numberings_root.iterchildren(docx_xpath.W_ABSTRACT_NUM):
+            abstract_levels[abstract_numbering.get(docx_xpath.W_ABSTRACT_NUM_ID_ATTRIBUTE)] = {
+                int(level.get(docx_xpath.W_ILVL, 0)): self._parse_level(level)
+                for level in abstract_numbering.iterchildren(docx_xpath.W_LVL)
+            }
+
+        for numbering in numberings_root.iterchildren(docx_xpath.W_NUM):
+            abstract_numbering_id = numbering.find(docx_xpath.W_ABSTRACT_NUM_ID)
+            levels = dict(
+                abstract_levels.get(
+                    abstract_numbering_id.get(docx_xpath.W_VAL) if abstract_numbering_id is not None else None,
+                    {},
+                )
+            )
+
+            for level_override in numbering.iterchildren(docx_xpath.W_LVL_OVERRIDE):
+                ilvl = int(level_override.get(docx_xpath.W_ILVL, 0))
+                level = levels.get(ilvl, {})
+                override_level = level_override.find(docx_xpath.W_LVL)
+                if override_level is not None:
+                    override = self._parse_level(override_level)
+                    level = {
+                        key: override[key] if override[key] is not None else level.get(key)
+                        for key in override
+                    }
+                start_override = level_override.find(docx_xpath.W_START_OVERRIDE)
+                if start_override is not None:
+                    level = {**level, "startValue": int(start_override.get(docx_xpath.W_VAL))}
+                levels[ilvl] = level
+
+            self.numberings[numbering.get(docx_xpath.W_NUM_ID)] = {
+                ilvl: numbering_item
+                for ilvl, level in levels.items()
+                if (numbering_item := self._to_numbering_item(level))
+            }
+
+    @staticmethod
+    def _parse_level(level_element: etree.Element) -> dict:
+        """Парсит определение уровня нумерации `<w:lvl>`. Отсутствующие свойства имеют значение None
+
+        Args:
+          level_element: Элемент уровня нумерации `<w:lvl>`
+
+        Returns:
+          Словарь с форматом маркера, начальным значением и текстом пункта
+        """
+        values = {}
+        for key, tag in (
+                ("format", docx_xpath.W_NUM_FMT),
+                ("startValue", docx_xpath.W_START),
+                ("text", docx_xpath.W_LVL_TEXT),
+        ):
+            child = level_element.find(tag)
+            values[key] = child.get(docx_xpath.W_VAL) if child is not None else None
+        if values["startValue"] is not None:
+            values["startValue"] = int(values["startValue"])
+        return values
+
+    @staticmethod
+    def _to_numbering_item(level: dict) -> Optional[NumberingItem]:
+        """Преобразует определение уровня в данные нумерации
+
+        Args:
+          level: Словарь с форматом маркера, начальным значением и текстом пункта
+
+        Returns:
+          Данные нумерации, если уровень имеет отображаемый формат маркера, иначе None
+        """
+        if not level.get("format") or level["format"] == "none":
+            return None
+        return NumberingItem(
+            format=level["format"],
+            startValue=level["startValue"] if level.get("startValue") is not None else 0,
+            text=level.get("text") or "",
+        )
+
+
+class StyleGraph:
+    """Граф наследования стилей документа.
+    Строится один раз по styles.xml: стили читаются за один проход, после чего для каждого стиля
+    по всей цепочке `<w:basedOn>` разрешаются уровень структуры, нумерация и уровень заголовка.
+    Собственное свойство стиля всегда приоритетнее унаследованного, циклические ссылки обрываются.
+    Получение разрешенных свойств стиля - обращение к словарю
+
+    Attributes:
+      styles: Словарь разрешенных свойств стилей по идентификатору стиля
+      TITLE_STYLE_NAME: Имя стиля заголовка документа, которому назначается первый уровень заголовка
+    """
+
+    TITLE_STYLE_NAME = "Title"
+
+    def __init__(self, styles_root: Optional[etree.Element]) -> None:
+        """Инициализирует объект класса StyleGraph и разрешает свойства всех стилей
+
+        Args:
+          styles_root: Корень xml файла со стилями документа
+        """
+        self.styles: dict[str, ResolvedStyle] = {}
+        if styles_root is not None:
+            self._build(styles_root)
+
+    def get(self, style_id: Optional[str]) -> Optional[ResolvedStyle]:
+        """Возвращает разрешенные свойства стиля
+
+        Args:
+          style_id: Идентификатор стиля
+
+        Returns:
+          Свойства стиля с учетом наследования, если стиль существует
+        """
+        return self.styles.get(style_id)
+
+    def get_heading_level(self, style_id: Optional[str]) -> Optional[int]:
+        """Возвращает уровень заголовка стиля с учетом наследования"""
+        style = self.styles.get(style_id)
+        return style.heading_level if style else None
+
+    def get_numbering(self, style_id: Optional[str]) -> Optional[NumberingProps]:
+        """Возвращает свойства нумерации стиля с учетом наследования"""
+        style = self.styles.get(style_id)
+        return style.numbering if style else None
+
+    def _build(self, styles_root: etree.Element) -> None:
+        """Читает собственные свойства стилей и разрешает их по цепочкам наследования.
+        Если в документе есть стиль заголовка документа, уровни заголовков остальных стилей сдвигаются на единицу
+
+        Args:
+          styles_root: Корень xml файла со стилями документа
+        """
+        own_styles = {}
+        for style in styles_root.iterchildren(docx_xpath.W_STYLE):
+            own_style = self._read_style(style)
+            own_styles[own_style.style_id] = own_style
+
+        heading_level_shift = 1
+        if any(style.name == self.TITLE_STYLE_NAME for style in own_styles.values()):
+            heading_level_shift += 1
+
+        for style_id in own_styles:
+            self._resolve(style_id, own_styles, heading_level_shift)
+
+    def _resolve(self, style_id: str, own_styles: dict[str, ResolvedStyle], heading_level_shift: int) -> None:
+        """Разрешает свойства стиля и всех его неразрешенных предков, начиная с самого дальнего
+
+        Args:
+          style_id: Идентификатор стиля
+          own_styles: Собственные свойства стилей без учета наследования
+          heading_level_shift: Сдвиг уровня заголовка относительно уровня структуры
+        """
+        chain = []
+        current_id = style_id
+        while current_id in own_styles and current_id not in self.styles and current_id not in chain:
+            chain.append(current_id)
+            current_id = own_styles[current_id].based_on
+
+        parent = self.styles.get(current_id)
+        for chain_style_id in reversed(chain):
+            own_style = own_styles[chain_style_id]
+            outline_level = own_style.outline_level
+            if outline_level is not None:
+                heading_level = outline_level + heading_level_shift
+            elif own_style.name == self.TITLE_STYLE_NAME:
+                heading_level = 1
+            else:
+                heading_level = parent.heading_level if parent else None
+
+            if outline_level is None and parent:
+                outline_level = parent.outline_level
+            parent = own_style._replace(
+                outline_level=outline_level,
+                numbering=own_style.numbering or (parent.numbering if parent else None),
+                heading_level=heading_level,
+            )
+            self.styles[chain_style_id] = parent
+
+    @staticmethod
+    def _read_style(style: etree.Element) -> ResolvedStyle:
+        """Читает собственные свойства стиля без учета наследования
+
+        Args:
+          style: Элемент стиля `<w:style>`
+
+        Returns:
+          Свойства стиля, уровень заголовка не заполняется
+        """
+        values = {}
+        for key, tag in (("name", docx_xpath.W_NAME), ("based_on", docx_xpath.W_BASED_ON)):
+            child = style.find(tag)
+            values[key] = child.get(docx_xpath.W_VAL) if child is not None else None
+
+        outline_level = None
+        numbering = None
+        paragraph_props = style.find(docx_xpath.W_P_PR)
+        if paragraph_props is not None:
+            outline_level_element = paragraph_props.find(docx_xpath.W_OUTLINE_LVL)
+            if outline_level_element is not None and outline_level_element.get(docx_xpath.W_VAL):
+                outline_level = int(outline_level_element.get(docx_xpath.W_VAL))
+            numbering_element = paragraph_props.find(docx_xpath.W_NUM_PR)
+            if numbering_element is not None:
+                numbering = read_numbering_props(numbering_element)
+
+        return ResolvedStyle(
+            style_id=style.get(docx_xpath.W_STYLE_ID),
+            name=values["name"],
+            based_on=values["based_on"],
+            outline_level=outline_level,
+            numbering=numbering,
+            heading_level=None,
+        )
+
 
 class DocxParser:
     """Парсер содержимого документа docx.
     Конвертирует содержимое документа в массив структурных компонент согласно структуре
 
       Attributes:
-        images_dir: Путь до папки для сохранения изображений
+        images_dir: Путь до папки для сохранения изображений, None - изображения передаются в компонентах как data URL
         structure_manager: Инстанс класса StructureManager с методами для применения структуры к элементам документа
-        xml_manager: Инстанс класса DocxXmlManager с изображениями и lxml деревьями основного содержимого, стилей, нумерации, связей документа
+        xml_manager: Инстанс класса DocxXmlManager с архивом документа и lxml деревьями основного содержимого, стилей, нумерации, связей документа
         image_parser: Инстанс класса ImageParser с методом для парсинга изображений
         table_parser: Инстанс класса TableParser с методом для парсинга таблиц
         text_parser: Инстанс класса TextParser с методом для парсинга текста
         numbering_manager: Инстанс класса NumberingManager с методами для работы с нумерацией внутри документа
         nesting_manager: Инстанс класса NestingManager с методами для вычисления уровня вложенности для каждого элемента
-        style_id_to_numberings_data: Словарь взаимоотношений идентификатора стиля к данным нумерации - идентификатору и уровню нумерации
+        numbering_index: Инстанс класса NumberingIndex с разрешенными данными нумерации документа
+        style_graph: Инстанс класса StyleGraph со свойствами стилей документа с учетом наследования
+        timer: Замеры длительности этапов обработки документа и счетчики элементов
+        BLOCK_CONTAINER_TAGS: Теги элементов-контейнеров, внутри которых могут находиться блочные элементы
+        DEFINITIONS_CACHE: Общий для всех документов процесса кеш графов стилей и индексов нумерации
+          по хешу исходных байт styles.xml и numbering.xml. Размер задается переменной окружения STYLE_CACHE_SIZE
     """
 
-    def __init__(self, document: bytes, structure: dict, image_save_subfolder: str) -> None:
+    BLOCK_CONTAINER_TAGS = frozenset(
+        (docx_xpath.W_BODY, docx_xpath.W_SDT, docx_xpath.W_SDT_CONTENT, docx_xpath.W_CUSTOM_XML)
+    )
+    DEFINITIONS_CACHE = LRUCache(int(os.getenv("STYLE_CACHE_SIZE", 64)))
+
+    def __init__(
+            self,
+            document: bytes,
+            structure: dict | StructureManager,
+            image_save_subfolder: Optional[str],
+            file_writer: Optional[BackgroundFileWriter] = None,
+            timer: Optional[StageTimer] = None
+    ) -> None:
         """Инициализирует объект класса DocxParser
 
         Arguments:
           document: Байты docx документа
-          structure: Словарь с данными структуры
-          image_save_subfolder: Подпапка для сохранения картинок
+          structure: Словарь с данными структуры или заранее созданный StructureManager
+          image_save_subfolder: Подпапка для сохранения картинок, если не указана - картинки не сохраняются на диск,
+            а передаются в компонентах как data URL
+          file_writer: Фоновая запись изображений, если не передана - изображения сохраняются сразу при парсинге
+          timer: Сборщик замеров этапов, если не передан - создается новый
         """
-        self.structure_manager = StructureManager(structure)
+        self.timer = timer or StageTimer()
+        self.timer.count("document_bytes", len(document))
+        self.structure_manager = (
+            structure if isinstance(structure, StructureManager) else StructureManager(structure)
+        )
         self.images_dir = image_save_subfolder
-        self.xml_manager = DocxXmlManager(document)
-        self.table_parser = TableParser(self.xml_manager, self.parse)
-        self.image_parser = ImageParser(self.xml_manager, self.images_dir)
-        self.text_parser = TextParser(self.xml_manager)
-        self.numbering_manager = NumberingManager()
-        self.nesting_manager = NestingManager()
-        self.style_id_to_numberings_data = self._parse_numbering_in_styles()
+        with self.timer.stage("docx_load"):
+            self.xml_manager = DocxXmlManager(document)
+        with self.timer.stage("parser_init"):
+            self.style_graph = self._get_definitions(
+                StyleGraph, self.xml_manager.styles_data, lambda: self.xml_manager.styles_root
+            )
+            self.table_parser = TableParser(self.xml_manager, self.parse)
+            self.image_parser = ImageParser(self.xml_manager, self.images_dir, file_writer, self.timer)
+            self.text_parser = TextParser(self.xml_manager, self.style_graph)
+            self.numbering_manager = NumberingManager()
+            self.nesting_manager = NestingManager()
+            self.numbering_index = self._get_definitions(
+                NumberingIndex, self.xml_manager.numberings_data, lambda: self.xml_manager.numberings_root
+            )
+
+    def _get_definitions(self, definitions_class, data: Optional[bytes], get_root):
+        """Возвращает граф стилей или индекс нумерации из общего кеша, при отсутствии - строит и сохраняет в кеш.
+        Построенные объекты не изменяются при парсинге, поэтому один объект разделяется всеми документами
+        с одинаковым содержимым файла
+
+        Args:
+          definitions_class: Класс StyleGraph или NumberingIndex
+          data: Исходные байты xml файла, по хешу которых выполняется поиск в кеше
+          get_root: Функция получения корня xml файла, вызывается только при отсутствии записи в кеше
+
+        Returns:
+          Инстанс definitions_class
+        """
+        key = (definitions_class.__name__, hashlib.sha256(data).hexdigest() if data is not None else None)
+        definitions = self.DEFINITIONS_CACHE.get(key)
+        if definitions is not None:
+            self.timer.count("definitions_cache_hits")
+            return definitions
+
+        definitions = definitions_class(get_root())
+        self.DEFINITIONS_CACHE.set(key, definitions)
+        return definitions
 
     def get_structure_components(self) -> List[dict]:
-        """Получает список всех структурных компонент документа
+        """Получает список всех структурных компонент документа.
+        Парсинг и применение структуры замеряются отдельно, время сохранения изображений входит в этап парсинга
 
         Returns:
           Список структурных компонент документа
         """
-        return list(self.structure_manager.apply_structure(self.parse(self.xml_manager.main_content_root)))
+        with self.timer.stage("parse"):
+            elements = list(self.parse(self.xml_manager.main_content_root))
+        self.timer.count("elements", len(elements))
+
+        with self.timer.stage("apply_structure"):
+            components = list(self.structure_manager.apply_structure(iter(elements)))
+        self.timer.count("components", len(components))
+        return components
+
+    def iter_structure_components(self) -> Generator[dict, None, None]:
+        """Перебирает структурные компоненты документа по мере их получения, не собирая их в список.
+        Парсинг и применение структуры чередуются, поэтому отдельно не замеряются
+
+        Returns:
+          Генератор структурных компонент документа
+        """
+        root = self.xml_manager.main_content_root
+        for component in self.structure_manager.apply_structure(self.parse(root)):
+            self.timer.count("components")
+            yield component
 
     def parse(
             self, root_element: etree.Element
     ) -> Generator[IParserElement, None, None]:
-        """Конвертирует содержимое элемента в JSON-объект и выполняет вычисление уровня вложенности каждого элемента
+        """Конвертирует содержимое элемента в JSON-объект и выполняет вычисление уровня вложенности каждого элемента.
+        Обход выполняется за один проход по блочным элементам в порядке их следования в документе
 
         Args:
-          root_element: Элемент для парсинга
+          root_element: Элемент для парсинга - корень документа, `<w:body>` или ячейка `<w:tc>`
 
         Returns:
           Генератор JSON-объектов содержимого документа для последующего преобразования объектов к структуре
         """
-        is_parse_cell_items = (
-                root_element.tag == f'{{{self.xml_manager.NAMESPACES["w"]}}}tc'
-        )
+        is_parse_cell_items = root_element.tag == docx_xpath.W_TC
 
-        exclude_ancestor_condition = (
-            "" if is_parse_cell_items else "[not(ancestor::w:tbl)]"
-        )
-        iterator = root_element.xpath(
-            f".//w:tbl | .//w:p{exclude_ancestor_condition}",
-            namespaces=self.xml_manager.NAMESPACES,
-        )
-
-        for element in iterator:
-            parsed_item = None
-            if element.tag == f'{{{self.xml_manager.NAMESPACES["w"]}}}tbl':
+        for element in self._iter_block_elements(root_element):
+            paragraph_props = None
+            if element.tag == docx_xpath.W_TBL:
                 parsed_item = self.table_parser.parse(element)
-            elif (
-                    element.find(".//pic:blipFill", namespaces=self.xml_manager.NAMESPACES)
-                    is not None
-            ):
-                parsed_item = self.image_parser.parse(element)
             else:
-                parsed_item = self.text_parser.parse(element)
+                paragraph_props = read_paragraph_properties(element)
+                if paragraph_props.has_drawing:
+                    parsed_item = self.image_parser.parse(paragraph_props)
+                else:
+                    parsed_item = self.text_parser.parse(paragraph_props)
 
             if parsed_item is None:
                 continue
@@ -179,11 +651,11 @@ class DocxParser:
             if is_parse_cell_items:
                 parsed_item.is_cell_element = True
 
-            if numbering_props := self._find_numbering(element):
+            if paragraph_props and (numbering_props := self._find_numbering(paragraph_props)):
                 if not self.numbering_manager.has_numbering(
                         numbering_props.id, numbering_props.ilvl
                 ):
-                    numbering_data = self._get_numbering_data(numbering_props)
+                    numbering_data = self.numbering_index.get(numbering_props)
                     self.numbering_manager.add_numbering_data(
                         numbering_props.id, numbering_props.ilvl, numbering_data
                     )
@@ -197,169 +669,44 @@ class DocxParser:
             parsed_item.nesting_level = self.nesting_manager.get_level(parsed_item)
             yield parsed_item
 
-    def _find_numbering(self, element: etree.Element) -> Optional[NumberingProps]:
-        """Исследует элемент на наличие в нем нумерации, при наличии возвращает свойства найденной нумерации.
-        Обрабатывается 2 вида нумерации - вшитой в стиль и внешней, при наличии обоих одновременно приоритет всегда у внешней.
-        Таблица - блочный элемент, не может быть элементом нумерации
+    def _iter_block_elements(
+            self, container: etree.Element
+    ) -> Generator[etree.Element, None, None]:
+        """Перебирает блочные элементы (таблицы и абзацы) среди прямых потомков контейнера.
+        Содержимое вложенных таблиц не перебирается - оно обрабатывается парсером таблиц.
+        В элементы-контейнеры (тело документа, элементы управления содержимым) выполняется спуск
 
         Args:
-            element: Произвольный элемент документа - например, `<w:tc>`, `<pic:blipFill>`, `<w:p>` и так далее
+          container: Элемент, содержащий блочные элементы - например, `<w:document>`, `<w:body>` или `<w:tc>`
 
         Returns:
-            Свойства нумерации - id из тега `<w:numId>` и ilvl из тега `<w:ilvl>`
+          Генератор элементов `<w:tbl>` и `<w:p>` в порядке их следования в документе
         """
-        if element.tag == f'{{{self.xml_manager.NAMESPACES["w"]}}}tbl':
-            return None
+        for child in container.iterchildren():
+            if child.tag == docx_xpath.W_P or child.tag == docx_xpath.W_TBL:
+                yield child
+            elif child.tag in self.BLOCK_CONTAINER_TAGS:
+                yield from self._iter_block_elements(child)
 
-        numbering_element = element.find(
-            ".//w:numPr", namespaces=self.xml_manager.NAMESPACES
-        )
-        if numbering_element is not None:
-            numbering_data = self._parse_numbering_props(numbering_element)
-            return numbering_data if numbering_data.id != "0" else None
-
-        style_id = element.xpath(
-            ".//w:pStyle/@w:val", namespaces=self.xml_manager.NAMESPACES
-        )
-        if style_id and self.style_id_to_numberings_data.get(style_id[0]):
-            return self.style_id_to_numberings_data[style_id[0]]
-
-        return None
-
-    def _get_numbering_data(
-            self, numbering_props: NumberingProps
-    ) -> Optional[NumberingItem]:
-        """Выполняет парсинг данных нумерации
+    def _find_numbering(self, paragraph_props: ParagraphProperties) -> Optional[NumberingProps]:
+        """Определяет нумерацию абзаца по его свойствам.
+        Обрабатывается 2 вида нумерации - вшитой в стиль и внешней, при наличии обоих одновременно приоритет всегда у внешней
 
         Args:
-            numbering_props: Свойства нумерации - идентификатор и уровень
+            paragraph_props: Свойства абзаца, прочитанные read_paragraph_properties
 
         Returns:
-            Данные нумерации при существовании нумерации
-        """
-        numbering_element = self.xml_manager.numberings_root.xpath(
-            f'.//w:num[@w:numId="{numbering_props.id}"]',
-            namespaces=self.xml_manager.NAMESPACES,
-        )
-        if not numbering_element:
-            return None
-
-        numbering_data = self._parse_numbering_data(
-            numbering_props.id, numbering_props.ilvl
-        )
-
-        if numbering_element[0].xpath(
-                f'.//w:lvlOverride[@w:ilvl="{numbering_props.ilvl}"]',
-                namespaces=self.xml_manager.NAMESPACES,
-        ):
-            overrided_numbering_data = self._parse_numbering_data(
-                numbering_props.id,
-                numbering_props.ilvl,
-                True,
-            )
-            numbering_data = NumberingItem(
-                format=overrided_numbering_data.format or numbering_data.format,
-                startValue=overrided_numbering_data.startValue
-                           or numbering_data.startValue,
-                text=overrided_numbering_data.text or numbering_data.text,
-            )
-        return numbering_data
-
-    def _parse_numbering_props(self, element: etree.Element) -> NumberingProps:
-        """Парсит свойства нумерации - идентификатор и уровень
-
-        Args:
-          element: Произвольный элемент документа - например, `<w:tc>`, `<pic:blipFill>`, `<w:p>` и так далее
-
-        Returns:
-          Свойства нумерации
-        """
-
-        numbering_id = element.xpath(
-            "./w:numId/@w:val", namespaces=self.xml_manager.NAMESPACES
-        )[0]
-        numbering_level = element.xpath(
-            "./w:ilvl/@w:val", namespaces=self.xml_manager.NAMESPACES
-        )
-        numbering_level = int(numbering_level[0]) if numbering_level else 0
-        return NumberingProps(id=numbering_id, ilvl=numbering_level)
-
-    def _parse_numbering_data(
-            self,
-            numbering_id: int,
-            ilvl: int,
-            for_overriding: bool = False,
-    ) -> Optional[NumberingItem]:
-        """Парсит данные нумерации
-
-        Args:
-          numbering_id: Идентификатор нумерации
-          ilvl: Уровень нумерации
-          for_overriding [optional]: Флаг, извлекать данные нумерации для перезаписи или нет
-
-        Returns:
-          Данные нумерации
+            Свойства нумерации - id из тега `<w:numId>` и ilvl из тега `<w:ilvl>`
         """
-        level_element = None
-        if for_overriding:
-            level_element = self.xml_manager.numberings_root.xpath(
-                f".//w:num[@w:numId='{numbering_id}']/w:lvlOverride[@w:ilvl='{ilvl}']/w:lvl",
-                namespaces=self.xml_manager.NAMESPACES,
-            )
-        else:
-            abstract_numbering_id = self.xml_manager.numberings_root.xpath(
-                f".//w:num[@w:numId='{numbering_id}']/w:abstractNumId/@w:val",
-                namespaces=self.xml_manager.NAMESPACES,
-            )
-            level_element = self.xml_manager.numberings_root.xpath(
-                f".//w:abstractNum[@w:abstractNumId='{abstract_numbering_id[0]}']/w:lvl[@w:ilvl='{ilvl}']",
-                namespaces=self.xml_manager.NAMESPACES,
-            )
-
-        if not level_element:
-            return None
-
-        numbering_format = level_element[0].xpath(
-            ".//w:numFmt/@w:val", namespaces=self.xml_manager.NAMESPACES
-        )
-        if not numbering_format or numbering_format[0] == "none":
-            return None
-
-        numbering_text = level_element[0].xpath(
-            ".//w:lvlText/@w:val", namespaces=self.xml_manager.NAMESPACES
-        )
-        numbering_start_value = level_element[0].xpath(
-            ".//w:start/@w:val", namespaces=self.xml_manager.NAMESPACES
-        )
-
-        return NumberingItem(
-            format=numbering_format[0],
-            startValue=int(numbering_start_value[0]),
-            text=numbering_text[0] if numbering_text else "",
-        )
-
-    def _parse_numbering_in_styles(self) -> dict[str, NumberingProps]:
-        """Выполняет предобработку данных стилей с вложенной нумерацией
+        numbering_props = paragraph_props.numbering
+        if numbering_props is not None:
+            return numbering_props if numbering_props.id != "0" else None
 
-        Returns:
-          Словарь взаимоотношений идентификатора стиля и данных нумерации
-        """
+        style_numbering_props = self.style_graph.get_numbering(paragraph_props.style_id)
+        if style_numbering_props and self.numbering_index.get(style_numbering_props):
+            return style_numbering_props
 
-        style_id_to_numberings_data = {}
-        for style_with_numbering in self.xml_manager.styles_root.xpath(
-                ".//w:style[.//w:numPr]", namespaces=self.xml_manager.NAMESPACES
-        ):
-            style_id = style_with_numbering.get(
-                f"{{{self.xml_manager.NAMESPACES['w']}}}styleId"
-            )
-            numbering_element = style_with_numbering.find(
-                ".//w:numPr", namespaces=self.xml_manager.NAMESPACES
-            )
-            numbering_props = self._parse_numbering_props(numbering_element)
-            numbering_data = self._get_numbering_data(numbering_props)
-            if numbering_data:
-                style_id_to_numberings_data[style_id] = numbering_props
-        return style_id_to_numberings_data
+        return None
 
 
 class ImageParser:
@@ -368,84 +715,95 @@ class ImageParser:
 
     Attributes:
       xml_manager: Инстанс класса DocxXmlManager
-      images_dir: Директория для сохранения изображений
+      images_dir: Директория для сохранения изображений, None - изображения передаются как data URL
+      file_writer: Фоновая запись изображений
+      timer: Сборщик замеров сохранения изображений
     """
 
-    def __init__(self, xml_manager: DocxXmlManager, images_dir: str) -> None:
+    def __init__(
+            self,
+            xml_manager: DocxXmlManager,
+            images_dir: Optional[str],
+            file_writer: Optional[BackgroundFileWriter] = None,
+            timer: Optional[StageTimer] = None
+    ) -> None:
         """Инициализирует объект класса ImageParser
 
         Args:
           xml_manager: Инстанс класса DocxXmlManager
-          images_dir: Директория для сохранения изображений
+          images_dir: Директория для сохранения изображений, если не указана - изображения не сохраняются на диск,
+            а передаются как data URL
+          file_writer: Фоновая запись изображений, если не передана - изображения сохраняются сразу
+          timer: Сборщик замеров сохранения изображений
         """
         self.xml_manager = xml_manager
         self.images_dir = images_dir
+        self.file_writer = file_writer
+        self.timer = timer or StageTimer()
 
-    def parse(self, image_element: etree.Element) -> Optional[ImageElement]:
+    def parse(self, paragraph_props: ParagraphProperties) -> Optional[ImageElement]:
         """Выполняет парсинг и сохранение изображения
 
         Args:
-          image_element: Элемент `<w:p>`, содержащий внешнее изображение `<pic:blipFill>`
+          paragraph_props: Свойства абзаца `<w:p>`, содержащего внешнее изображение `<pic:blipFill>`
 
         Returns:
           JSON-объект данных изображения, если изображение существует, иначе None
         """
-        embed_id = self._get_embed_id(image_element)
+        embed_id = paragraph_props.embed_id
         if not embed_id:
             return None
 
-        image_path = self._get_internal_file_path(embed_id)
+        image_path = self.xml_manager.get_relationship_target(embed_id)
         if not image_path:
             return None
 
-        if image_data := self.xml_manager.images_raw_data.get(
-                os.path.basename(image_path)
-        ):
-            image_extension = os.path.splitext(image_path)[1]
-            return ImageElement(
-                data=urljoin(os.getenv("BACKEND_EXTERNAL_URL"), FileUtils.save(self.images_dir, image_data, image_extension))
-            )
-
-        return None
-
-    def _get_embed_id(self, element: etree.Element) -> Optional[str]:
-        """Получает идентификатор отношения из элемента
-
-        Args:
-          element: Элемент `<w:p>`, содержащий внешнее изображение `<pic:blipFill>`
-
-        Returns:
-          Идентификатор найденного отношения, если оно присутствует
-        """
-        embed = element.xpath(".//@odr:embed", namespaces=self.xml_manager.NAMESPACES)
-        return embed[0] if embed else None
+        image_name = os.path.basename(image_path)
+        image_stream = self.xml_manager.open_media(image_name)
+        if image_stream is None:
+            return None
 
-    def _get_internal_file_path(self, embed_id: str) -> Optional[str]:
-        """Получает путь до изображения по embed ID через отношения
+        image_extension = os.path.splitext(image_path)[1]
+        with self.timer.stage("images"):
+            if self.images_dir is None:
+                with image_stream:
+                    image_url = FileUtils.to_data_url(image_stream.read(), image_extension)
+            else:
+                image_url = urljoin(os.getenv("BACKEND_EXTERNAL_URL"), self._save(image_stream, image_extension))
+            self.timer.count("images")
+            self.timer.count("image_bytes", self.xml_manager.get_media_size(image_name))
+        return ImageElement(data=image_url)
 
-        Args:
-          embed_id: Идентификатор отношения
+    def _save(self, image_stream: IO[bytes], image_extension: str) -> Optional[str]:
+        """Сохраняет изображение в images_dir: через фоновую запись, если она передана, иначе сразу
 
         Returns:
-          Путь до изображения, если изображение с указанным идентификатором существует
+          Относительный путь до сохраненного изображения
         """
-        image_path = self.xml_manager.relations_root.xpath(
-            f'.//r:Relationship[@Id="{embed_id}"]/@Target',
-            namespaces=self.xml_manager.NAMESPACES,
-        )
-        return image_path[0] if image_path else None
+        if self.file_writer is not None:
+            return self.file_writer.submit(
+                self.images_dir, image_stream, image_extension, FileUtils.is_content_addressed()
+            )
+        with image_stream:
+            if FileUtils.is_content_addressed():
+                return FileUtils.save_stream_by_content(self.images_dir, image_stream, image_extension)
+            return FileUtils.save_stream(self.images_dir, image_stream, image_extension)
 
 
 class TableParser:
     """Парсер таблиц в docx.
+    Сетка таблицы строится за один проход по строкам и ячейкам: горизонтальное объединение учитывается
+    по gridSpan, вертикальное - через незакрытые объединения по номеру колонки сетки
 
     Attributes:
       parser: Метод для обработки содержимого ячейки
       xml_manager: Инстанс класса DocxXmlManager
     """
 
+    CONTAINER_TAGS = frozenset((docx_xpath.W_SDT, docx_xpath.W_SDT_CONTENT, docx_xpath.W_CUSTOM_XML))
+
     def __init__(self, xml_manager: DocxXmlManager, parser) -> None:
-        """Инициализирует объект класса ImageParser
+        """Инициализирует объект класса TableParser
 
         Args:
           parser: Метод для обработки содержимого ячейки
@@ -454,7 +812,8 @@ class TableParser:
         self.xml_manager = xml_manager
 
     def parse(self, element: etree.Element) -> TableElement:
-        """Выполняет парсинг данных каждой ячейки таблицы и их преобразование
+        """Выполняет парсинг данных каждой ячейки таблицы и их преобразование.
+        Обрабатываются только строки и ячейки самой таблицы, вложенные таблицы обрабатываются как содержимое ячеек
 
         Args:
           element: Элемент-таблица `<w:tbl>`
@@ -463,138 +822,96 @@ class TableParser:
           JSON-объект табличных данных
         """
         table_data = []
-        row_elements = element.findall(
-            ".//w:tr", namespaces=self.xml_manager.NAMESPACES
-        )
+        open_vertical_merges: dict[int, CellElement] = {}
 
-        for row_index, row_element in enumerate(row_elements):
+        for row_element in self._iter_children(element, docx_xpath.W_TR):
             row_data = []
+            col_index = self._get_grid_before(row_element)
 
-            for cell_element in row_element.findall(
-                    ".//w:tc", namespaces=self.xml_manager.NAMESPACES
-            ):
-                if self._is_merged(cell_element):
+            for cell_element in self._iter_children(row_element, docx_xpath.W_TC):
+                cell_width = self._get_cell_width(cell_element)
+                vertical_merge = self._get_vertical_merge(cell_element)
+
+                if vertical_merge == "continue":
+                    if merged_cell := open_vertical_merges.get(col_index):
+                        merged_cell.cols += 1
+                        merged_cell.merged = True
+                    col_index += cell_width
                     continue
 
-                cell_width = self._get_cell_width(cell_element)
-                cell_height = self._get_cell_height(
-                    row_elements, row_index, cell_element
-                )
+                for covered_col_index in range(col_index, col_index + cell_width):
+                    open_vertical_merges.pop(covered_col_index, None)
+
                 cell_data = CellElement(
                     data=list(self.parser(cell_element)),
                     rows=cell_width,
-                    cols=cell_height,
                 )
+                if vertical_merge == "restart":
+                    open_vertical_merges[col_index] = cell_data
                 row_data.append(cell_data)
+                col_index += cell_width
+
             table_data.append(RowElement(data=row_data))
 
         return TableElement(data=table_data)
 
-    def _is_merged(self, cell: etree.Element):
-        """Проверяет, объединена ли ячейка вертикально
+    def _iter_children(
+            self, element: etree.Element, tag: str
+    ) -> Generator[etree.Element, None, None]:
+        """Перебирает прямых потомков элемента с указанным тегом, выполняя спуск в элементы-контейнеры
 
         Args:
-          cell: Элемент-ячейка `<w:tc>`
+          element: Элемент таблицы `<w:tbl>` или строки `<w:tr>`
+          tag: Тег искомых потомков
 
         Returns:
-          Результат проверки на вертикальное объединение
+          Генератор найденных потомков в порядке следования в документе
         """
-        merge_element = cell.find(
-            ".//w:tcPr/w:vMerge", namespaces=self.xml_manager.NAMESPACES
-        )
-
-        if merge_element is None:
-            return False
+        for child in element.iterchildren():
+            if child.tag == tag:
+                yield child
+            elif child.tag in self.CONTAINER_TAGS:
+                yield from self._iter_children(child, tag)
 
-        merge_value = merge_element.get(f"{{{self.xml_manager.NAMESPACES['w']}}}val")
-        if not merge_value or merge_value == 'continue':
-            return True
-        return False
-
-    def _get_cell_width(self, cell: etree.Element) -> int:
-        """Вычисляет ширину ячейки таблицы
+    def _get_grid_before(self, row: etree.Element) -> int:
+        """Вычисляет количество колонок сетки, пропущенных перед первой ячейкой строки
 
         Args:
-          cell: Ячейка таблицы `<w:tc>`
+          row: Строка таблицы `<w:tr>`
 
         Returns:
-          Ширина ячейки
+          Количество пропущенных колонок
         """
-        cell_gridspan = cell.xpath(
-            ".//w:tcPr/w:gridSpan/@w:val", namespaces=self.xml_manager.NAMESPACES
-        )
-        return int(cell_gridspan[0]) if cell_gridspan else 1
+        grid_before = docx_xpath.ROW_GRID_BEFORE(row)
+        return int(grid_before[0]) if grid_before else 0
 
-    def _get_cell_height(
-            self, rows: List[etree.Element], cell_row_index: int, cell: etree.Element
-    ) -> int:
-        """Вычисляет высоту ячейки таблицы.
-        Ширина каждой ячейки вычисляется для корректной обработки объединенных по горизонтали ячеек
+    def _get_vertical_merge(self, cell: etree.Element) -> Optional[str]:
+        """Определяет вид вертикального объединения ячейки
 
         Args:
-          rows: Все строки таблицы `<w:tr>`
-          cell: Ячейка таблицы `<w:tc>`
-          cell_row_index: Индекс строки таблицы с ячейкой
+          cell: Элемент-ячейка `<w:tc>`
 
         Returns:
-          Высота ячейки таблицы
+          "restart" для первой ячейки объединения, "continue" для продолжения объединения, иначе None
         """
-        cell_height = 1
-        merge_element = cell.find(
-            ".//w:tcPr/w:vMerge", namespaces=self.xml_manager.NAMESPACES
-        )
-        if merge_element is None or not merge_element.get(
-                f"{{{self.xml_manager.NAMESPACES['w']}}}val"
-        ):
-            return cell_height
-
-        col_index = self._calc_cell_col_index(rows[cell_row_index], cell)
-        for row_elements in rows[cell_row_index + 1::]:
-            current_cell_index = -1
-
-            for cell_element in row_elements.findall(
-                    ".//w:tc", namespaces=self.xml_manager.NAMESPACES
-            ):
-                current_cell_index += self._get_cell_width(cell_element)
-                if current_cell_index != col_index:
-                    continue
-
-                vertical_merge_element = cell_element.find(
-                    ".//w:tcPr/w:vMerge", namespaces=self.xml_manager.NAMESPACES
-                )
-                if vertical_merge_element is None:
-                    break
-
-                vertical_merged = vertical_merge_element.get(
-                    f'{{{self.xml_manager.NAMESPACES["w"]}}}val'
-                )
-                if not vertical_merged or vertical_merged == "continue":
-                    cell_height += 1
+        merge_element = cell.find(docx_xpath.FIND_VERTICAL_MERGE)
+        if merge_element is None:
+            return None
 
-        return cell_height
+        merge_value = merge_element.get(docx_xpath.W_VAL)
+        return "continue" if not merge_value or merge_value == "continue" else "restart"
 
-    def _calc_cell_col_index(
-            self, row: etree.Element, cell: etree.Element
-    ) -> int:
-        """Вычисляет точный индекс колонки, содержащей ячейку
-          Нужен для корректного учета ячеек, занимающих более одной колонки в ширину и находящихся перед искомой
+    def _get_cell_width(self, cell: etree.Element) -> int:
+        """Вычисляет ширину ячейки таблицы
 
-          Args:
-          row: Строка, содержащая ячейку `<w:tr>`
+        Args:
           cell: Ячейка таблицы `<w:tc>`
 
         Returns:
-          Индекс колонки в таблице
+          Ширина ячейки
         """
-        col_index = -1
-
-        for cell_element in row.xpath(
-                ".//w:tc", namespaces=self.xml_manager.NAMESPACES
-        ):
-            col_index += self._get_cell_width(cell_element)
-            if cell_element == cell:
-                break
-        return col_index
+        cell_gridspan = docx_xpath.CELL_GRID_SPAN(cell)
+        return int(cell_gridspan[0]) if cell_gridspan else 1
 
 
 class TextParser:
@@ -602,101 +919,37 @@ class TextParser:
 
     Attributes:
       xml_manager: Инстанс класса DocxXmlManager
-      style_id_to_heading_level: Словарь взаимоотношений идентификатора стиля и уровня заголовка
+      style_graph: Инстанс класса StyleGraph с уровнями заголовков стилей
     """
 
-    def __init__(self, xml_manager: DocxXmlManager) -> None:
-        """Инициализирует объект класса TextParser и выполняет необходимые предобработки
+    def __init__(self, xml_manager: DocxXmlManager, style_graph: Optional[StyleGraph] = None) -> None:
+        """Инициализирует объект класса TextParser
 
         Args:
           xml_manager: Инстанс класса DocxXmlManager
+          style_graph: Граф стилей документа, если не передан - строится по стилям xml_manager
         """
         self.xml_manager = xml_manager
-        self.style_id_to_heading_level = self._parse_header_levels()
+        self.style_graph = style_graph or StyleGraph(xml_manager.styles_root)
 
-    def parse(self, element: etree.Element) -> Optional[TextElement]:
+    def parse(self, paragraph_props: ParagraphProperties) -> Optional[TextElement]:
         """Преобразует параграф в JSON-объект текстовых данных
         Если параграф имеет два вида нумерации - в стиле и в самом параграфе непосредственно, то приоритет отдается нумерации в параграфе, нумерация в стиле игнорируется
 
         Args:
-          element: Элемент-абзац `<w:p>` с элементами `<w:t>`
+          paragraph_props: Свойства абзаца `<w:p>`, прочитанные read_paragraph_properties
 
         Returns:
           JSON-объект текстовых данных
         """
-        paragraph_text = self._extract_paragraph_text(element)
-
-        if not paragraph_text:
+        if not paragraph_props.text:
             return None
 
-        paragraph_data = TextElement(data=paragraph_text)
-        style_id = element.xpath(
-            ".//w:pStyle/@w:val", namespaces=self.xml_manager.NAMESPACES
-        )
+        paragraph_data = TextElement(data=paragraph_props.text)
+        style_id = paragraph_props.style_id
 
         if style_id:
-            style_id = style_id[0]
             paragraph_data.style_id = style_id
-            paragraph_data.header_level = self.style_id_to_heading_level.get(style_id)
+            paragraph_data.header_level = self.style_graph.get_heading_level(style_id)
 
         return paragraph_data
-
-    def _extract_paragraph_text(self, element: etree.Element) -> str:
-        """Собирает все фрагменты текста в единое целое и корректно обрабатывает новые строки
-
-        Args:
-          element: Элемент `<w:p>` с элементами `<w:t>`
-
-        Returns:
-          Текст элемента
-        """
-        text_parts = []
-        for node in element.xpath(
-                ".//w:t | .//w:br", namespaces=self.xml_manager.NAMESPACES
-        ):
-            if node.tag == f'{{{self.xml_manager.NAMESPACES["w"]}}}br':
-                text_parts.append("\n")
-            elif node.text:
-                text_parts.append(node.text)
-        return "".join(text_parts).strip()
-
-    def _parse_header_levels(self) -> dict[str, int]:
-        """Парсит стили заголовков и запоминает их уровни.
-        При обработке учитывает наличие пользовательских стилей заголовков, основанных на стандартных
-
-        Returns:
-          Словарь взаимоотношений идентификатора стиля и уровня заголовка
-        """
-        style_id_to_heading_level = {}
-        header_level_shift = 1
-        main_title = self.xml_manager.styles_root.xpath(
-            './/w:style[w:name/@w:val="Title"]',
-            namespaces=self.xml_manager.NAMESPACES,
-        )
-        if main_title:
-            style_id_to_heading_level[
-                main_title[0].get(f"{{{self.xml_manager.NAMESPACES['w']}}}styleId")
-            ] = 1
-            header_level_shift += 1
-
-        for header_style in self.xml_manager.styles_root.xpath(
-                ".//w:style[.//w:outlineLvl]", namespaces=self.xml_manager.NAMESPACES
-        ):
-            style_id = header_style.get(
-                f"{{{self.xml_manager.NAMESPACES['w']}}}styleId"
-            )
-            header_level = int(
-                header_style.xpath(
-                    ".//w:outlineLvl/@w:val", namespaces=self.xml_manager.NAMESPACES
-                )[0]
-            )
-            style_id_to_heading_level[style_id] = header_level + header_level_shift
-
-            based_headers_ids = self.xml_manager.styles_root.xpath(
-                f'.//w:style[w:basedOn/@w:val="{style_id}"]/@w:styleId',
-                namespaces=self.xml_manager.NAMESPACES,
-            )
-            for based_header_id in based_headers_ids:
-                style_id_to_heading_level[based_header_id] = header_level
-
-        return style_id_to_heading_level
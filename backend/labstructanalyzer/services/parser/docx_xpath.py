@@ -0,0 +1,78 @@
+"""Реестр пространств имен, тегов и скомпилированных XPath выражений для парсинга docx.
+Все выражения компилируются один раз при импорте модуля и переиспользуются всеми парсерами,
+теги и атрибуты хранятся в нотации Кларка (`{namespace}name`) для прямого сравнения с `element.tag`
+"""
+from lxml import etree
+
+NAMESPACES = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "pic": "http://schemas.openxmlformats.org/drawingml/2006/picture",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "odr": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+}
+
+
+def _clark(prefix: str, name: str) -> str:
+    """Возвращает имя тега или атрибута в нотации Кларка"""
+    return f"{{{NAMESPACES[prefix]}}}{name}"
+
+
+def _xpath(expression: str) -> etree.XPath:
+    """Компилирует XPath выражение с пространствами имен docx"""
+    return etree.XPath(expression, namespaces=NAMESPACES)
+
+
+# Теги основного содержимого
+W_BODY = _clark("w", "body")
+W_P = _clark("w", "p")
+W_TBL = _clark("w", "tbl")
+W_TR = _clark("w", "tr")
+W_TC = _clark("w", "tc")
+W_BR = _clark("w", "br")
+W_SDT = _clark("w", "sdt")
+W_SDT_CONTENT = _clark("w", "sdtContent")
+W_CUSTOM_XML = _clark("w", "customXml")
+
+# Теги свойств и содержимого абзаца
+W_P_PR = _clark("w", "pPr")
+W_P_STYLE = _clark("w", "pStyle")
+W_NUM_PR = _clark("w", "numPr")
+W_T = _clark("w", "t")
+PIC_BLIP_FILL = _clark("pic", "blipFill")
+A_BLIP = _clark("a", "blip")
+
+# Теги стилей
+W_STYLE = _clark("w", "style")
+W_NAME = _clark("w", "name")
+W_BASED_ON = _clark("w", "basedOn")
+W_OUTLINE_LVL = _clark("w", "outlineLvl")
+
+# Теги нумерации
+W_ABSTRACT_NUM = _clark("w", "abstractNum")
+W_ABSTRACT_NUM_ID = _clark("w", "abstractNumId")
+W_NUM = _clark("w", "num")
+W_LVL = _clark("w", "lvl")
+W_LVL_OVERRIDE = _clark("w", "lvlOverride")
+W_START_OVERRIDE = _clark("w", "startOverride")
+W_NUM_FMT = _clark("w", "numFmt")
+W_START = _clark("w", "start")
+W_LVL_TEXT = _clark("w", "lvlText")
+
+# Теги отношений
+R_RELATIONSHIP = _clark("r", "Relationship")
+
+# Атрибуты. Имена w:ilvl и w:numId совпадают с именами одноименных тегов и используются для них же
+W_VAL = _clark("w", "val")
+W_STYLE_ID = _clark("w", "styleId")
+W_ILVL = _clark("w", "ilvl")
+W_NUM_ID = _clark("w", "numId")
+W_ABSTRACT_NUM_ID_ATTRIBUTE = _clark("w", "abstractNumId")
+ODR_EMBED = _clark("odr", "embed")
+
+# Выражения ElementPath в нотации Кларка для element.find
+FIND_VERTICAL_MERGE = f"./{_clark('w', 'tcPr')}/{_clark('w', 'vMerge')}"
+
+# Скомпилированные XPath выражения
+CELL_GRID_SPAN = _xpath("./w:tcPr/w:gridSpan/@w:val")
+ROW_GRID_BEFORE = _xpath("./w:trPr/w:gridBefore/@w:val")
@@ -0,0 +1,472 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
+from typing import AsyncGenerator, Callable, Optional
+from urllib.parse import urljoin, urlparse
+
+from labstructanalyzer.core.exceptions import ParseWorkerCrashedException
+from labstructanalyzer.services.parser.docx import DocxParser
+from labstructanalyzer.utils.file_utils import FileUtils
+from labstructanalyzer.utils.file_writer import BackgroundFileWriter
+from labstructanalyzer.utils.parse_result_cache import ParseResultCache
+from labstructanalyzer.utils.parser.base_definitions import ParserElementType
+from labstructanalyzer.utils.stage_timer import StageTimer
+from labstructanalyzer.utils.parser.structure.structure_cache import CompiledStructure, CourseStructure, \
+    CourseStructureCache, StructureCache
+
+_worker_structure: Optional[StructureCache] = None
+_worker_course_structures: Optional[CourseStructureCache] = None
+_worker_file_writer: Optional[BackgroundFileWriter] = None
+
+STREAM_TIMEOUT_SECONDS = 1
+
+
+def init_worker(structure_path: str) -> None:
+    """Инициализирует процесс-обработчик: загружает и компилирует структуру один раз на процесс,
+    создает фоновую запись изображений. lxml и модули парсера загружаются при импорте этого модуля.
+    Структура перечитывается только тогда, когда основной процесс передает задачу с другим отпечатком структуры.
+    Структуры курсов компилируются при первом использовании и хранятся в LRU кеше процесса
+
+    Args:
+        structure_path: Путь до файла структуры
+    """
+    global _worker_structure, _worker_course_structures, _worker_file_writer
+    _worker_file_writer = BackgroundFileWriter()
+    _worker_structure = StructureCache(structure_path)
+    _worker_structure.get()
+    _worker_course_structures = CourseStructureCache()
+
+
+def get_worker_structure(structure_fingerprint: str, course_structure: Optional[CourseStructure]) -> CompiledStructure:
+    """Возвращает структуру для задачи процесса-обработчика: структуру курса, если она передана, иначе общую структуру
+
+    Args:
+        structure_fingerprint: Отпечаток общей структуры, загруженной основным процессом
+        course_structure: Структура курса из БД
+
+    Returns:
+        Скомпилированная структура
+    """
+    if course_structure is not None:
+        return _worker_course_structures.get(course_structure)
+    return _worker_structure.require(structure_fingerprint)
+
+
+def warm_up() -> int:
+    """Пустая задача для запуска процессов-обработчиков заранее
+
+    Returns:
+        PID процесса-обработчика
+    """
+    return os.getpid()
+
+
+def parse_document(
+        document: bytes, images_dir: str, structure_fingerprint: str, course_structure: Optional[CourseStructure] = None
+) -> tuple[list[dict], dict, str]:
+    """Выполняет парсинг документа внутри процесса-обработчика.
+    Изображения записываются в фоне во время парсинга, результат возвращается только после записи всех изображений,
+    поэтому шаблон сохраняется в БД, когда его файлы уже на диске. Если какое-либо изображение не удалось записать
+    или парсинг завершился ошибкой, уже записанные изображения документа удаляются
+
+    Args:
+        document: Байты docx документа
+        images_dir: Подпапка для сохранения изображений
+        structure_fingerprint: Отпечаток структуры, загруженной основным процессом
+        course_structure: Структура курса из БД, применяется вместо общей структуры
+
+    Returns:
+        Список структурных компонент документа в виде словарей, замеры этапов обработки (StageTimer.to_dict)
+        и отпечаток примененной структуры
+
+    Raises:
+        IOError: Не удалось записать изображения документа
+    """
+    timer = StageTimer()
+    structure = get_worker_structure(structure_fingerprint, course_structure)
+    try:
+        components = DocxParser(
+            document, structure.structure_manager, images_dir, _worker_file_writer, timer
+        ).get_structure_components()
+    except Exception:
+        _worker_file_writer.discard()
+        raise
+    with timer.stage("images_flush"):
+        failed_paths = _worker_file_writer.flush()
+    if failed_paths:
+        raise IOError(f"Не удалось сохранить изображения: {', '.join(failed_paths)}")
+    return components, timer.to_dict(), structure.fingerprint
+
+
+def stream_document(
+        document: bytes,
+        structure_fingerprint: str,
+        course_structure: Optional[CourseStructure],
+        output: queue.Queue,
+        cancelled
+) -> dict:
+    """Выполняет парсинг документа внутри процесса-обработчика, передавая каждую структурную компоненту в очередь
+    сразу после ее получения. Изображения не сохраняются на диск, а передаются в компонентах как data URL:
+    предпросмотр не создает шаблон, и на файлы изображений не ссылался бы ни один шаблон. Окончание передачи
+    обозначается значением None
+
+    Args:
+        document: Байты docx документа
+        structure_fingerprint: Отпечаток структуры, загруженной основным процессом
+        course_structure: Структура курса из БД, применяется вместо общей структуры
+        output: Ограниченная очередь строк JSON, при заполнении парсинг приостанавливается до чтения очереди
+        cancelled: Событие отмены - при его установке парсинг прекращается
+
+    Returns:
+        Замеры этапов обработки (StageTimer.to_dict)
+    """
+    timer = StageTimer()
+    try:
+        with timer.stage("stream"):
+            structure_manager = get_worker_structure(structure_fingerprint, course_structure).structure_manager
+            parser = DocxParser(document, structure_manager, None, timer=timer)
+            for component in parser.iter_structure_components():
+                if not _put_until_cancelled(output, json.dumps(component, ensure_ascii=False), cancelled):
+                    break
+    finally:
+        _put_until_cancelled(output, None, cancelled)
+    return timer.to_dict()
+
+
+def _put_until_cancelled(output: queue.Queue, item: Optional[str], cancelled) -> bool:
+    """Помещает значение в очередь, ожидая свободного места, пока передача не отменена
+
+    Returns:
+        Помещено ли значение в очередь
+    """
+    while not cancelled.is_set():
+        try:
+            output.put(item, timeout=STREAM_TIMEOUT_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class ParseService:
+    """
+    Сервис парсинга docx документов в пуле процессов.
+    Парсинг выполняется вне цикла событий, поэтому обработка больших документов не задерживает другие запросы.
+    Количество процессов задается переменной окружения PARSER_WORKERS, по умолчанию - количество ядер.
+
+    Результаты парсинга кешируются на диске по хешу документа и файла структуры, размер кеша задается
+    переменной окружения PARSE_CACHE_MAX_BYTES (0 - кеш отключен), папка - PARSE_CACHE_DIR.
+
+    Структура загружается при запуске и перезагружается без перезапуска процессов, если файл структуры изменился:
+    основной процесс проверяет файл не чаще раза в STRUCTURE_RELOAD_INTERVAL секунд и передает отпечаток структуры
+    с каждой задачей, процесс-обработчик перечитывает файл, только получив незнакомый отпечаток.
+    Курс может использовать собственную структуру из БД, она передается с задачей и компилируется процессом-обработчиком
+    один раз для каждой версии.
+
+    Для потоковой передачи компонент процессы-обработчики пишут в очереди, созданные менеджером очередей -
+    отдельным процессом, который запускается при первой потоковой обработке.
+
+    Если процесс-обработчик аварийно завершился (например, из-за нехватки памяти), пул процессов становится
+    непригодным: документ, при обработке которого это произошло, завершается ошибкой ParseWorkerCrashedException,
+    а пул пересоздается, и следующие документы обрабатываются новыми процессами
+    """
+
+    DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    STREAM_QUEUE_SIZE = 64
+
+    def __init__(self, structure_path: str):
+        self.structure_path = structure_path
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.workers: Optional[int] = None
+        self._executor_lock = threading.Lock()
+        self.manager: Optional[SyncManager] = None
+        self.cache: Optional[ParseResultCache] = None
+        self.structure = StructureCache(structure_path)
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """
+        Создает пул процессов и дожидается запуска всех процессов-обработчиков
+        """
+        if self.executor is not None:
+            return
+
+        self.structure.get()
+        self.workers = workers or int(os.getenv("PARSER_WORKERS") or 0) or os.cpu_count()
+        self.executor = self._create_executor()
+        for future in [self.executor.submit(warm_up) for _ in range(self.workers)]:
+            future.result()
+        self._init_cache()
+
+    def shutdown(self) -> None:
+        """
+        Останавливает пул процессов, отменяя задачи, которые еще не начали выполняться
+        """
+        if self.executor is None:
+            return
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = None
+        if self.manager is not None:
+            self.manager.shutdown()
+            self.manager = None
+
+    async def parse(
+            self,
+            document: bytes,
+            images_dir: str,
+            timer: Optional[StageTimer] = None,
+            course_structure: Optional[CourseStructure] = None
+    ) -> list[dict]:
+        """
+        Выполняет парсинг документа в пуле процессов и применяет к нему структуру
+
+        Args:
+            document: Байты docx документа
+            images_dir: Подпапка для сохранения изображений
+            timer: Сборщик замеров, в него добавляются этапы обработки из процесса-обработчика
+            course_structure: Структура курса из БД, если не указана - применяется общая структура
+
+        Returns:
+            Список структурных компонент документа в виде словарей
+        """
+        timer = timer or StageTimer()
+        if self.executor is None:
+            self.start()
+        structure_fingerprint = self._get_structure_fingerprint(course_structure)
+
+        cache_key = None
+        if self.cache is not None:
+            with timer.stage("parse_cache"):
+                cache_key = await asyncio.to_thread(self._get_cache_key, document, images_dir, structure_fingerprint)
+                components = await asyncio.to_thread(self._get_cached, cache_key)
+            if components is not None:
+                timer.count("parse_cache_hit")
+                return components
+
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        with timer.stage("parse_pool"):
+            try:
+                components, worker_timings, applied_fingerprint = await loop.run_in_executor(
+                    executor, parse_document, document, images_dir, structure_fingerprint, course_structure
+                )
+            except BrokenProcessPool as error:
+                self._replace_broken_executor(executor)
+                raise ParseWorkerCrashedException() from error
+        timer.merge(worker_timings)
+        if cache_key is not None and applied_fingerprint == structure_fingerprint:
+            await asyncio.to_thread(self.cache.put, cache_key, components)
+        return components
+
+    async def stream(
+            self,
+            document: bytes,
+            images_dir: str,
+            timer: Optional[StageTimer] = None,
+            course_structure: Optional[CourseStructure] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Выполняет парсинг документа в пуле процессов и передает структурные компоненты по мере их получения.
+        Полный список компонент не собирается ни в процессе-обработчике, ни в основном процессе, поэтому результат
+        потоковой обработки в кеш не сохраняется. При закрытии генератора парсинг прекращается.
+        Изображения не сохраняются на диск и передаются в компонентах как data URL, в том числе изображения
+        результата из кеша
+
+        Args:
+            document: Байты docx документа
+            images_dir: Подпапка изображений загружаемых шаблонов, по ней в кеше находится результат парсинга
+                уже загруженного документа
+            timer: Сборщик замеров, в него добавляются этапы обработки из процесса-обработчика
+            course_structure: Структура курса из БД, если не указана - применяется общая структура
+
+        Returns:
+            Асинхронный генератор структурных компонент в виде строк JSON
+        """
+        timer = timer or StageTimer()
+        if self.executor is None:
+            self.start()
+        structure_fingerprint = self._get_structure_fingerprint(course_structure)
+
+        if self.cache is not None:
+            with timer.stage("parse_cache"):
+                cache_key = await asyncio.to_thread(self._get_cache_key, document, images_dir, structure_fingerprint)
+                components = await asyncio.to_thread(self._get_cached, cache_key, True)
+            if components is not None:
+                timer.count("parse_cache_hit")
+                for component in components:
+                    yield json.dumps(component, ensure_ascii=False)
+                return
+
+        if self.manager is None:
+            self.manager = await asyncio.to_thread(self._start_manager)
+        output = self.manager.Queue(self.STREAM_QUEUE_SIZE)
+        cancelled = self.manager.Event()
+        executor = self.executor
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                executor, stream_document, document, structure_fingerprint, course_structure, output, cancelled
+            )
+            while (line := await self._get_streamed(output, future)) is not None:
+                yield line
+            timer.merge(await future)
+        except BrokenProcessPool as error:
+            self._replace_broken_executor(executor)
+            raise ParseWorkerCrashedException() from error
+        finally:
+            cancelled.set()
+
+    def _get_structure_fingerprint(self, course_structure: Optional[CourseStructure]) -> str:
+        """
+        Возвращает отпечаток применяемой структуры: структуры курса или общей структуры
+        """
+        if course_structure is not None:
+            return course_structure.fingerprint
+        return self.structure.get().fingerprint
+
+    @staticmethod
+    def _start_manager() -> SyncManager:
+        """
+        Запускает менеджер очередей для потоковой передачи компонент
+        """
+        return multiprocessing.get_context("spawn").Manager()
+
+    @staticmethod
+    async def _get_streamed(output: queue.Queue, future: asyncio.Future) -> Optional[str]:
+        """
+        Ожидает следующую компоненту из очереди процесса-обработчика
+
+        Returns:
+            Строка JSON компоненты или None, если передача окончена или процесс-обработчик завершился аварийно
+        """
+        while True:
+            try:
+                return await asyncio.to_thread(output.get, True, STREAM_TIMEOUT_SECONDS)
+            except queue.Empty:
+                if future.done():
+                    return None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """
+        Создает пул процессов, процессы-обработчики запускаются при получении первых задач
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self.structure_path,),
+        )
+
+    def _replace_broken_executor(self, broken_executor: ProcessPoolExecutor) -> None:
+        """
+        Пересоздает пул процессов после аварийного завершения процесса-обработчика.
+        Пул пересоздается один раз, даже если ошибку получили несколько одновременно обрабатываемых документов
+
+        Args:
+            broken_executor: Пул, при выполнении задачи в котором возникла ошибка
+        """
+        with self._executor_lock:
+            if self.executor is not broken_executor:
+                return
+            print("Процесс-обработчик документов завершился аварийно, пул процессов пересоздается")
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._create_executor()
+
+    def _init_cache(self) -> None:
+        """
+        Создает кеш результатов парсинга
+        """
+        max_size_bytes = int(os.getenv("PARSE_CACHE_MAX_BYTES") or self.DEFAULT_CACHE_MAX_BYTES)
+        if max_size_bytes <= 0:
+            return
+
+        cache_dir = os.getenv("PARSE_CACHE_DIR") or os.path.join(FileUtils.BASE_PROJECT_DIR, "cache", "parse")
+        self.cache = ParseResultCache(cache_dir, max_size_bytes)
+
+    @staticmethod
+    def _get_cache_key(document: bytes, images_dir: str, structure_fingerprint: str) -> str:
+        """
+        Вычисляет ключ кеша: результат зависит от содержимого документа, структуры и папки изображений
+        """
+        key = hashlib.sha256(document)
+        key.update(structure_fingerprint.encode())
+        key.update(images_dir.encode())
+        return key.hexdigest()
+
+    def _get_cached(self, cache_key: str, inline_images: bool = False) -> Optional[list[dict]]:
+        """
+        Возвращает компоненты из кеша с копиями изображений.
+        Изображения копируются, так как удаление шаблона удаляет и его файлы изображений.
+        При хранении с адресацией по содержимому файлы общие, копирование не требуется.
+        Для предпросмотра изображения не копируются, а передаются как data URL.
+        Если какое-либо изображение уже удалено, запись считается недействительной
+
+        Args:
+            cache_key: Ключ кеша
+            inline_images: Передать изображения как data URL вместо копирования файлов
+        """
+        components = self.cache.get(cache_key)
+        if components is None:
+            return None
+        try:
+            self._replace_images(components, self._inline_image if inline_images else self._copy_image)
+        except IOError:
+            self.cache.delete(cache_key)
+            return None
+        return components
+
+    def _replace_images(self, components: list | dict, replace_image: Callable[[str], str]) -> None:
+        """
+        Рекурсивно заменяет ссылки на изображения в компонентах
+
+        Args:
+            components: Компоненты или компонента
+            replace_image: Функция, возвращающая новую ссылку по ссылке на изображение
+
+        Raises:
+            IOError Изображение не найдено
+        """
+        if isinstance(components, list):
+            for component in components:
+                self._replace_images(component, replace_image)
+            return
+        if not isinstance(components, dict):
+            return
+
+        if components.get("type") == ParserElementType.IMAGE.value:
+            components["data"] = replace_image(components["data"])
+            return
+        for value in components.values():
+            if isinstance(value, (list, dict)):
+                self._replace_images(value, replace_image)
+
+    @staticmethod
+    def _copy_image(image_url: str) -> str:
+        """
+        Возвращает ссылку на копию изображения, при хранении с адресацией по содержимому - ссылку на то же изображение
+
+        Raises:
+            IOError Изображение не найдено
+        """
+        image_path = urlparse(image_url).path
+        if FileUtils.is_content_addressed():
+            if not FileUtils.exists("", image_path):
+                raise IOError("Файл не найден")
+            return image_url
+        return urljoin(os.getenv("BACKEND_EXTERNAL_URL"), FileUtils.copy("", image_path))
+
+    @staticmethod
+    def _inline_image(image_url: str) -> str:
+        """
+        Возвращает изображение в виде data URL
+
+        Raises:
+            IOError Изображение не найдено
+        """
+        image_path = urlparse(image_url).path
+        return FileUtils.to_data_url(FileUtils.get("", image_path.lstrip("/")), os.path.splitext(image_path)[1])
@@ -0,0 +1,109 @@
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from labstructanalyzer.core.exceptions import InvalidStructureException
+from labstructanalyzer.models.structure_profile import StructureProfile
+from labstructanalyzer.utils.parser.structure.structure_cache import CourseStructure
+from labstructanalyzer.utils.parser.structure.structure_manager import StructureManager
+
+
+class StructureProfileService:
+    """
+    Сервис для работы со структурами курсов. Курс без профиля использует общий файл структуры
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, course_id: str) -> Optional[StructureProfile]:
+        """
+        Возвращает профиль структуры курса
+
+        Args:
+            course_id: id курса
+
+        Returns:
+            Профиль структуры или None, если курс использует общую структуру
+        """
+        return await self.session.get(StructureProfile, course_id)
+
+    async def get_course_structure(self, course_id: Optional[str]) -> Optional[CourseStructure]:
+        """
+        Возвращает структуру курса для парсинга документов
+
+        Args:
+            course_id: id курса
+
+        Returns:
+            Структура курса или None, если курс использует общую структуру
+        """
+        if not course_id:
+            return None
+        profile = await self.get(course_id)
+        if profile is None:
+            return None
+        return CourseStructure(profile.course_id, profile.version, profile.structure)
+
+    async def save(self, course_id: str, user_id: str, structure: dict) -> StructureProfile:
+        """
+        Сохраняет структуру курса, увеличивая версию профиля.
+        Структура предварительно компилируется, поэтому ошибка в структуре обнаруживается при сохранении,
+        а не при загрузке документа. Версия увеличивается одним запросом UPDATE в БД, поэтому одновременные
+        сохранения получают разные версии и скомпилированная структура прежней версии не используется повторно
+
+        Args:
+            course_id: id курса
+            user_id: id пользователя, изменяющего структуру
+            structure: Словарь структуры в формате structure.json
+
+        Returns:
+            Сохраненный профиль
+
+        Raises:
+            InvalidStructureException: Структуру невозможно скомпилировать
+        """
+        try:
+            StructureManager(structure)
+        except (TypeError, ValueError, KeyError, AttributeError) as error:
+            raise InvalidStructureException(str(error))
+
+        while True:
+            profile = await self._increment_version(course_id, user_id, structure)
+            if profile is not None:
+                await self.session.commit()
+                return profile
+
+            profile = StructureProfile(course_id=course_id, user_id=user_id, structure=structure)
+            self.session.add(profile)
+            try:
+                await self.session.commit()
+            except IntegrityError:
+                # Профиль курса одновременно создан другим запросом, структура сохраняется его следующей версией
+                await self.session.rollback()
+                continue
+            await self.session.refresh(profile)
+            return profile
+
+    async def _increment_version(self, course_id: str, user_id: str, structure: dict) -> Optional[StructureProfile]:
+        """
+        Заменяет структуру существующего профиля, увеличивая версию на стороне БД
+
+        Returns:
+            Измененный профиль или None, если у курса нет профиля
+        """
+        result = await self.session.exec(
+            update(StructureProfile)
+            .where(StructureProfile.course_id == course_id)
+            .values(
+                version=StructureProfile.version + 1,
+                user_id=user_id,
+                structure=structure,
+                updated_at=func.current_timestamp()
+            )
+            .returning(StructureProfile)
+            .execution_options(synchronize_session="fetch")
+        )
+        return result.scalar_one_or_none()
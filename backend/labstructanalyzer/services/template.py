@@ -1,9 +1,13 @@
 import copy
+import json
 import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
 from typing import Optional
 from urllib.parse import urlparse
 
-from sqlalchemy import func
+from sqlalchemy import func, delete
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select, and_, desc
 
@@ -95,6 +99,31 @@ class TemplateService:
         await self.session.refresh(template)
         return template
 
+    async def reimport(self, template_id: uuid.UUID, template_components: list[dict]) -> "ReimportChanges":
+        """
+        Обновляет элементы шаблона по новой версии документа, сохраняя id неизмененных элементов,
+        а значит и ответы в отчетах, привязанные к ним. В БД записываются только вставки, изменения и удаления.
+        Файлы удаленных и замененных изображений удаляются после сохранения, если на них больше никто не ссылается
+
+        Args:
+            template_id: id шаблона
+            template_components: Массив преобразованных парсером элементов новой версии документа с примененной структурой
+
+        Returns:
+            Изменения элементов шаблона
+
+        Raises:
+            TemplateNotFoundError: Шаблон не найден
+        """
+        template = await self.get_by_id(template_id)
+        if template is None:
+            raise TemplateNotFoundException(template_id)
+
+        changes = await self.elements_service.reimport_elements(template_id, template_components)
+        await self.session.commit()
+        await self.elements_service.remove_unused_files(changes.removed_files)
+        return changes
+
     async def delete(self, template_id: uuid.UUID) -> None:
         """
         Удаляет шаблон и все его элементы каскадно из БД, также удаляет сохраненные файлы
@@ -217,11 +246,41 @@ class TemplateService:
         return self.elements_service.get_all_answer_elements_id(template.id)
 
 
+@dataclass
+class ReimportChanges:
+    """
+    Изменения элементов шаблона при повторном импорте документа
+
+    Attributes:
+        inserted: Новые элементы
+        deleted: id удаленных элементов, включая вложенные
+        updated: Количество измененных элементов
+        unchanged: Количество элементов, оставшихся без изменений
+        removed_files: Ссылки на файлы удаленных и замененных изображений
+    """
+    inserted: list[TemplateElement] = field(default_factory=list)
+    deleted: list[uuid.UUID] = field(default_factory=list)
+    updated: int = 0
+    unchanged: int = 0
+    removed_files: set[str] = field(default_factory=set)
+
+    def to_dict(self) -> dict:
+        return {
+            "inserted": len(self.inserted),
+            "updated": self.updated,
+            "deleted": len(self.deleted),
+            "unchanged": self.unchanged,
+        }
+
+
 class TemplateElementService:
     """
     Сервис для работы с элементами шаблона (частичный CRUD)
     """
 
+    # Свойства, которые пользователь изменяет после загрузки шаблона, при повторном импорте они сохраняются
+    USER_PROPERTIES = ("weight", "simple", "customId")
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -271,6 +330,172 @@ class TemplateElementService:
                 elements.extend(child_elements)
         return elements
 
+    async def reimport_elements(self, template_id: uuid.UUID, components: list[dict]) -> ReimportChanges:
+        """
+        Сопоставляет структурные компоненты новой версии документа с сохраненными элементами шаблона
+        и подготавливает в сессии только необходимые изменения, без сохранения.
+        Сопоставление выполняется отдельно для дочерних элементов каждого родителя: сначала по типу и содержимому
+        (поиск наибольших общих подпоследовательностей), затем несовпавшие элементы одного типа сопоставляются
+        по порядку - такие элементы считаются измененными и сохраняют свой id.
+        Свойства сопоставленного элемента заменяются свойствами компоненты, из прежних свойств переносятся
+        только заданные пользователем (USER_PROPERTIES)
+
+        Args:
+            template_id: id шаблона
+            components: Список структурных компонент новой версии документа
+
+        Returns:
+            Изменения элементов шаблона
+        """
+        elements = await self.session.exec(
+            select(TemplateElement)
+            .where(TemplateElement.template_id == template_id)
+            .order_by(TemplateElement.order)
+        )
+        children_by_parent = defaultdict(list)
+        for element in elements:
+            children_by_parent[element.parent_element_id].append(element)
+
+        changes = ReimportChanges()
+        self._reimport_level(children_by_parent[None], components, None, children_by_parent, changes)
+
+        for element in changes.inserted:
+            element.template_id = template_id
+        self.session.add_all(changes.inserted)
+        if changes.deleted:
+            await self.session.exec(delete(TemplateElement).where(TemplateElement.element_id.in_(changes.deleted)))
+        return changes
+
+    def _reimport_level(
+            self,
+            elements: list[TemplateElement],
+            components: list,
+            parent_id: Optional[uuid.UUID],
+            children_by_parent: dict[Optional[uuid.UUID], list[TemplateElement]],
+            changes: ReimportChanges
+    ) -> None:
+        """
+        Сопоставляет дочерние элементы одного родителя с компонентами того же уровня вложенности
+
+        Args:
+            elements: Сохраненные дочерние элементы в порядке следования
+            components: Структурные компоненты того же уровня, могут содержать вложенные списки компонент
+            parent_id: id родительского элемента, для элементов первого уровня вложенности - None
+            children_by_parent: Сохраненные элементы шаблона, сгруппированные по id родителя
+            changes: Накапливаемые изменения
+        """
+        ordered_components = self._number_components(components)
+        matcher = SequenceMatcher(
+            None,
+            [self._get_match_key(element.element_type, element.properties) for element in elements],
+            [self._get_match_key(component.get("type"), component) for _, component in ordered_components],
+            autojunk=False
+        )
+
+        for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+            old_block = elements[old_start:old_end]
+            new_block = ordered_components[new_start:new_end]
+            paired_count = min(len(old_block), len(new_block)) if tag in ("equal", "replace") else 0
+
+            for element, (order, component) in zip(old_block[:paired_count], new_block[:paired_count]):
+                if element.element_type == component.get("type"):
+                    self._update_element(element, order, component, parent_id, children_by_parent, changes)
+                else:
+                    self._delete_element(element, children_by_parent, changes)
+                    self._insert_element(order, component, parent_id, changes)
+
+            for element in old_block[paired_count:]:
+                self._delete_element(element, children_by_parent, changes)
+            for order, component in new_block[paired_count:]:
+                self._insert_element(order, component, parent_id, changes)
+
+    def _update_element(
+            self,
+            element: TemplateElement,
+            order: int,
+            component: dict,
+            parent_id: Optional[uuid.UUID],
+            children_by_parent: dict[Optional[uuid.UUID], list[TemplateElement]],
+            changes: ReimportChanges
+    ) -> None:
+        """
+        Обновляет свойства и положение сопоставленного элемента, если они изменились, и сопоставляет его дочерние элементы
+        """
+        component = dict(component)
+        children = component.pop("data") if isinstance(component.get("data"), list) else []
+        properties = component | {key: element.properties[key]
+                                  for key in self.USER_PROPERTIES if key in element.properties}
+
+        if properties == element.properties and element.order == order and element.parent_element_id == parent_id:
+            changes.unchanged += 1
+        else:
+            if element.element_type == "image" and element.properties.get("data") != properties.get("data"):
+                changes.removed_files.add(element.properties.get("data"))
+            element.properties = properties
+            element.order = order
+            element.parent_element_id = parent_id
+            changes.updated += 1
+
+        self._reimport_level(
+            children_by_parent.get(element.element_id, []), children, element.element_id, children_by_parent, changes
+        )
+
+    def _insert_element(
+            self, order: int, component: dict, parent_id: Optional[uuid.UUID], changes: ReimportChanges
+    ) -> None:
+        """
+        Создает модели новой компоненты и всех ее вложенных компонент
+        """
+        elements = self.bulk_create_elements([copy.deepcopy(component)], parent_id)
+        elements[0].order = order
+        changes.inserted.extend(elements)
+
+    def _delete_element(
+            self,
+            element: TemplateElement,
+            children_by_parent: dict[Optional[uuid.UUID], list[TemplateElement]],
+            changes: ReimportChanges
+    ) -> None:
+        """
+        Отмечает к удалению элемент и все его вложенные элементы
+        """
+        changes.deleted.append(element.element_id)
+        if element.element_type == "image" and element.properties.get("data"):
+            changes.removed_files.add(element.properties["data"])
+        for child in children_by_parent.get(element.element_id, []):
+            self._delete_element(child, children_by_parent, changes)
+
+    @staticmethod
+    def _number_components(components: list) -> list[tuple[int, dict]]:
+        """
+        Разворачивает вложенные списки компонент одного уровня и назначает порядковые номера так же,
+        как это делает bulk_create_elements
+
+        Returns:
+            Пары порядкового номера и компоненты
+        """
+        ordered_components = []
+        order = 1
+        for component in components:
+            if isinstance(component, list):
+                ordered_components.extend(TemplateElementService._number_components(component))
+                continue
+            ordered_components.append((order, component))
+            order += 1
+        return ordered_components
+
+    @staticmethod
+    def _get_match_key(element_type: Optional[str], properties: dict) -> tuple:
+        """
+        Вычисляет ключ сопоставления элемента: тип и собственное содержимое.
+        Содержимое контейнеров сопоставляется отдельно на следующем уровне вложенности, ссылки на изображения
+        различаются при каждой загрузке, поэтому для них учитывается только тип
+        """
+        data = properties.get("data")
+        if element_type == "image" or data is None or isinstance(data, list):
+            return (element_type,)
+        return element_type, json.dumps(data, ensure_ascii=False, sort_keys=True)
+
     async def bulk_update_properties(self, template_id: uuid.UUID, elements_to_update: list[BaseTemplateElementDto]):
         """
         Массово обновляет элементы, относящиеся к определенному шаблону, производя частичную замену свойств.
@@ -307,7 +532,8 @@ class TemplateElementService:
 
     async def remove_all_files_from_data(self, template_id: uuid.UUID):
         """
-        Для всех элементов шаблона находит те, которые имеют сохраненные файлы на диске и удаляет их
+        Для всех элементов шаблона находит те, которые имеют сохраненные файлы на диске и удаляет их.
+        Файлы, на которые ссылаются элементы других шаблонов (хранение с адресацией по содержимому), не удаляются
         """
         image_elements: list[TemplateElement] = await self.session.exec(
             select(TemplateElement).where(
@@ -315,13 +541,52 @@ class TemplateElementService:
                 TemplateElement.element_type == "image"
             )
         )
-        if image_elements is not None:
-            for image_element in image_elements:
-                image_path = image_element.properties.get("data")
-                try:
-                    FileUtils.remove("", urlparse(image_path).path)
-                finally:
-                    continue
+        if image_elements is None:
+            return
+
+        image_paths = {image_element.properties.get("data") for image_element in image_elements}
+        image_paths.discard(None)
+        shared_paths = await self.get_shared_files(template_id, image_paths)
+        for image_path in image_paths - shared_paths:
+            try:
+                FileUtils.remove("", urlparse(image_path).path)
+            finally:
+                continue
+
+    async def remove_unused_files(self, file_paths: set[str]) -> None:
+        """
+        Удаляет файлы, на которые не ссылается ни один элемент шаблонов
+        """
+        file_paths = set(file_paths)
+        file_paths.discard(None)
+        for file_path in file_paths - await self.get_shared_files(None, file_paths):
+            try:
+                FileUtils.remove("", urlparse(file_path).path)
+            finally:
+                continue
+
+    async def get_shared_files(self, template_id: Optional[uuid.UUID], file_paths: set[str]) -> set[str]:
+        """
+        Находит файлы, на которые ссылаются элементы других шаблонов
+
+        Args:
+            template_id: id шаблона, элементы которого не учитываются. Если не передан, учитываются все шаблоны
+            file_paths: Ссылки на файлы
+
+        Returns:
+            Ссылки на файлы, которые используются в других шаблонах
+        """
+        if not file_paths:
+            return set()
+
+        file_path = TemplateElement.properties["data"].as_string()
+        shared_query = select(file_path).distinct().where(
+            TemplateElement.element_type == "image",
+            file_path.in_(file_paths)
+        )
+        if template_id is not None:
+            shared_query = shared_query.where(TemplateElement.template_id != template_id)
+        return set(await self.session.exec(shared_query))
 
     async def get_all_answer_elements_id(self, template_id: uuid.UUID):
         """
@@ -1,9 +1,16 @@
+import base64
+import hashlib
+import mimetypes
 import os
+import shutil
+import tempfile
 import uuid
+from typing import IO, Optional
 
 
 class FileUtils:
     BASE_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    COPY_CHUNK_SIZE = 64 * 1024
 
     @staticmethod
     def save(save_dir: str, file_data: bytes, extension: str) -> str:
@@ -27,6 +34,93 @@ class FileUtils:
         except IOError as error:
             print(f"Произошла ошибка при сохранении файла {file_name}: {error}")
 
+    @staticmethod
+    def save_stream(save_dir: str, file_stream: IO[bytes], extension: str) -> Optional[str]:
+        """Сохраняет данные файла из потока с уникальным именем в указанную папку.
+        Данные копируются частями по COPY_CHUNK_SIZE байт, файл целиком в память не загружается
+
+        Args:
+          save_dir: Папка для сохранения
+          file_stream: Файловый объект, открытый на чтение в бинарном режиме
+          extension: Расширение файла
+
+        Returns:
+          Относительный путь до сохраненного файла
+        """
+        file_name = f"{FileUtils.generate_unique_name()}{extension}"
+        try:
+            file_path = os.path.join(FileUtils.BASE_PROJECT_DIR, save_dir, file_name)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as file:
+                shutil.copyfileobj(file_stream, file, FileUtils.COPY_CHUNK_SIZE)
+            return os.path.join(save_dir, file_name)
+        except IOError as error:
+            print(f"Произошла ошибка при сохранении файла {file_name}: {error}")
+
+    @staticmethod
+    def save_stream_by_content(save_dir: str, file_stream: IO[bytes], extension: str) -> Optional[str]:
+        """Сохраняет данные файла из потока в хранилище с адресацией по содержимому: имя файла - SHA-256 хеш данных.
+        Если файл с таким содержимым уже сохранен, запись не выполняется, одинаковые изображения из разных
+        шаблонов хранятся на диске в одном экземпляре
+
+        Args:
+          save_dir: Папка для сохранения
+          file_stream: Файловый объект, открытый на чтение в бинарном режиме и поддерживающий seek
+          extension: Расширение файла
+
+        Returns:
+          Относительный путь до сохраненного файла
+        """
+        try:
+            file_name = f"{FileUtils.hash_stream(file_stream)}{extension}"
+            file_path = os.path.join(FileUtils.BASE_PROJECT_DIR, save_dir, file_name)
+            if not os.path.exists(file_path):
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                file_stream.seek(0)
+                file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+                try:
+                    with os.fdopen(file_descriptor, "wb") as file:
+                        shutil.copyfileobj(file_stream, file, FileUtils.COPY_CHUNK_SIZE)
+                    os.replace(temp_path, file_path)
+                except IOError:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+            return os.path.join(save_dir, file_name)
+        except IOError as error:
+            print(f"Произошла ошибка при сохранении файла: {error}")
+
+    @staticmethod
+    def hash_stream(file_stream: IO[bytes]) -> str:
+        """Вычисляет SHA-256 хеш данных потока, читая его частями по COPY_CHUNK_SIZE байт
+
+        Returns:
+          Хеш в шестнадцатеричном виде
+        """
+        file_hash = hashlib.sha256()
+        for chunk in iter(lambda: file_stream.read(FileUtils.COPY_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def to_data_url(file_data: bytes, extension: str) -> str:
+        """Кодирует данные файла в data URL для передачи файла внутри ответа без сохранения на диск
+
+        Args:
+          file_data: Данные файла
+          extension: Расширение файла, по нему определяется MIME тип
+
+        Returns:
+          Строка вида `data:<MIME тип>;base64,<данные>`
+        """
+        mime_type = mimetypes.guess_type(f"file{extension}")[0] or "application/octet-stream"
+        return f"data:{mime_type};base64,{base64.b64encode(file_data).decode('ascii')}"
+
+    @staticmethod
+    def is_content_addressed() -> bool:
+        """Включено ли хранение файлов с адресацией по содержимому (переменная окружения CONTENT_ADDRESSED_FILES)"""
+        return os.getenv("CONTENT_ADDRESSED_FILES", "").lower() in ("1", "true")
+
     @staticmethod
     def generate_unique_name() -> str:
         """Генерирует уникальное имя файла с помощью UUID
@@ -70,3 +164,34 @@ class FileUtils:
             os.remove(file_path)
         else:
             raise IOError("Файл не найден")
+
+    @staticmethod
+    def copy(folder: str, filename: str) -> str:
+        """
+        Создает копию файла с уникальным именем в той же папке
+
+        Returns:
+            Относительный путь до копии файла
+
+        Raises:
+            IOError Файл не найден
+        """
+        if filename.startswith('/'):
+            filename = filename[1:]
+        file_path = os.path.join(FileUtils.BASE_PROJECT_DIR, folder, filename)
+        if not os.path.isfile(file_path):
+            raise IOError("Файл не найден")
+
+        relative_dir = os.path.dirname(os.path.join(folder, filename))
+        copy_name = f"{FileUtils.generate_unique_name()}{os.path.splitext(filename)[1]}"
+        shutil.copyfile(file_path, os.path.join(FileUtils.BASE_PROJECT_DIR, relative_dir, copy_name))
+        return os.path.join(relative_dir, copy_name)
+
+    @staticmethod
+    def exists(folder: str, filename: str) -> bool:
+        """
+        Проверяет, существует ли файл
+        """
+        if filename.startswith('/'):
+            filename = filename[1:]
+        return os.path.isfile(os.path.join(FileUtils.BASE_PROJECT_DIR, folder, filename))
@@ -0,0 +1,149 @@
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from typing import IO, Optional
+
+from labstructanalyzer.utils.file_utils import FileUtils
+
+
+class BackgroundFileWriter:
+    """
+    Фоновая запись файлов на диск.
+    Открытые на чтение потоки файлов помещаются в ограниченную очередь и копируются на диск отдельным потоком
+    пачками, частями по FileUtils.COPY_CHUNK_SIZE байт, поэтому запись выполняется параллельно с парсингом документа,
+    а данные файлов целиком в память не загружаются. Имя файла определяется при постановке в очередь,
+    ссылку на файл можно использовать сразу, а flush гарантирует, что все файлы записаны
+
+    Attributes:
+        batch_size: Максимальное количество файлов, записываемых за одну итерацию
+        failed_paths: Пути файлов, которые не удалось записать с момента последнего flush
+    """
+
+    def __init__(self, max_queue_size: int = 64, batch_size: int = 16):
+        self.batch_size = batch_size
+        self.failed_paths: list[str] = []
+        self._written_paths: list[str] = []
+        self._queue: queue.Queue[tuple[str, IO[bytes], bool]] = queue.Queue(maxsize=max_queue_size)
+        self._created_dirs: set[str] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, save_dir: str, file_stream: IO[bytes], extension: str, content_addressed: bool = False) -> str:
+        """
+        Ставит файл в очередь на запись. Если очередь заполнена, ожидает освобождения места.
+        Поток передается записи и закрывается после копирования
+
+        Args:
+            save_dir: Папка для сохранения
+            file_stream: Файловый объект, открытый на чтение в бинарном режиме
+            extension: Расширение файла
+            content_addressed: Использовать в качестве имени файла SHA-256 хеш данных, поток должен поддерживать seek.
+                Запись пропускается, если файл с таким содержимым уже сохранен
+
+        Returns:
+            Относительный путь до файла
+        """
+        if content_addressed:
+            file_name = f"{FileUtils.hash_stream(file_stream)}{extension}"
+            file_stream.seek(0)
+        else:
+            file_name = f"{FileUtils.generate_unique_name()}{extension}"
+        relative_path = os.path.join(save_dir, file_name)
+
+        file_path = os.path.join(FileUtils.BASE_PROJECT_DIR, relative_path)
+        if content_addressed and os.path.exists(file_path):
+            file_stream.close()
+            return relative_path
+
+        self._ensure_started()
+        self._queue.put((file_path, file_stream, content_addressed))
+        return relative_path
+
+    def flush(self) -> list[str]:
+        """
+        Ожидает записи всех файлов, поставленных в очередь.
+        Если какой-либо файл не удалось записать, файлы с уникальными именами, записанные с момента последнего flush,
+        удаляются: на них не должен ссылаться результат, сохраняемый вместе с незаписанными файлами
+
+        Returns:
+            Пути файлов, которые не удалось записать
+        """
+        self._join()
+        failed_paths, self.failed_paths = self.failed_paths, []
+        if failed_paths:
+            self._remove_written()
+        self._written_paths = []
+        return failed_paths
+
+    def discard(self) -> None:
+        """
+        Ожидает записи всех файлов, поставленных в очередь, и удаляет файлы с уникальными именами, записанные
+        с момента последнего flush. Файлы с адресацией по содержимому не удаляются, так как могут быть общими
+        для нескольких шаблонов
+        """
+        self._join()
+        self.failed_paths = []
+        self._remove_written()
+
+    def _join(self) -> None:
+        if self._thread is not None:
+            self._queue.join()
+
+    def _remove_written(self) -> None:
+        for file_path in self._written_paths:
+            try:
+                os.remove(file_path)
+            except OSError as error:
+                print(f"Произошла ошибка при удалении файла {file_path}: {error}")
+        self._written_paths = []
+
+    def _ensure_started(self) -> None:
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="file-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """
+        Цикл потока записи: дожидается первого файла и забирает из очереди уже накопившиеся, не более batch_size
+        """
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for file_path, file_stream, content_addressed in batch:
+                try:
+                    with file_stream:
+                        self._write(file_path, file_stream)
+                    if not content_addressed:
+                        self._written_paths.append(file_path)
+                except Exception as error:
+                    print(f"Произошла ошибка при сохранении файла {file_path}: {error}")
+                    self.failed_paths.append(file_path)
+                finally:
+                    self._queue.task_done()
+
+    def _write(self, file_path: str, file_stream: IO[bytes]) -> None:
+        """
+        Копирует поток в файл частями через временный файл с последующей атомарной заменой
+        """
+        file_dir = os.path.dirname(file_path)
+        if file_dir not in self._created_dirs:
+            os.makedirs(file_dir, exist_ok=True)
+            self._created_dirs.add(file_dir)
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=file_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                shutil.copyfileobj(file_stream, file, FileUtils.COPY_CHUNK_SIZE)
+            os.replace(temp_path, file_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Потокобезопасный кеш в памяти с ограничением количества записей.
+    При превышении ограничения вытесняются записи, к которым дольше всего не обращались.
+    Нулевое ограничение отключает кеширование
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            return None
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_cache_size(self):
+        with self._lock:
+            return len(self._cache)
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Optional
+
+
+class ParseResultCache:
+    """
+    Дисковый кеш результатов парсинга с ограничением по размеру.
+    Каждая запись - JSON файл со структурными компонентами документа, время изменения файла - время последнего
+    обращения к записи. При превышении допустимого размера вытесняются записи, к которым дольше всего не обращались (LRU)
+    """
+
+    ENTRY_EXTENSION = ".json"
+
+    def __init__(self, cache_dir: str, max_size_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.RLock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[list[dict]]:
+        """
+        Возвращает сохраненные компоненты и отмечает запись как недавно использованную
+
+        Returns:
+            Список структурных компонент или None, если записи нет
+        """
+        entry_path = self._get_entry_path(key)
+        with self._lock:
+            try:
+                with open(entry_path, "r", encoding="utf-8") as file:
+                    components = json.load(file)
+                os.utime(entry_path)
+                return components
+            except (IOError, ValueError):
+                return None
+
+    def put(self, key: str, components: list[dict]) -> None:
+        """
+        Сохраняет компоненты документа и вытесняет старые записи при превышении допустимого размера.
+        Запись выполняется во временный файл с последующей атомарной заменой
+        """
+        with self._lock:
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                    json.dump(components, file, ensure_ascii=False)
+                os.replace(temp_path, self._get_entry_path(key))
+            except IOError as error:
+                print(f"Произошла ошибка при сохранении результата парсинга в кеш: {error}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                return
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        """
+        Удаляет запись, если она существует
+        """
+        with self._lock:
+            try:
+                os.remove(self._get_entry_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        """
+        Удаляет записи в порядке давности последнего обращения, пока размер кеша превышает допустимый
+        """
+        entries = [
+            entry for entry in os.scandir(self.cache_dir)
+            if entry.is_file() and entry.name.endswith(self.ENTRY_EXTENSION)
+        ]
+        total_size = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda item: item.stat().st_mtime):
+            if total_size <= self.max_size_bytes:
+                break
+            total_size -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.ENTRY_EXTENSION}")
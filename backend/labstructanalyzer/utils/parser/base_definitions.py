@@ -18,35 +18,56 @@ class ParserElementType(Enum):
 
 
 class IParserElement(ABC, Generic[DataType]):
-    """Абстрактный базовый класс элементов парсера"""
+    """Абстрактный базовый класс элементов парсера.
+    Атрибуты хранятся в слотах без словаря экземпляра: таблица большого документа создает десятки тысяч элементов"""
 
-    nesting_level: Optional[int] = None
-    numbering_level: Optional[int] = None
-    numbering_bullet_text: Optional[str] = None
-    is_cell_element: bool = False
-
-    _property_to_json_map = [
-        ("nestingLevel", "nesting_level"),
-        ("numberingBulletText", "numbering_bullet_text"),
-    ]
+    __slots__ = (
+        "element_type",
+        "data",
+        "nesting_level",
+        "numbering_level",
+        "numbering_bullet_text",
+        "is_cell_element",
+        "structure_type",
+    )
 
     def __init__(self, element_type: ParserElementType, data: DataType) -> None:
         self.element_type = element_type
         self.data = data
+        self.nesting_level: Optional[int] = None
+        self.numbering_level: Optional[int] = None
+        self.numbering_bullet_text: Optional[str] = None
+        self.is_cell_element: bool = False
+        self.structure_type: Optional[str] = None
 
     @abstractmethod
     def to_dict(self) -> dict:
         """Абстрактный метод для преобразования данных элемента парсера в словарь"""
         pass
 
+    def copy_common_fields(self, source: "IParserElement") -> None:
+        """Переносит общие свойства другого элемента, кроме данных и типа структуры
+
+        Args:
+            source: Элемент, свойства которого переносятся
+        """
+        self.nesting_level = source.nesting_level
+        self.numbering_level = source.numbering_level
+        self.numbering_bullet_text = source.numbering_bullet_text
+        self.is_cell_element = source.is_cell_element
+
     def collect_common_fields(self) -> dict:
         """Сбор общих свойств любого элемента парсера"""
-        return {
-            "type": self.element_type.value,
-            **{
-                key: getattr(self, attr)
-                for key, attr in self._property_to_json_map
-                if getattr(self, attr) is not None
-            },
-        }
+        return self.add_common_fields({"type": self.element_type.value})
+
+    def add_common_fields(self, properties: dict) -> dict:
+        """Добавляет общие свойства элемента в переданный словарь без создания промежуточных словарей
 
+        Returns:
+            Переданный словарь
+        """
+        if self.nesting_level is not None:
+            properties["nestingLevel"] = self.nesting_level
+        if self.numbering_bullet_text is not None:
+            properties["numberingBulletText"] = self.numbering_bullet_text
+        return properties
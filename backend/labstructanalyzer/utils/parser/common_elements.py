@@ -4,24 +4,23 @@ from typing import List, Optional
 from labstructanalyzer.utils.parser.base_definitions import IParserElement, ParserElementType
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageElement(IParserElement[str]):
     """Элемент изображения"""
 
     data: str
 
     def __post_init__(self) -> None:
-        super().__init__(ParserElementType.IMAGE, self.data)
+        IParserElement.__init__(self, ParserElementType.IMAGE, self.data)
 
     def to_dict(self) -> dict:
-        return {
+        return self.add_common_fields({
             "type": self.element_type.value,
             "data": self.data,
-            **self.collect_common_fields(),
-        }
+        })
 
 
-@dataclass
+@dataclass(slots=True)
 class CellElement(IParserElement[List[IParserElement]]):
     """Элемент ячейки таблицы"""
 
@@ -33,62 +32,53 @@ class CellElement(IParserElement[List[IParserElement]]):
     def __post_init__(self) -> None:
         if self.rows > 1 or self.cols > 1:
             self.merged = True
-        super().__init__(ParserElementType.CELL, self.data)
+        IParserElement.__init__(self, ParserElementType.CELL, self.data)
 
     def to_dict(self) -> dict:
-        data = {
+        data = self.add_common_fields({
             "type": self.element_type.value,
             "data": [x.to_dict() for x in self.data],
-            **self.collect_common_fields(),
-        }
+        })
         if self.merged:
-            data.update(
-                {
-                    "merged": True,
-                    **{
-                        k: v
-                        for k, v in [("rows", self.rows), ("cols", self.cols)]
-                        if v > 1
-                    },
-                }
-            )
+            data["merged"] = True
+            if self.rows > 1:
+                data["rows"] = self.rows
+            if self.cols > 1:
+                data["cols"] = self.cols
         return data
 
 
-@dataclass
+@dataclass(slots=True)
 class RowElement(IParserElement[List[CellElement]]):
     """Элемент строки таблицы"""
     data: List[CellElement]
 
     def __post_init__(self) -> None:
-        super().__init__(ParserElementType.ROW, self.data)
+        IParserElement.__init__(self, ParserElementType.ROW, self.data)
 
     def to_dict(self) -> dict:
-        return {
+        return self.add_common_fields({
             "type": self.element_type.value,
             "data": [cell.to_dict() for cell in self.data],
-            **self.collect_common_fields(),
-        }
+        })
 
 
-@dataclass
+@dataclass(slots=True)
 class TableElement(IParserElement[List[RowElement]]):
     """Элемент таблицы"""
 
     data: List[RowElement]
 
     def __post_init__(self) -> None:
-        super().__init__(ParserElementType.TABLE, self.data)
+        IParserElement.__init__(self, ParserElementType.TABLE, self.data)
 
     def to_dict(self) -> dict:
-        return {
-            "type": self.element_type.value,
-            **self.collect_common_fields(),
-            "data": [row.to_dict() for row in self.data],
-        }
+        data = self.collect_common_fields()
+        data["data"] = [row.to_dict() for row in self.data]
+        return data
 
 
-@dataclass
+@dataclass(slots=True)
 class TextElement(IParserElement[str]):
     """Элемент текста"""
 
@@ -97,36 +87,34 @@ class TextElement(IParserElement[str]):
     header_level: Optional[int] = field(default=None)
 
     def __post_init__(self) -> None:
-        super().__init__(ParserElementType.TEXT, self.data)
+        IParserElement.__init__(self, ParserElementType.TEXT, self.data)
 
     def to_dict(self) -> dict:
-        data = {
+        data = self.add_common_fields({
             "type": self.element_type.value,
             "data": self.data,
-            **self.collect_common_fields(),
-        }
+        })
         if self.header_level:
-            data.update({"headerLevel": self.header_level})
+            data["headerLevel"] = self.header_level
         return data
 
 
-@dataclass
+@dataclass(slots=True)
 class QuestionElement(IParserElement[list[IParserElement]]):
     """Элемент вопроса"""
 
     data: list[IParserElement]
 
     def __post_init__(self) -> None:
-        super().__init__(ParserElementType.QUESTION, self.data)
+        IParserElement.__init__(self, ParserElementType.QUESTION, self.data)
 
     def to_dict(self) -> dict:
-        return {
+        return self.add_common_fields({
             "type": self.element_type.value,
             "data": self.data,
-            **self.collect_common_fields(),
-        }
+        })
 
-@dataclass
+@dataclass(slots=True)
 class AnswerElement(IParserElement[str]):
     """Элемент ответа"""
 
@@ -135,14 +123,12 @@ class AnswerElement(IParserElement[str]):
     simple: bool = field(default=True)
 
     def __post_init__(self) -> None:
-        super().__init__(ParserElementType.ANSWER, self.data)
+        IParserElement.__init__(self, ParserElementType.ANSWER, self.data)
 
     def to_dict(self) -> dict:
-        properties = {
+        return self.add_common_fields({
             "type": self.element_type.value,
             "data": self.data,
             "weight": self.weight,
             "simple": self.simple,
-            **self.collect_common_fields(),
-        }
-        return properties
\ No newline at end of file
+        })
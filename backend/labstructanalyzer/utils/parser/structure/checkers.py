@@ -1,14 +1,11 @@
-from enum import Enum
-from typing import Callable
+from typing import Any, Callable
 
 from labstructanalyzer.utils.parser.base_definitions import IParserElement
 
+Predicate = Callable[[IParserElement], bool]
+"""Скомпилированная проверка элемента"""
 
-class CheckStatus(Enum):
-    """Возможные статусы проверки элемента на соответствие условию"""
-    VALID = "valid"
-    UNVALID = "unvalid"
-    SKIP = "skip"
+_MISSING = object()
 
 
 class FixedChecker:
@@ -17,31 +14,29 @@ class FixedChecker:
        Атрибуты:
            key: Имя атрибута элемента, который нужно проверить
            expected_value: Ожидаемое значение атрибута
-           callback: Функция обратного вызова для сравнения значений
+           factory: Функция, создающая проверку значения атрибута по ожидаемому значению
        """
 
-    def __init__(self, key: str, expected_value: str, callback: Callable[[str, str], bool]):
+    def __init__(self, key: str, expected_value: Any, factory: Callable[[Any], Callable[[Any], bool]]):
         self.key = key
         self.expected_value = expected_value
-        self.callback = callback
+        self.factory = factory
 
-    def check(self, element: IParserElement) -> CheckStatus:
-        """Проверяет элемент на соответствие ожидаемому значению
-
-            Args:
-                element: Элемент для проверки.
+    def compile(self) -> Predicate:
+        """Создает проверку элемента с уже подготовленным ожидаемым значением.
+        Элемент без проверяемого атрибута проверку проходит
 
             Returns:
-                Статус проверки CheckStatus
+                Функция, возвращающая True, если элемент соответствует ожидаемому значению
                """
-        if hasattr(element, self.key):
-            return (
-                CheckStatus.VALID
-                if self.callback(str(getattr(element, self.key)), str(self.expected_value))
-                else CheckStatus.UNVALID
-            )
-        else:
-            return CheckStatus.SKIP
+        key = self.key
+        check_value = self.factory(self.expected_value)
+
+        def check(element: IParserElement) -> bool:
+            value = getattr(element, key, _MISSING)
+            return value is _MISSING or check_value(value)
+
+        return check
 
 
 class CommonChecker:
@@ -50,14 +45,14 @@ class CommonChecker:
 
     Атрибуты:
         key: Имя атрибута элемента, который нужно проверять
-        callback: Функция обратного вызова для проверки значений
+        factory: Функция, создающая проверку значения атрибута по ожидаемому значению
     """
 
-    def __init__(self, key: str, callback: Callable[[str, str], bool]):
+    def __init__(self, key: str, factory: Callable[[Any], Callable[[Any], bool]]):
         self.key = key
-        self.callback = callback
+        self.factory = factory
 
-    def register(self, expected_value: str) -> FixedChecker:
+    def register(self, expected_value: Any) -> FixedChecker:
         """Создает и returns FixedChecker с указанным ожидаемым значением
 
         Args:
@@ -66,7 +61,7 @@ class CommonChecker:
         Returns:
             Экземпляр FixedChecker для проверки конкретного значения
           """
-        return FixedChecker(self.key, expected_value, self.callback)
+        return FixedChecker(self.key, expected_value, self.factory)
 
 
 class DirectChecker:
@@ -74,44 +69,41 @@ class DirectChecker:
     Используется только в том случае, если другие чекеры использовать невозможно
 
     Атрибуты:
-        callback: Функция обратного вызова для проверки элемента
+        factory: Функция, создающая проверку элемента по ожидаемому значению
+        expected: Ожидаемое значение
     """
 
-    def __init__(self, callback: Callable[[IParserElement, any], bool]):
-        self.callback = callback
-        self.expected = None
+    def __init__(self, factory: Callable[[Any], Predicate], expected: Any = None):
+        self.factory = factory
+        self.expected = expected
 
-    def register(self, expected_value: str) -> 'DirectChecker':
+    def register(self, expected_value: Any) -> 'DirectChecker':
         """
-        Этот метод не используется для DirectChecker, но реализован для совместимости с интерфейсом.
+        Создает чекер с указанным ожидаемым значением. Зарегистрированный в реестре чекер не изменяется,
+        поэтому компоненты с разными ожидаемыми значениями не влияют друг на друга
 
         Args:
-            expected_value: Игнорируется для DirectChecker
+            expected_value: Ожидаемое значение
 
         Returns:
-            Сам объект DirectChecker
+            Новый объект DirectChecker
         """
-        self.expected = expected_value
-        return self
+        return DirectChecker(self.factory, expected_value)
 
-    def check(self, element: IParserElement) -> CheckStatus:
+    def compile(self) -> Predicate:
         """
-        Проверяет элемент, используя callback функцию
-
-        Args:
-            element: Элемент для проверки
+        Создает проверку элемента с уже подготовленным ожидаемым значением
 
         Returns:
-            Статус проверки CheckStatus
+            Функция, возвращающая True, если элемент соответствует ожидаемому значению
         """
-        return (
-            CheckStatus.VALID
-            if self.callback(element, self.expected)
-            else CheckStatus.UNVALID
-        )
+        return self.factory(self.expected)
+
 
 class CheckerRegistry:
-    """Класс для управления регистрацией и созданием чекеров
+    """Класс для управления регистрацией и созданием чекеров.
+    Проверки компонента выполняются в порядке регистрации чекеров, поэтому первыми регистрируются
+    самые избирательные и дешевые проверки
 
     Атрибуты:
         checkers (dict): Словарь зарегистрированных чекеров
@@ -129,23 +121,25 @@ class CheckerRegistry:
         """
         return self.checkers.keys()
 
-    def create_common(self, prop: str, key: str, check_callback: Callable[[str, str], bool]):
+    def create_common(self, prop: str, key: str, factory: Callable[[Any], Callable[[Any], bool]]):
         """
         Создает и регистрирует новый CommonChecker
 
         Args:
             prop: Свойство, характеризующее проверку
             key: Имя атрибута, который нужно проверять
-            check_callback: Функция обратного вызова для проверки значений
+            factory: Функция, которая по ожидаемому значению из структуры создает проверку значения атрибута.
+                Вызывается один раз при загрузке структуры, поэтому приведение ожидаемого значения к типу
+                атрибута выполняется в ней, а не при каждой проверке
 
         Throws:
             ValueError: Если ключ уже зарегистрирован.
         """
         if self.checkers.get(prop):
             raise ValueError(f"Key exists: {prop}")
-        self.checkers[prop] = CommonChecker(key, check_callback)
+        self.checkers[prop] = CommonChecker(key, factory)
 
-    def create_fixed(self, key: str, expected_value: str) -> FixedChecker | DirectChecker:
+    def create_fixed(self, key: str, expected_value: Any) -> FixedChecker | DirectChecker:
         """Создает FixedChecker для указанного ключа и ожидаемого значения.
         Создание чекера невозможно, если не создан чекер типа common/direct для указанного ключа
 
@@ -165,7 +159,17 @@ class CheckerRegistry:
         else:
             raise ValueError(f"Unknown key: {key}")
 
-    def create_direct(self, prop: str, callback: Callable[[IParserElement, any], bool]):
+    def create_direct(self, prop: str, factory: Callable[[Any], Predicate]):
+        """
+        Создает и регистрирует новый DirectChecker
+
+        Args:
+            prop: Свойство, характеризующее проверку
+            factory: Функция, которая по ожидаемому значению из структуры создает проверку элемента
+
+        Throws:
+            ValueError: Если ключ уже зарегистрирован.
+        """
         if self.checkers.get(prop):
             raise ValueError(f"Key exists: {prop}")
-        self.checkers[prop] = DirectChecker(callback)
\ No newline at end of file
+        self.checkers[prop] = DirectChecker(factory)
@@ -0,0 +1,101 @@
+from typing import Iterable, Optional
+
+from labstructanalyzer.utils.parser.base_definitions import IParserElement
+from labstructanalyzer.utils.parser.structure.structure_components import BaseStructureComponent, \
+    CompositeStructureComponent
+
+
+class MatcherNode:
+    """Узел префиксного дерева составных компонентов
+
+    Атрибуты:
+        edges: Переходы к дочерним узлам, сгруппированные по типу содержимого элемента:
+            [тип содержимого] = список пар (базовый компонент, дочерний узел)
+        composite: Составной компонент, последовательность которого заканчивается в этом узле
+        priority: Порядковый номер составного компонента в структуре, меньший номер приоритетнее
+    """
+
+    __slots__ = ("edges", "composite", "priority")
+
+    def __init__(self):
+        self.edges: dict[str, list[tuple[BaseStructureComponent, MatcherNode]]] = {}
+        self.composite: Optional[CompositeStructureComponent] = None
+        self.priority: Optional[int] = None
+
+
+class CompositeMatcher:
+    """Сопоставитель последовательностей элементов с составными компонентами структуры.
+    Составные компоненты собираются в префиксное дерево: компоненты с одинаковыми начальными условиями
+    разделяют общие узлы, поэтому каждое условие проверяется для элемента один раз, сколько бы составных
+    компонентов с него ни начиналось. Переходы из узла сгруппированы по типу содержимого, и элемент
+    проверяется только условиями своего типа без повторной проверки типа.
+    При совпадении нескольких составных компонентов выбирается первый из них в порядке структуры
+
+    Атрибуты:
+        root: Корень префиксного дерева
+        depth: Длина самой длинной последовательности
+    """
+
+    def __init__(self, composites: list[CompositeStructureComponent]):
+        """Строит префиксное дерево составных компонентов
+
+        Args:
+            composites: Составные компоненты в порядке их приоритета
+        """
+        self.root = MatcherNode()
+        self.depth = max((composite.chunk_count for composite in composites), default=0)
+
+        for priority, composite in enumerate(composites):
+            node = self.root
+            for component in composite.data:
+                node = self._get_child(node, component)
+            if node.composite is None:
+                node.composite = composite
+                node.priority = priority
+
+    def match(self, elements: Iterable[IParserElement]) -> Optional[CompositeStructureComponent]:
+        """Находит составной компонент, последовательность которого совпадает с началом элементов
+
+        Args:
+            elements: Элементы в порядке следования, не более depth элементов
+
+        Returns:
+            Самый приоритетный из совпавших составных компонентов или None
+        """
+        matched = None
+        nodes = [self.root]
+        for element in elements:
+            next_nodes = []
+            for node in nodes:
+                for component, child in node.edges.get(element.element_type.value, ()):
+                    if not component.check(element):
+                        continue
+                    next_nodes.append(child)
+                    if child.composite is not None and (matched is None or child.priority < matched.priority):
+                        matched = child
+            if not next_nodes:
+                break
+            nodes = next_nodes
+
+        return matched.composite if matched else None
+
+    @staticmethod
+    def _get_child(node: MatcherNode, component: BaseStructureComponent) -> MatcherNode:
+        """Возвращает дочерний узел для условия компонента, создавая его при отсутствии.
+        Условия совпадают, если совпадают тип содержимого и все проверяемые свойства
+
+        Args:
+            node: Родительский узел
+            component: Базовый компонент составной последовательности
+
+        Returns:
+            Дочерний узел
+        """
+        edges = node.edges.setdefault(component.content_type, [])
+        for existing_component, child in edges:
+            if existing_component.get_conditions() == component.get_conditions():
+                return child
+
+        child = MatcherNode()
+        edges.append((component, child))
+        return child
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Optional
+
+from labstructanalyzer.utils.lru_cache import LRUCache
+from labstructanalyzer.utils.parser.structure.structure_manager import StructureManager
+
+CompiledStructure = namedtuple("CompiledStructure", ["fingerprint", "structure_manager", "structure"])
+"""Скомпилированная структура: отпечаток структуры, созданный по ней StructureManager и исходный словарь структуры"""
+
+
+class CourseStructure(namedtuple("CourseStructure", ["course_id", "version", "structure"])):
+    """Структура курса из БД: id курса, версия профиля и словарь структуры"""
+
+    __slots__ = ()
+
+    @property
+    def fingerprint(self) -> str:
+        """Отпечаток структуры: версия профиля увеличивается при каждом изменении структуры курса"""
+        return f"course:{self.course_id}:{self.version}"
+
+
+class StructureCache:
+    """
+    Скомпилированная структура, общая для всех запросов процесса.
+    Файл структуры читается и компилируется при первом обращении, затем не чаще одного раза в check_interval
+    секунд проверяются время изменения и размер файла. Файл перечитывается, только если они изменились,
+    и структура пересоздается, только если изменился хеш содержимого. Новая структура подменяет прежнюю одним
+    присваиванием, поэтому уже начатый парсинг продолжает работать с той структурой, с которой начался.
+    Если измененный файл не удается загрузить, сохраняется прежняя структура
+
+    Attributes:
+        path: Путь до файла структуры
+        check_interval: Минимальный интервал между проверками файла в секундах
+    """
+
+    def __init__(self, path: str, check_interval: Optional[float] = None):
+        self.path = path
+        self.check_interval = (
+            check_interval if check_interval is not None else float(os.getenv("STRUCTURE_RELOAD_INTERVAL") or 5)
+        )
+        self._current: Optional[CompiledStructure] = None
+        self._signature: Optional[tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> CompiledStructure:
+        """
+        Возвращает текущую структуру, проверяя файл, если с прошлой проверки прошло не меньше check_interval секунд
+
+        Raises:
+            OSError, ValueError, TypeError, KeyError: Структура еще не загружена, и файл не удается загрузить
+        """
+        if self._current is None or time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+        return self._current
+
+    def require(self, fingerprint: str) -> CompiledStructure:
+        """
+        Возвращает структуру с указанным отпечатком. Если текущая структура другая, файл проверяется сразу,
+        без ожидания интервала: так процессы-обработчики получают структуру, уже загруженную основным процессом
+
+        Args:
+            fingerprint: Ожидаемый хеш файла структуры
+
+        Returns:
+            Структура после проверки файла, ее отпечаток отличается от ожидаемого, если файл снова изменился
+        """
+        current = self._current
+        if current is not None and current.fingerprint == fingerprint:
+            return current
+        self.reload(force=True)
+        return self._current
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Перечитывает файл структуры, если изменились время изменения или размер файла
+
+        Args:
+            force: Прочитать файл, даже если время изменения и размер не изменились
+
+        Returns:
+            Была ли подменена структура
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if not force and self._current is not None and signature == self._signature:
+                    return False
+                with open(self.path, "rb") as file:
+                    data = file.read()
+                self._signature = signature
+
+                fingerprint = hashlib.sha256(data).hexdigest()
+                if self._current is not None and self._current.fingerprint == fingerprint:
+                    return False
+                structure = json.loads(data)
+                structure_manager = StructureManager(structure)
+            except (OSError, ValueError, TypeError, KeyError) as error:
+                if self._current is None:
+                    raise
+                print(f"Не удалось загрузить структуру {self.path}, используется прежняя: {error}")
+                return False
+
+            self._current = CompiledStructure(fingerprint, structure_manager, structure)
+            return True
+
+
+class CourseStructureCache:
+    """
+    Скомпилированные структуры курсов. Структура курса компилируется при первом парсинге документа этого курса
+    и хранится, пока не будет вытеснена структурами других курсов. Ключ - курс и версия профиля, поэтому после
+    изменения профиля используется новая структура, а прежняя версия вытесняется как давно не использованная.
+    Количество хранимых структур задается переменной окружения STRUCTURE_PROFILE_CACHE_SIZE
+
+    Attributes:
+        compiled_count: Количество компиляций с момента создания кеша
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._cache = LRUCache(
+            max_size if max_size is not None else int(os.getenv("STRUCTURE_PROFILE_CACHE_SIZE") or 32)
+        )
+        self.compiled_count = 0
+
+    def get(self, course_structure: CourseStructure) -> CompiledStructure:
+        """
+        Возвращает скомпилированную структуру курса, компилируя ее при отсутствии в кеше
+
+        Args:
+            course_structure: Структура курса из БД
+
+        Returns:
+            Скомпилированная структура
+        """
+        key = (course_structure.course_id, course_structure.version)
+        compiled = self._cache.get(key)
+        if compiled is None:
+            compiled = CompiledStructure(
+                course_structure.fingerprint, StructureManager(course_structure.structure), course_structure.structure
+            )
+            self.compiled_count += 1
+            self._cache.set(key, compiled)
+        return compiled
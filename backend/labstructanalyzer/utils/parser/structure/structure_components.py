@@ -1,7 +1,7 @@
-from typing import List
+from typing import List, Optional
 
-from labstructanalyzer.utils.parser.base_definitions import IParserElement
-from labstructanalyzer.utils.parser.structure.checkers import CheckerRegistry, CheckStatus
+from labstructanalyzer.utils.parser.base_definitions import IParserElement, ParserElementType
+from labstructanalyzer.utils.parser.structure.checkers import CheckerRegistry, Predicate
 
 
 class BaseStructureComponent:
@@ -10,6 +10,8 @@ class BaseStructureComponent:
     Атрибуты:
         structure_props: Свойства структуры
         validators: Список валидаторов для проверки компонентов
+        element_type: Тип элемента, соответствующий типу содержимого, или None для неизвестного типа
+        check: Скомпилированная проверка свойств элемента без проверки типа содержимого
     """
 
     def __init__(self, checker_registry: CheckerRegistry, json_part: dict):
@@ -29,6 +31,49 @@ class BaseStructureComponent:
                 self.validators[check_property] = checker_registry.create_fixed(check_property,
                                                                                 json_part[check_property])
 
+        self.element_type = self._get_element_type(self.content_type)
+        self.check = self._compile([checker.compile() for checker in self.validators.values()])
+
+    @staticmethod
+    def _get_element_type(content_type: Optional[str]) -> Optional[ParserElementType]:
+        """Возвращает тип элемента по типу содержимого из структуры"""
+        try:
+            return ParserElementType(content_type)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _compile(checks: list[Predicate]) -> Predicate:
+        """Объединяет проверки свойств в одну функцию, сохраняя их порядок
+
+        Args:
+            checks: Скомпилированные проверки валидаторов
+
+        Returns:
+            Функция, возвращающая True, если элемент проходит все проверки
+        """
+        if not checks:
+            return lambda element: True
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(element: IParserElement) -> bool:
+            for check in checks:
+                if not check(element):
+                    return False
+            return True
+
+        return check_all
+
+    def get_conditions(self) -> tuple:
+        """Возвращает условия соответствия компонента - тип содержимого и ожидаемые значения проверяемых свойств.
+        Компоненты с одинаковыми условиями принимают одни и те же элементы
+
+        Returns:
+            Кортеж типа содержимого и пар (свойство, ожидаемое значение), упорядоченных по свойству
+        """
+        return self.content_type, tuple(sorted((key, str(self.structure_props[key])) for key in self.validators))
+
     def validate(self, element: IParserElement):
         """Проверяет элемент на соответствие установленным валидаторам
 
@@ -38,14 +83,7 @@ class BaseStructureComponent:
         Returns:
             True, если элемент соответствует всем валидаторам, иначе False
         """
-        if self.content_type != element.element_type.value:
-            return False
-
-        for checker in self.validators.values():
-            if checker.check(element) is CheckStatus.UNVALID:
-                return False
-
-        return True
+        return element.element_type is self.element_type and self.check(element)
 
     def apply_structure(self, element: IParserElement) -> dict:
         """Применяет структуру к элементу и возвращает обновленный словарь
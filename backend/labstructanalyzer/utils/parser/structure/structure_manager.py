@@ -1,11 +1,14 @@
-import copy
+import dataclasses
 from collections import deque
-from typing import Generator, Optional
-from labstructanalyzer.utils.parser.base_definitions import IParserElement
+from itertools import islice
+from typing import Callable, Generator, Optional
+from labstructanalyzer.utils.parser.base_definitions import IParserElement, ParserElementType
 from labstructanalyzer.utils.parser.common_elements import QuestionElement, AnswerElement
 from labstructanalyzer.utils.parser.structure.checkers import CheckerRegistry
+from labstructanalyzer.utils.parser.structure.composite_matcher import CompositeMatcher
 from labstructanalyzer.utils.parser.structure.structure_components import BaseStructureComponent, \
     CompositeStructureComponent
+from labstructanalyzer.utils.parser.structure.text_matcher import TextMatch, TextMatcher
 
 
 class StructureManager:
@@ -17,27 +20,39 @@ class StructureManager:
 
         Args:
             structure: Словарь, определяющий структуру JSON. Должен содержать ключи "answer", "base", и "composite".
+                "answer" - вид метки ответа или список видов меток, каждый с ключами "charDelimiter" и "minRepeatCount"
 
         Raises:
             TypeError: Если структура JSON неверна.
+            ValueError: Если метка ответа не задает символ метки или положительное количество повторений.
         """
         if not all(key in structure for key in ["answer", "base", "composite"]):
             raise TypeError("Wrong JSON structure")
 
+        answer_marks = structure["answer"] if isinstance(structure["answer"], list) else [structure["answer"]]
+        if not answer_marks:
+            raise TypeError("Wrong JSON structure")
+        self.text_matcher = TextMatcher([self.parse_answer_mark(mark) for mark in answer_marks])
+        self.answer_delimiter = self.text_matcher.delimiters[0]
+        # Результаты разбора текста элементов документа: id элемента -> (разобранный текст, результат).
+        # Очищаются в начале и в конце apply_structure
+        self._text_matches: dict[int, tuple[str, TextMatch]] = {}
+
         self.checkers = CheckerRegistry()
-        self.checkers.create_direct("hasProperty",
-                                    lambda element, expected: element.to_dict().get(expected) is not None)
-        self.checkers.create_common("headerLevel", "header_level",
-                                    lambda current, expected: str(current) == str(expected))
-        self.checkers.create_common("hasStyle", "style_id", lambda current, expected: current == expected)
-        self.checkers.create_common("startsWith", "data", lambda current, expected: current.startswith(expected))
-
-        self.answer_delimiter = structure["answer"]["charDelimiter"] * structure["answer"]["minRepeatCount"]
+        self.checkers.create_common("headerLevel", "header_level", self.equals_int)
+        self.checkers.create_common("hasStyle", "style_id", self.equals_str)
+        self.checkers.create_direct("startsWith", self.starts_with)
+        self.checkers.create_direct("hasProperty", self.has_property)
         self.base = {json_part["type"]: BaseStructureComponent(self.checkers, json_part) for json_part in
                      structure["base"]}
+        self.base_by_type: dict[ParserElementType, list[BaseStructureComponent]] = {}
+        for base in self.base.values():
+            if base.element_type is not None:
+                self.base_by_type.setdefault(base.element_type, []).append(base)
         self.composite = [CompositeStructureComponent(self.checkers, json_part) for json_part in structure["composite"]]
+        self.composite_matcher = CompositeMatcher(self.composite)
 
-        self.max_chunk_count = max(validator.chunk_count for validator in self.composite)
+        self.max_chunk_count = max(self.composite_matcher.depth, 1)
 
     def apply_structure(self, elements: Generator[IParserElement, None, None]) -> Generator[dict, None, None]:
         """Применяет структуру ко всем элементам парсера из генератора
@@ -48,30 +63,29 @@ class StructureManager:
         Yields:
             Словари, представляющие структурированные элементы для сериализации в JSON
         """
+        # Окно элементов - кольцевой буфер фиксированной длины: элементы не копируются ни при сопоставлении,
+        # ни при сборке составного компонента, который получает представление islice над окном
         chunk: deque[IParserElement] = deque(maxlen=self.max_chunk_count)
+        self._text_matches.clear()
 
         for item in elements:
-            for base in self.base.values():
-                if base.validate(item):
-                    item.structure_type = base.structure_type
-                    if self.contain_answer_mark(item):
-                        item.structure_type = "question"
-                    break
+            structure_type = self.classify(item)
+            if structure_type is not None:
+                item.structure_type = "question" if self.contain_answer_mark(item) else structure_type
 
             chunk.append(item)
 
             while len(chunk) == self.max_chunk_count:
-                for composite in self.composite:
-                    if composite.validate(list(chunk)):
-                        composite_element = composite.get_structure_template()
-                        composite_element["data"] = [
-                            self.recursive_apply_structure(child_element) for child_element in
-                            list(chunk)[:composite.chunk_count]
-                        ]
-                        yield composite_element
-                        for _ in range(composite.chunk_count):
-                            chunk.popleft()
-                        break
+                composite = self.composite_matcher.match(chunk)
+                if composite is not None:
+                    composite_element = composite.get_structure_template()
+                    composite_element["data"] = [
+                        self.recursive_apply_structure(child_element) for child_element in
+                        islice(chunk, composite.chunk_count)
+                    ]
+                    yield composite_element
+                    for _ in range(composite.chunk_count):
+                        chunk.popleft()
                 else:
                     current_element = chunk.popleft()
                     next_element = chunk[0] if len(chunk) else None
@@ -84,6 +98,22 @@ class StructureManager:
 
         while chunk:
             yield self.recursive_apply_structure(chunk.popleft())
+        self._text_matches.clear()
+
+    def classify(self, element: IParserElement) -> Optional[str]:
+        """Определяет тип базового компонента элемента. Проверяются только компоненты с типом содержимого элемента
+        в порядке структуры
+
+        Args:
+            element: Объект IParserElement
+
+        Returns:
+            Тип первого подходящего базового компонента или None
+        """
+        for base in self.base_by_type.get(element.element_type, ()):
+            if base.check(element):
+                return base.structure_type
+        return None
 
     def recursive_apply_structure(self, element: IParserElement) -> dict:
         """Рекурсивно применяет структуру к элементу парсера
@@ -97,10 +127,7 @@ class StructureManager:
         structure_type = element.structure_type if hasattr(element, "structure_type") else None
 
         if structure_type is None:
-            for base in self.base.values():
-                if base.validate(element):
-                    element.structure_type = base.structure_type
-                    break
+            element.structure_type = self.classify(element)
 
         if structure_type == "question":
             element = self.extract_question_from_text(element)
@@ -132,6 +159,74 @@ class StructureManager:
 
         return self.recursive_apply_structure(element)
 
+    @staticmethod
+    def parse_answer_mark(mark: dict) -> tuple[str, int]:
+        """Проверяет вид метки ответа. Пустой символ метки или нулевое количество повторений означали бы,
+        что метка ответа есть в любом тексте, и каждый абзац стал бы вопросом
+
+        Args:
+            mark: Вид метки ответа с ключами "charDelimiter" и "minRepeatCount"
+
+        Returns:
+            Символ метки и минимальное количество повторений
+
+        Raises:
+            ValueError: Символ метки - не непустая строка или количество повторений - не положительное целое число
+        """
+        char_delimiter, min_repeat_count = mark["charDelimiter"], mark["minRepeatCount"]
+        if not isinstance(char_delimiter, str) or not char_delimiter:
+            raise ValueError("Answer charDelimiter must be a non-empty string")
+        if not isinstance(min_repeat_count, int) or isinstance(min_repeat_count, bool) or min_repeat_count < 1:
+            raise ValueError("Answer minRepeatCount must be a positive integer")
+        return char_delimiter, min_repeat_count
+
+    @staticmethod
+    def equals_int(expected) -> Callable[[Optional[int]], bool]:
+        """Создает проверку целочисленного атрибута на равенство ожидаемому значению"""
+        try:
+            expected = int(expected)
+        except (TypeError, ValueError):
+            return lambda current: False
+        return lambda current: current == expected
+
+    @staticmethod
+    def equals_str(expected) -> Callable[[Optional[str]], bool]:
+        """Создает проверку строкового атрибута на равенство ожидаемому значению"""
+        expected = str(expected)
+        return lambda current: current == expected
+
+    def starts_with(self, expected) -> Callable[[IParserElement], bool]:
+        """Создает проверку начала данных элемента. Начало текста добавляется в разбор текста абзацев,
+        и для текстовых элементов проверяется результат разбора"""
+        expected = str(expected)
+        self.text_matcher.add_prefix(expected)
+
+        def check(element: IParserElement) -> bool:
+            if element.element_type is ParserElementType.TEXT:
+                return expected in self.match_text(element).prefixes
+            return isinstance(element.data, str) and element.data.startswith(expected)
+
+        return check
+
+    @staticmethod
+    def has_property(expected: str) -> Callable[[IParserElement], bool]:
+        """Создает проверку наличия свойства в словаре элемента. Для свойств, наличие которых определяется
+        одним атрибутом, проверяется атрибут; для остальных свойств строится словарь элемента
+
+        Args:
+            expected: Ключ свойства в словаре элемента
+
+        Returns:
+            Функция, возвращающая True, если свойство есть в словаре элемента
+        """
+        if expected == "headerLevel":
+            return lambda element: bool(getattr(element, "header_level", None))
+        if expected == "nestingLevel":
+            return lambda element: element.nesting_level is not None
+        if expected == "numberingBulletText":
+            return lambda element: element.numbering_bullet_text is not None
+        return lambda element: element.to_dict().get(expected) is not None
+
     def create_answer_element(self, nesting_level: Optional[int], answer_template: Optional[str]) -> AnswerElement:
         """Создает элемент "Ответ"
 
@@ -148,6 +243,23 @@ class StructureManager:
             answer_element.nesting_level = nesting_level
         return answer_element
 
+    def match_text(self, element: IParserElement) -> TextMatch:
+        """Возвращает результат разбора текста элемента. Текст разбирается один раз для всех проверок элемента
+        и разбирается заново, только если текст элемента изменился
+
+        Args:
+            element: Текстовый элемент
+
+        Returns:
+            Совпавшие начала текста и позиции меток ответа
+        """
+        cached = self._text_matches.get(id(element))
+        if cached is not None and cached[0] is element.data:
+            return cached[1]
+        text_match = self.text_matcher.match(element.data)
+        self._text_matches[id(element)] = (element.data, text_match)
+        return text_match
+
     def contain_answer_mark(self, element: IParserElement) -> bool:
         """
         Проверяет, содержит ли элемент метку ответа
@@ -158,9 +270,9 @@ class StructureManager:
         Returns:
             True, если элемент содержит метку ответа, иначе False
         """
-        if element.element_type.value != "text":
+        if element.element_type is not ParserElementType.TEXT:
             return False
-        return element.data.find(self.answer_delimiter) >= 0
+        return bool(self.match_text(element).marks)
 
     def is_only_answer_mark(self, element: IParserElement):
         """Проверяет, состоит ли элемент только из метки ответа
@@ -171,12 +283,14 @@ class StructureManager:
         Returns:
             True, если элемент состоит только из метки ответа, иначе False
         """
-        if element.element_type.value != 'text':
+        if element is None or element.element_type is not ParserElementType.TEXT:
             return False
-        return element.data.find(self.answer_delimiter) == 0
+        marks = self.match_text(element).marks
+        return bool(marks) and marks[0][0] == 0
 
     def extract_question_from_text(self, element: IParserElement):
-        """Извлекает вопрос и создает элемент ответа из текстового элемента
+        """Извлекает вопрос и создает элемент ответа из текстового элемента.
+        Текст вопроса - новый элемент того же класса, собранный из полей исходного элемента без глубокого копирования
 
         Args:
             element: Объект IParserElement
@@ -184,12 +298,12 @@ class StructureManager:
         Returns:
             Элемент вопроса или None, если текст не содержит метки вопроса
         """
-        index = element.data.find(self.answer_delimiter)
+        index = self.match_text(element).marks[0][0]
         question_text_component = element.data[:index].strip()
         answer_template = self.extract_answer_template(element)
 
-        text_component = copy.deepcopy(element)
-        text_component.data = question_text_component
+        text_component = dataclasses.replace(element, data=question_text_component)
+        text_component.copy_common_fields(element)
         text_component.structure_type = "text"
 
         answer_component = self.create_answer_element(None, answer_template)
@@ -211,6 +325,8 @@ class StructureManager:
         Returns:
             Шаблон ответа или None, если шаблон ответа не найден
         """
-        index = element.data.rfind(self.answer_delimiter)
-        template = element.data[index + len(self.answer_delimiter):]
+        marks = self.match_text(element).marks
+        if not marks:
+            return None
+        template = element.data[marks[-1][1]:]
         return template.strip() if template else None
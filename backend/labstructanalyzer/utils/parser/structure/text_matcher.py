@@ -0,0 +1,82 @@
+import re
+from collections import namedtuple
+from typing import Optional
+
+TextMatch = namedtuple("TextMatch", ["prefixes", "marks"])
+"""Результат разбора текста абзаца: совпавшие начала текста из структуры
+и позиции меток ответа - пары (начало, конец) в порядке следования"""
+
+EMPTY_TEXT_MATCH = TextMatch((), ())
+"""Общий результат разбора абзацев без совпадений, для таких абзацев результат не создается"""
+
+
+class TextMatcher:
+    """
+    Разбор текста абзаца по всем текстовым правилам структуры: меткам ответа всех видов и началам текста startsWith.
+    Правила собираются при загрузке структуры в одно регулярное выражение, и текст абзаца просматривается
+    одним проходом finditer: первое совпадение в начале текста отмечает все совпавшие начала текста
+    (проверки вперед, не занимающие символов), остальные совпадения - метки ответа
+
+    Attributes:
+        delimiters: Минимальные метки ответа каждого вида
+        prefixes: Начала текста из структуры
+    """
+
+    def __init__(self, answer_marks: list[tuple[str, int]]):
+        """
+        Args:
+            answer_marks: Виды меток ответа - пары (символ метки, минимальное количество повторений)
+        """
+        self.delimiters = [char * count for char, count in answer_marks]
+        self._marks_pattern = "|".join(f"(?:{re.escape(char)}){{{count},}}" for char, count in answer_marks)
+        self.prefixes: tuple[str, ...] = ()
+        self._pattern: Optional[re.Pattern] = None
+
+    def add_prefix(self, prefix: str) -> None:
+        """
+        Добавляет начало текста, наличие которого определяется при разборе абзаца
+
+        Args:
+            prefix: Начало текста
+        """
+        if prefix not in self.prefixes:
+            self.prefixes += (prefix,)
+            self._pattern = None
+
+    def match(self, text: str) -> TextMatch:
+        """
+        Разбирает текст абзаца
+
+        Args:
+            text: Текст абзаца
+
+        Returns:
+            Совпавшие начала текста и позиции меток ответа
+        """
+        prefixes = ()
+        marks = []
+        for found in self._get_pattern().finditer(text):
+            if found.start("mark") >= 0:
+                marks.append(found.span())
+            else:
+                prefixes = tuple([prefix for index, prefix in enumerate(self.prefixes)
+                                  if found.start(f"prefix{index}") >= 0])
+
+        if not prefixes and not marks:
+            return EMPTY_TEXT_MATCH
+        return TextMatch(prefixes, tuple(marks))
+
+    def _get_pattern(self) -> re.Pattern:
+        """
+        Возвращает регулярное выражение всех правил, компилируя его после добавления начал текста.
+        Начала текста проверяются пустым совпадением в начале текста, поэтому метка ответа в начале текста
+        находится следующим совпадением с той же позиции
+        """
+        if self._pattern is None:
+            pattern = f"(?P<mark>{self._marks_pattern})"
+            if self.prefixes:
+                lookaheads = "".join(f"(?=(?P<prefix{index}>{re.escape(prefix)}))?"
+                                     for index, prefix in enumerate(self.prefixes))
+                pattern = rf"\A{lookaheads}|{pattern}"
+            self._pattern = re.compile(pattern)
+        return self._pattern
@@ -0,0 +1,73 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class StageTimer:
+    """
+    Сборщик длительности этапов обработки и счетчиков (количество элементов, обработанные байты).
+    Повторные замеры одного этапа суммируются. Данные хранятся в обычных словарях, поэтому замеры из процесса-обработчика
+    можно передать в основной процесс и объединить через merge
+
+    Attributes:
+        durations: Суммарная длительность каждого этапа в секундах, в порядке первого замера
+        counters: Значения счетчиков
+    """
+
+    logger = logging.getLogger("labstructanalyzer.timing")
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Замеряет длительность блока кода и добавляет ее к этапу
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_duration(name, time.perf_counter() - start)
+
+    def add_duration(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            Длительности этапов в миллисекундах и значения счетчиков
+        """
+        return {
+            "stages": {name: round(seconds * 1000, 3) for name, seconds in self.durations.items()},
+            "counters": dict(self.counters),
+        }
+
+    def merge(self, data: dict) -> None:
+        """
+        Добавляет замеры, полученные через to_dict
+        """
+        for name, milliseconds in data["stages"].items():
+            self.add_duration(name, milliseconds / 1000)
+        for name, value in data["counters"].items():
+            self.count(name, value)
+
+    def to_server_timing(self) -> str:
+        """
+        Returns:
+            Значение заголовка Server-Timing
+        """
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.durations.items())
+
+    def log(self, event: str, **fields) -> None:
+        """
+        Записывает замеры в лог одной записью в формате JSON, дополнительные поля добавляются в запись
+        """
+        record = {"event": event, **fields, **self.to_dict()}
+        self.logger.info(json.dumps(record, ensure_ascii=False), extra={"timing": record})
@@ -0,0 +1,69 @@
+import json
+import unittest
+
+from labstructanalyzer.utils.parser.common_elements import (
+    AnswerElement, CellElement, ImageElement, QuestionElement, RowElement, TableElement, TextElement
+)
+
+
+def with_fields(element, **fields):
+    for name, value in fields.items():
+        setattr(element, name, value)
+    return element
+
+
+def dump(properties: dict) -> str:
+    """Сериализует словарь элемента с сохранением порядка ключей, вложенные элементы - через их to_dict"""
+    return json.dumps(properties, ensure_ascii=False, default=lambda element: element.to_dict())
+
+
+class TestElementSerialization(unittest.TestCase):
+    """Тестирование совпадения to_dict элементов со слотами с результатом прежней реализации"""
+
+    def test_to_dict_matches_previous_output(self):
+        """Для каждого типа элемента совпадают ключи, значения и порядок ключей"""
+        cases = {
+            "text with numbering": (
+                with_fields(TextElement(data="Пункт", style_id="List"), nesting_level=1, numbering_bullet_text="1."),
+                {"type": "text", "data": "Пункт", "nestingLevel": 1, "numberingBulletText": "1."}
+            ),
+            "header": (
+                TextElement(data="Цель работы", header_level=2),
+                {"type": "text", "data": "Цель работы", "headerLevel": 2}
+            ),
+            "image": (
+                with_fields(ImageElement(data="https://localhost/images/image.png"), nesting_level=0),
+                {"type": "image", "data": "https://localhost/images/image.png", "nestingLevel": 0}
+            ),
+            "merged cell": (
+                with_fields(CellElement(data=[TextElement(data="cell")], rows=2), is_cell_element=True),
+                {"type": "cell", "data": [{"type": "text", "data": "cell"}], "merged": True, "rows": 2}
+            ),
+            "table": (
+                with_fields(TableElement(data=[RowElement(data=[
+                    CellElement(data=[TextElement(data="a")], cols=2), CellElement()
+                ])]), nesting_level=0),
+                {"type": "table", "nestingLevel": 0, "data": [{"type": "row", "data": [
+                    {"type": "cell", "data": [{"type": "text", "data": "a"}], "merged": True, "cols": 2},
+                    {"type": "cell", "data": []},
+                ]}]}
+            ),
+            "question with answer": (
+                with_fields(QuestionElement(data=[
+                    TextElement(data="Адрес"),
+                    with_fields(AnswerElement(data="10.0.0.1", weight=2), numbering_bullet_text="а)")
+                ]), nesting_level=2),
+                {"type": "question", "data": [
+                    {"type": "text", "data": "Адрес"},
+                    {"type": "answer", "data": "10.0.0.1", "weight": 2, "simple": True, "numberingBulletText": "а)"},
+                ], "nestingLevel": 2}
+            ),
+        }
+
+        for name, (element, expected) in cases.items():
+            with self.subTest(name):
+                self.assertEqual(dump(expected), dump(element.to_dict()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from benchmarks.docx_generator import DocumentProfile, generate_docx
+from labstructanalyzer.services.parser.docx import DocxParser
+from labstructanalyzer.utils.parser.common_elements import ImageElement, TableElement
+from tests.test_docx_parser import load_structure
+
+
+class TestDocxGenerator(unittest.TestCase):
+    """Тестирование генератора синтетических документов для бенчмарков"""
+
+    def test_generated_document_matches_profile(self):
+        """Документ разбирается парсером, количество таблиц, строк и изображений совпадает с профилем"""
+        profile = DocumentProfile(paragraphs=40, tables=3, table_rows=6, table_cols=4, images=0)
+        document = generate_docx(profile)
+
+        parser = DocxParser(document, load_structure(), "images")
+        elements = list(parser.parse(parser.xml_manager.main_content_root))
+
+        tables = [element for element in elements if isinstance(element, TableElement)]
+        self.assertEqual(profile.tables, len(tables))
+        self.assertTrue(all(len(table.data) == profile.table_rows for table in tables))
+        self.assertFalse(any(isinstance(element, ImageElement) for element in elements))
+
+    def test_same_seed_gives_same_document(self):
+        """Документ воспроизводим при одинаковом начальном значении"""
+        profile = DocumentProfile(paragraphs=30, images=1, image_size=256)
+        self.assertEqual(generate_docx(profile), generate_docx(profile))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,409 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from labstructanalyzer.configs.config import CONFIG_DIR
+from lxml import etree
+
+from labstructanalyzer.core.exceptions import InvalidDocumentException
+from labstructanalyzer.services.parser.docx import (
+    DocxParser, DocxXmlManager, NumberingIndex, NumberingProps, StyleGraph, read_paragraph_properties
+)
+from labstructanalyzer.utils.file_utils import FileUtils
+from labstructanalyzer.utils.lru_cache import LRUCache
+from labstructanalyzer.utils.parser.common_elements import ImageElement, TableElement, TextElement
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+)
+
+STYLES = f'<w:styles {NAMESPACES}/>'
+NUMBERING = f'<w:numbering {NAMESPACES}/>'
+RELATIONS = '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"/>'
+
+
+def paragraph(text: str, properties: str = "") -> str:
+    return f"<w:p><w:pPr>{properties}</w:pPr><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def numbered_paragraph(text: str, numbering_id: str, ilvl: int = 0) -> str:
+    return paragraph(text, f'<w:numPr><w:ilvl w:val="{ilvl}"/><w:numId w:val="{numbering_id}"/></w:numPr>')
+
+
+def table(*cells: str) -> str:
+    return "<w:tbl><w:tr>" + "".join(f"<w:tc>{cell}</w:tc>" for cell in cells) + "</w:tr></w:tbl>"
+
+
+def image(embed_id: str) -> str:
+    return (
+        '<w:p><w:r><w:drawing><pic:pic><pic:blipFill>'
+        f'<a:blip r:embed="{embed_id}"/>'
+        '</pic:blipFill></pic:pic></w:drawing></w:r></w:p>'
+    )
+
+
+def relationships(targets: dict[str, str], attributes: str = "") -> str:
+    return (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + "".join(
+            f'<Relationship Id="{rel_id}" Target="{target}" {attributes}/>' for rel_id, target in targets.items()
+        )
+        + '</Relationships>'
+    )
+
+
+def build_docx(
+        body: str,
+        styles: str = STYLES,
+        numbering: str = NUMBERING,
+        relations: str = RELATIONS,
+        media: dict[str, bytes] = None
+) -> bytes:
+    """Собирает минимальный docx документ с переданным содержимым тела документа"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as document:
+        document.writestr("word/document.xml", f"<w:document {NAMESPACES}><w:body>{body}</w:body></w:document>")
+        document.writestr("word/styles.xml", styles)
+        document.writestr("word/numbering.xml", numbering)
+        document.writestr("word/_rels/document.xml.rels", relations)
+        for file_name, file_data in (media or {}).items():
+            document.writestr(f"word/media/{file_name}", file_data)
+    return buffer.getvalue()
+
+
+def load_structure() -> dict:
+    with open(os.path.join(CONFIG_DIR, "structure.json"), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class TestDocxParserWalker(unittest.TestCase):
+    """Тестирование обхода блочных элементов документа"""
+
+    def parse(self, body: str) -> list:
+        parser = DocxParser(build_docx(body), load_structure(), "images/template")
+        return list(parser.parse(parser.xml_manager.main_content_root))
+
+    def test_document_order(self):
+        """Абзацы и таблицы возвращаются в порядке следования в документе"""
+        elements = self.parse(paragraph("first") + table(paragraph("cell")) + paragraph("last"))
+
+        self.assertEqual(3, len(elements))
+        self.assertEqual("first", elements[0].data)
+        self.assertIsInstance(elements[1], TableElement)
+        self.assertEqual("last", elements[2].data)
+
+    def test_nested_table_is_not_top_level(self):
+        """Вложенная таблица обрабатывается только как содержимое ячейки"""
+        elements = self.parse(table(paragraph("outer") + table(paragraph("inner"))))
+
+        self.assertEqual(1, len(elements))
+        cell_items = elements[0].data[0].data[0].data
+        self.assertEqual(2, len(cell_items))
+        self.assertEqual("outer", cell_items[0].data)
+        self.assertTrue(cell_items[0].is_cell_element)
+        self.assertIsInstance(cell_items[1], TableElement)
+
+    def test_content_control_paragraphs(self):
+        """Абзацы внутри элементов управления содержимым не теряются"""
+        elements = self.parse(
+            f"<w:sdt><w:sdtPr/><w:sdtContent>{paragraph('inside')}</w:sdtContent></w:sdt>" + paragraph("after")
+        )
+
+        self.assertEqual(["inside", "after"], [element.data for element in elements])
+        self.assertTrue(all(isinstance(element, TextElement) for element in elements))
+
+
+class TestTableParser(unittest.TestCase):
+    """Тестирование построения сетки таблицы"""
+
+    @staticmethod
+    def cell(text: str, properties: str = "") -> str:
+        return f"<w:tc><w:tcPr>{properties}</w:tcPr>{paragraph(text)}</w:tc>"
+
+    def parse_table(self, rows: list[str]) -> TableElement:
+        body = "<w:tbl>" + "".join(f"<w:tr>{row}</w:tr>" for row in rows) + "</w:tbl>"
+        parser = DocxParser(build_docx(body), load_structure(), "images/template")
+        return next(parser.parse(parser.xml_manager.main_content_root))
+
+    def spans(self, table_element: TableElement) -> list:
+        return [[(cell.data[0].data, cell.rows, cell.cols) for cell in row.data] for row in table_element.data]
+
+    def test_vertical_merge_runs(self):
+        """Объединение по вертикали заканчивается на первой ячейке, не продолжающей объединение"""
+        restart = '<w:vMerge w:val="restart"/>'
+        table_element = self.parse_table([
+            self.cell("a", restart) + self.cell("b"),
+            self.cell("", "<w:vMerge/>") + self.cell("c"),
+            self.cell("d", restart) + self.cell("e"),
+            self.cell("", '<w:vMerge w:val="continue"/>') + self.cell("f"),
+            self.cell("", "<w:vMerge/>") + self.cell("g"),
+        ])
+
+        self.assertEqual(
+            [[("a", 1, 2), ("b", 1, 1)], [("c", 1, 1)], [("d", 1, 3), ("e", 1, 1)], [("f", 1, 1)], [("g", 1, 1)]],
+            self.spans(table_element)
+        )
+        self.assertTrue(table_element.data[0].data[0].merged)
+
+    def test_horizontal_spans_and_grid_before(self):
+        """Колонки сетки учитывают объединение по горизонтали и пропуск колонок в начале строки"""
+        table_element = self.parse_table([
+            self.cell("a", '<w:gridSpan w:val="2"/>') + self.cell("b", '<w:vMerge w:val="restart"/>'),
+            '<w:trPr><w:gridBefore w:val="2"/></w:trPr>' + self.cell("", "<w:vMerge/>"),
+        ])
+
+        self.assertEqual([[("a", 2, 1), ("b", 1, 2)], []], self.spans(table_element))
+
+    def test_nested_table_rows_are_not_merged_into_parent(self):
+        """Строки и ячейки вложенной таблицы не попадают в родительскую таблицу"""
+        table_element = self.parse_table([self.cell("outer") + f"<w:tc>{table(paragraph('inner'))}</w:tc>"])
+
+        self.assertEqual(1, len(table_element.data))
+        self.assertEqual(2, len(table_element.data[0].data))
+        nested_table = table_element.data[0].data[1].data[0]
+        self.assertIsInstance(nested_table, TableElement)
+        self.assertEqual("inner", nested_table.data[0].data[0].data[0].data)
+
+
+class TestNumbering(unittest.TestCase):
+    """Тестирование разрешения данных нумерации"""
+
+    NUMBERING = (
+        f'<w:numbering {NAMESPACES}>'
+        '<w:abstractNum w:abstractNumId="0">'
+        '<w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="decimal"/><w:lvlText w:val="%1."/></w:lvl>'
+        '<w:lvl w:ilvl="1"><w:start w:val="1"/><w:numFmt w:val="lowerLetter"/><w:lvlText w:val="%2)"/></w:lvl>'
+        '</w:abstractNum>'
+        '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>'
+        '<w:num w:numId="2"><w:abstractNumId w:val="0"/>'
+        '<w:lvlOverride w:ilvl="0"><w:startOverride w:val="7"/></w:lvlOverride>'
+        '<w:lvlOverride w:ilvl="1"><w:lvl w:ilvl="1"><w:numFmt w:val="upperRoman"/></w:lvl></w:lvlOverride>'
+        '</w:num>'
+        '</w:numbering>'
+    )
+
+    STYLES = (
+        f'<w:styles {NAMESPACES}>'
+        '<w:style w:styleId="Numbered"><w:pPr><w:numPr><w:numId w:val="1"/></w:numPr></w:pPr></w:style>'
+        '<w:style w:styleId="Broken"><w:pPr><w:numPr><w:numId w:val="9"/></w:numPr></w:pPr></w:style>'
+        '</w:styles>'
+    )
+
+    def parse(self, body: str) -> list:
+        parser = DocxParser(
+            build_docx(body, styles=self.STYLES, numbering=self.NUMBERING), load_structure(), "images/template"
+        )
+        return list(parser.parse(parser.xml_manager.main_content_root))
+
+    def test_overrides_are_merged(self):
+        """Переопределения уровней объединяются с определениями абстрактной нумерации"""
+        elements = self.parse(
+            numbered_paragraph("first", "2") + numbered_paragraph("second", "2", 1) + numbered_paragraph("third", "2")
+        )
+
+        self.assertEqual(["7.", "I)", "8."], [element.numbering_bullet_text for element in elements])
+
+    def test_style_numbering(self):
+        """Нумерация из стиля применяется, если данные нумерации существуют"""
+        elements = self.parse(
+            paragraph("styled", '<w:pStyle w:val="Numbered"/>') + paragraph("broken", '<w:pStyle w:val="Broken"/>')
+        )
+
+        self.assertEqual("1.", elements[0].numbering_bullet_text)
+        self.assertIsNone(elements[1].numbering_bullet_text)
+
+    def test_missing_numbering_file(self):
+        """Отсутствие файла нумерации не приводит к ошибке"""
+        self.assertEqual({}, NumberingIndex(None).numberings)
+
+
+class TestParagraphProperties(unittest.TestCase):
+    """Тестирование чтения свойств абзаца за один проход"""
+
+    @staticmethod
+    def read(xml: str):
+        return read_paragraph_properties(etree.fromstring(f"<w:document {NAMESPACES}>{xml}</w:document>")[0])
+
+    def test_text_style_and_numbering(self):
+        """Текст с переносами строк, стиль и нумерация читаются из одного абзаца"""
+        properties = self.read(
+            '<w:p><w:pPr><w:pStyle w:val="Heading1"/><w:numPr><w:ilvl w:val="2"/><w:numId w:val="3"/></w:numPr>'
+            '</w:pPr><w:r><w:t> first</w:t><w:br/><w:t>second </w:t></w:r></w:p>'
+        )
+
+        self.assertEqual("first\nsecond", properties.text)
+        self.assertEqual("Heading1", properties.style_id)
+        self.assertEqual(NumberingProps(id="3", ilvl=2), properties.numbering)
+        self.assertFalse(properties.has_drawing)
+
+    def test_image(self):
+        """Идентификатор отношения изображения берется из `<a:blip>`"""
+        properties = self.read(image("rId5"))
+
+        self.assertTrue(properties.has_drawing)
+        self.assertEqual("rId5", properties.embed_id)
+        self.assertIsNone(properties.style_id)
+        self.assertIsNone(properties.numbering)
+
+    def test_numbering_without_id(self):
+        """Нумерация без идентификатора не считается нумерацией абзаца"""
+        properties = self.read(paragraph("text", '<w:numPr><w:ilvl w:val="1"/></w:numPr>'))
+
+        self.assertIsNone(properties.numbering)
+
+
+class TestStyleGraph(unittest.TestCase):
+    """Тестирование разрешения свойств стилей по цепочке наследования"""
+
+    @staticmethod
+    def build(*styles: str) -> StyleGraph:
+        return StyleGraph(etree.fromstring(f"<w:styles {NAMESPACES}>{''.join(styles)}</w:styles>"))
+
+    @staticmethod
+    def style(style_id: str, based_on: str = None, properties: str = "", name: str = None) -> str:
+        return (
+            f'<w:style w:styleId="{style_id}"><w:name w:val="{name or style_id}"/>'
+            + (f'<w:basedOn w:val="{based_on}"/>' if based_on else "")
+            + f"<w:pPr>{properties}</w:pPr></w:style>"
+        )
+
+    def test_heading_level_is_inherited_through_chain(self):
+        """Уровень заголовка наследуется через все уровни basedOn, собственный уровень приоритетнее"""
+        graph = self.build(
+            self.style("Custom2", "Custom1"),
+            self.style("Custom1", "Heading2"),
+            self.style("Heading2", properties='<w:outlineLvl w:val="1"/>'),
+            self.style("Custom3", "Custom2", '<w:outlineLvl w:val="2"/>'),
+        )
+
+        self.assertEqual(2, graph.get_heading_level("Heading2"))
+        self.assertEqual(2, graph.get_heading_level("Custom2"))
+        self.assertEqual(3, graph.get_heading_level("Custom3"))
+        self.assertIsNone(graph.get_heading_level("Missing"))
+
+    def test_title_shifts_heading_levels(self):
+        """Стиль заголовка документа получает первый уровень, остальные уровни сдвигаются"""
+        graph = self.build(
+            self.style("Title"), self.style("Heading1", properties='<w:outlineLvl w:val="0"/>')
+        )
+
+        self.assertEqual(1, graph.get_heading_level("Title"))
+        self.assertEqual(2, graph.get_heading_level("Heading1"))
+
+    def test_numbering_is_inherited(self):
+        """Нумерация наследуется от предка, если стиль не задает собственную"""
+        graph = self.build(
+            self.style("List", properties='<w:numPr><w:ilvl w:val="1"/><w:numId w:val="4"/></w:numPr>'),
+            self.style("CustomList", "List"),
+        )
+
+        self.assertEqual(NumberingProps(id="4", ilvl=1), graph.get_numbering("CustomList"))
+
+    def test_cyclic_inheritance(self):
+        """Циклические ссылки basedOn не приводят к зацикливанию"""
+        graph = self.build(self.style("A", "B", '<w:outlineLvl w:val="0"/>'), self.style("B", "A"))
+
+        self.assertEqual(1, graph.get_heading_level("A"))
+        self.assertEqual("A", graph.get("B").based_on)
+
+
+class TestDefinitionsCache(unittest.TestCase):
+    """Тестирование общего кеша графов стилей и индексов нумерации"""
+
+    def setUp(self):
+        patcher = patch.object(DocxParser, "DEFINITIONS_CACHE", LRUCache(2))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_files_share_definitions(self):
+        """Документы с одинаковыми стилями и нумерацией используют одни и те же разрешенные данные"""
+        first = DocxParser(build_docx(paragraph("first")), load_structure(), "images")
+        second = DocxParser(build_docx(paragraph("second")), load_structure(), "images")
+        other = DocxParser(build_docx(paragraph("other"), styles=TestNumbering.STYLES), load_structure(), "images")
+
+        self.assertIs(first.style_graph, second.style_graph)
+        self.assertIs(first.numbering_index, second.numbering_index)
+        self.assertEqual(2, second.timer.counters["definitions_cache_hits"])
+        self.assertIsNot(first.style_graph, other.style_graph)
+        self.assertEqual(1, other.timer.counters["definitions_cache_hits"])
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """При превышении размера вытесняется запись, к которой дольше всего не обращались"""
+        cache = LRUCache(2)
+        cache.set("first", 1)
+        cache.set("second", 2)
+        cache.get("first")
+        cache.set("third", 3)
+
+        self.assertEqual(1, cache.get("first"))
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(2, cache.get_cache_size())
+
+
+class TestDocxXmlManager(unittest.TestCase):
+    """Тестирование загрузки файлов документа"""
+
+    def test_relationships(self):
+        """Отношения любых типов доступны по идентификатору"""
+        xml_manager = DocxXmlManager(build_docx(
+            paragraph("text"),
+            relations=relationships({"rId7": "https://example.com"}, 'TargetMode="External"')
+        ))
+
+        self.assertEqual("https://example.com", xml_manager.get_relationship_target("rId7"))
+        self.assertEqual("External", xml_manager.relationships["rId7"].target_mode)
+        self.assertIsNone(xml_manager.get_relationship_target("rId8"))
+
+    def test_invalid_documents(self):
+        """Файл, не являющийся docx документом, приводит к ошибке некорректного документа"""
+        for name, files in (("no document.xml", {}), ("broken xml", {"word/document.xml": "<w:document"})):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as document:
+                for file_name, file_data in files.items():
+                    document.writestr(file_name, file_data)
+            with self.subTest(name), self.assertRaises(InvalidDocumentException):
+                DocxXmlManager(buffer.getvalue())
+
+        with self.assertRaises(InvalidDocumentException):
+            DocxXmlManager(b"lab.docx")
+
+
+class TestImageParser(unittest.TestCase):
+    """Тестирование извлечения изображений из документа"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.object(FileUtils, "BASE_PROJECT_DIR", self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_referenced_image_is_copied(self):
+        """Сохраняется только изображение, на которое ссылается документ, содержимое не искажается"""
+        image_data = bytes(range(256)) * 1024
+        document = build_docx(
+            image("rId1") + image("rIdMissing"),
+            relations=relationships({"rId1": "media/image1.png"}),
+            media={"image1.png": image_data, "unused.png": b"unused"}
+        )
+        parser = DocxParser(document, load_structure(), "images")
+        elements = list(parser.parse(parser.xml_manager.main_content_root))
+
+        self.assertEqual(1, len(elements))
+        self.assertIsInstance(elements[0], ImageElement)
+        saved_files = os.listdir(os.path.join(self.temp_dir.name, "images"))
+        self.assertEqual(1, len(saved_files))
+        self.assertTrue(elements[0].data.endswith(saved_files[0]))
+        with open(os.path.join(self.temp_dir.name, "images", saved_files[0]), "rb") as file:
+            self.assertEqual(image_data, file.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
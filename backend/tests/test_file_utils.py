@@ -0,0 +1,145 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from labstructanalyzer.utils.file_utils import FileUtils
+from labstructanalyzer.utils.file_writer import BackgroundFileWriter
+
+
+class TestContentAddressedStore(unittest.TestCase):
+    """Тестирование хранения файлов с адресацией по содержимому"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.object(FileUtils, "BASE_PROJECT_DIR", self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def list_saved_files(self) -> list[str]:
+        return os.listdir(os.path.join(self.temp_dir.name, "images"))
+
+    def test_same_content_is_saved_once(self):
+        """Одинаковые данные сохраняются в один файл, имя файла - хеш содержимого"""
+        data = bytes(range(256)) * 512
+
+        first_path = FileUtils.save_stream_by_content("images", io.BytesIO(data), ".png")
+        with patch("shutil.copyfileobj") as copyfileobj:
+            second_path = FileUtils.save_stream_by_content("images", io.BytesIO(data), ".png")
+
+        copyfileobj.assert_not_called()
+        self.assertEqual(first_path, second_path)
+        self.assertEqual([f"{FileUtils.hash_stream(io.BytesIO(data))}.png"], self.list_saved_files())
+        with open(os.path.join(self.temp_dir.name, first_path), "rb") as file:
+            self.assertEqual(data, file.read())
+
+    def test_different_content_is_saved_separately(self):
+        """Разные данные сохраняются в разные файлы, временные файлы не остаются"""
+        first_path = FileUtils.save_stream_by_content("images", io.BytesIO(b"first"), ".png")
+        second_path = FileUtils.save_stream_by_content("images", io.BytesIO(b"second"), ".png")
+
+        self.assertNotEqual(first_path, second_path)
+        self.assertEqual(2, len(self.list_saved_files()))
+
+    def test_mode_is_enabled_by_environment(self):
+        """Режим включается переменной окружения"""
+        with patch.dict(os.environ, {"CONTENT_ADDRESSED_FILES": "true"}):
+            self.assertTrue(FileUtils.is_content_addressed())
+        with patch.dict(os.environ, {"CONTENT_ADDRESSED_FILES": ""}):
+            self.assertFalse(FileUtils.is_content_addressed())
+
+
+class TestBackgroundFileWriter(unittest.TestCase):
+    """Тестирование фоновой записи файлов"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.object(FileUtils, "BASE_PROJECT_DIR", self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def read(self, relative_path: str) -> bytes:
+        with open(os.path.join(self.temp_dir.name, relative_path), "rb") as file:
+            return file.read()
+
+    def test_flush_waits_for_all_files(self):
+        """После flush все файлы из очереди записаны, даже если их больше размера очереди"""
+        writer = BackgroundFileWriter(max_queue_size=2, batch_size=3)
+        files = {writer.submit("images", io.BytesIO(bytes([index]) * 1024), ".png"): bytes([index]) * 1024 for index in range(10)}
+
+        self.assertEqual([], writer.flush())
+        self.assertEqual(10, len(os.listdir(os.path.join(self.temp_dir.name, "images"))))
+        for relative_path, data in files.items():
+            self.assertEqual(data, self.read(relative_path))
+
+    def test_content_addressed_files_are_written_once(self):
+        """Файлы с одинаковым содержимым получают одно имя, существующий файл не перезаписывается"""
+        writer = BackgroundFileWriter()
+        first_path = writer.submit("images", io.BytesIO(b"logo"), ".png", content_addressed=True)
+        writer.flush()
+        with patch.object(writer._queue, "put") as put:
+            second_path = writer.submit("images", io.BytesIO(b"logo"), ".png", content_addressed=True)
+
+        put.assert_not_called()
+        self.assertEqual(first_path, second_path)
+        self.assertEqual(b"logo", self.read(first_path))
+
+    def test_failed_write_is_reported(self):
+        """Ошибка записи не останавливает поток, путь файла возвращается из flush"""
+        writer = BackgroundFileWriter()
+        with patch("os.fdopen", side_effect=IOError("disk full")):
+            failed_path = writer.submit("images", io.BytesIO(b"data"), ".png")
+            self.assertEqual(
+                [os.path.join(self.temp_dir.name, failed_path)], writer.flush()
+            )
+        self.assertEqual([], writer.flush())
+
+        saved_path = writer.submit("images", io.BytesIO(b"data"), ".png")
+        writer.flush()
+        self.assertEqual(b"data", self.read(saved_path))
+
+    def test_streams_are_copied_in_chunks_and_closed(self):
+        """Данные файла копируются из потока частями, после записи поток закрывается"""
+        data = bytes(range(256)) * 1024
+        file_stream = io.BytesIO(data)
+        writer = BackgroundFileWriter()
+
+        with patch.object(file_stream, "read", wraps=file_stream.read) as read:
+            saved_path = writer.submit("images", file_stream, ".png")
+            writer.flush()
+
+        self.assertTrue(all(call.args and call.args[0] <= FileUtils.COPY_CHUNK_SIZE for call in read.call_args_list))
+        self.assertTrue(file_stream.closed)
+        self.assertEqual(data, self.read(saved_path))
+
+    def test_written_files_are_removed_after_failure(self):
+        """Если какой-либо файл не удалось записать, записанные с последнего flush файлы удаляются"""
+        writer = BackgroundFileWriter()
+        written_path = writer.submit("images", io.BytesIO(b"data"), ".png")
+        writer.flush()
+        saved_path = writer.submit("images", io.BytesIO(b"data"), ".png")
+        broken_stream = MagicMock()
+        broken_stream.read.side_effect = IOError("broken archive")
+        writer.submit("images", broken_stream, ".png")
+
+        self.assertEqual(1, len(writer.flush()))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, saved_path)))
+        self.assertEqual(b"data", self.read(written_path))
+
+    def test_discard_removes_written_files(self):
+        """discard удаляет файлы с уникальными именами, файлы с адресацией по содержимому сохраняются"""
+        writer = BackgroundFileWriter()
+        saved_path = writer.submit("images", io.BytesIO(b"data"), ".png")
+        shared_path = writer.submit("images", io.BytesIO(b"shared"), ".png", content_addressed=True)
+
+        writer.discard()
+
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, saved_path)))
+        self.assertEqual(b"shared", self.read(shared_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,283 @@
+import asyncio
+import base64
+import json
+import os
+import signal
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+from labstructanalyzer.configs.config import CONFIG_DIR
+from labstructanalyzer.core.exceptions import InvalidDocumentException, ParseWorkerCrashedException
+from labstructanalyzer.services.parser.docx import DocxParser
+from labstructanalyzer.services.parser.parse_service import ParseService, init_worker, warm_up
+from labstructanalyzer.utils.file_utils import FileUtils
+from labstructanalyzer.utils.file_writer import BackgroundFileWriter
+from labstructanalyzer.utils.parser.structure.structure_cache import CourseStructure, StructureCache
+from tests.test_docx_parser import (
+    build_docx, image, load_structure, numbered_paragraph, paragraph, relationships, table
+)
+
+STRUCTURE_PATH = os.path.join(CONFIG_DIR, "structure.json")
+
+
+class TestParseService(unittest.IsolatedAsyncioTestCase):
+    """Тестирование парсинга документов в пуле процессов"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.TemporaryDirectory()
+        with patch.dict(os.environ, {"PARSE_CACHE_DIR": cls.cache_dir.name}):
+            cls.parse_service = ParseService(STRUCTURE_PATH)
+            cls.parse_service.start(workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.parse_service.shutdown()
+        cls.cache_dir.cleanup()
+
+    async def test_parse_returns_plain_components(self):
+        """Результат парсинга в процессе-обработчике совпадает с парсингом в текущем процессе"""
+        document = build_docx(
+            paragraph("Таблица адресации") + table(paragraph("cell")) + numbered_paragraph("пункт", "1")
+        )
+
+        components = await self.parse_service.parse(document, "images/template")
+
+        expected = DocxParser(document, load_structure(), "images/template").get_structure_components()
+        self.assertEqual(expected, components)
+        self.assertTrue(all(isinstance(component, dict) for component in components))
+
+    async def test_invalid_document_error_reaches_caller(self):
+        """Ошибка некорректного документа передается из процесса-обработчика без изменений"""
+        with self.assertRaises(InvalidDocumentException) as context:
+            await self.parse_service.parse(b"lab.docx", "images/template")
+
+        self.assertEqual("Некорректный docx документ: File is not a zip file", str(context.exception))
+
+    async def test_start_is_idempotent(self):
+        """Повторный запуск не создает новый пул"""
+        executor = self.parse_service.executor
+        self.parse_service.start()
+        self.assertIs(executor, self.parse_service.executor)
+
+    async def test_stream_returns_components_in_order(self):
+        """Потоковая обработка передает те же компоненты, что и обычный парсинг"""
+        document = build_docx("".join(paragraph(f"Абзац {index}") for index in range(10)) + table(paragraph("ячейка")))
+
+        lines = [line async for line in self.parse_service.stream(document, "images/template")]
+
+        expected = DocxParser(document, load_structure(), "images/template").get_structure_components()
+        self.assertEqual(expected, [json.loads(line) for line in lines])
+
+    async def test_stream_inlines_images(self):
+        """Потоковая обработка передает изображения как data URL, не сохраняя их на диск"""
+        image_data = bytes(range(256))
+        document = build_docx(
+            image("rId1"), relations=relationships({"rId1": "media/image1.png"}), media={"image1.png": image_data}
+        )
+
+        lines = [json.loads(line) async for line in self.parse_service.stream(document, "images/template")]
+
+        self.assertEqual("image", lines[0]["type"])
+        self.assertEqual(f"data:image/png;base64,{base64.b64encode(image_data).decode()}", lines[0]["data"])
+
+    async def test_closed_stream_releases_worker(self):
+        """Закрытие потока прекращает парсинг, и процесс-обработчик принимает следующие документы"""
+        document = build_docx("".join(paragraph(f"Поток {index}") for index in range(200)))
+
+        with patch.object(self.parse_service, "STREAM_QUEUE_SIZE", 1):
+            stream = self.parse_service.stream(document, "images/template")
+            self.assertEqual("text", json.loads(await anext(stream))["type"])
+            await stream.aclose()
+
+        components = await asyncio.wait_for(
+            self.parse_service.parse(build_docx(paragraph("следующий")), "images/template"), timeout=30
+        )
+        self.assertEqual(1, len(components))
+
+
+class TestParseWorkerCrash(unittest.IsolatedAsyncioTestCase):
+    """Тестирование восстановления пула процессов после аварийного завершения процесса-обработчика"""
+
+    async def asyncSetUp(self):
+        with patch.dict(os.environ, {"PARSE_CACHE_MAX_BYTES": "-1"}):
+            self.parse_service = ParseService(STRUCTURE_PATH)
+            self.parse_service.start(workers=1)
+        self.addCleanup(self.parse_service.shutdown)
+
+    async def kill_worker(self):
+        executor = self.parse_service.executor
+        os.kill(await asyncio.get_running_loop().run_in_executor(executor, warm_up), signal.SIGKILL)
+        return executor
+
+    @staticmethod
+    async def consume(stream):
+        return [line async for line in stream]
+
+    async def test_pool_is_recreated_after_worker_crash(self):
+        """Документ, при обработке которого завершился процесс, получает ошибку, следующие документы обрабатываются"""
+        broken_executor = await self.kill_worker()
+        document = build_docx(paragraph("Цель работы"))
+
+        with self.assertRaises(ParseWorkerCrashedException):
+            await asyncio.wait_for(self.parse_service.parse(document, "images/template"), timeout=30)
+        self.assertIsNot(broken_executor, self.parse_service.executor)
+
+        components = await asyncio.wait_for(self.parse_service.parse(document, "images/template"), timeout=30)
+        self.assertEqual(1, len(components))
+
+    async def test_stream_reports_worker_crash(self):
+        """Потоковая обработка в непригодном пуле завершается ошибкой, пул пересоздается"""
+        await self.kill_worker()
+        document = build_docx(paragraph("Цель работы"))
+
+        with self.assertRaises(ParseWorkerCrashedException):
+            await asyncio.wait_for(self.consume(self.parse_service.stream(document, "images/template")), timeout=30)
+
+        lines = await asyncio.wait_for(self.consume(self.parse_service.stream(document, "images/template")), timeout=30)
+        self.assertEqual(1, len(lines))
+
+
+class TestParseResultCache(unittest.IsolatedAsyncioTestCase):
+    """Тестирование кеширования результатов парсинга повторно загружаемых документов"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        patcher = patch.object(FileUtils, "BASE_PROJECT_DIR", self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        init_worker(STRUCTURE_PATH)
+        self.parse_service = ParseService(STRUCTURE_PATH)
+        self.parse_service.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.parse_service.shutdown)
+        with patch.dict(os.environ, {"PARSE_CACHE_DIR": os.path.join(self.temp_dir.name, "cache")}):
+            self.parse_service._init_cache()
+
+        self.image_data = bytes(range(256))
+        self.document = build_docx(
+            paragraph("Цель работы") + image("rId1"),
+            relations=relationships({"rId1": "media/image1.png"}),
+            media={"image1.png": self.image_data}
+        )
+
+    @staticmethod
+    def find_image_urls(components: list[dict]) -> list[str]:
+        return [component["data"] for component in components if component["type"] == "image"]
+
+    def read_image(self, url: str) -> bytes:
+        with open(os.path.join(self.temp_dir.name, urlparse(url).path.lstrip("/")), "rb") as file:
+            return file.read()
+
+    async def test_repeated_upload_skips_parsing(self):
+        """Повторная загрузка того же документа не выполняет парсинг, изображения копируются"""
+        first_components = await self.parse_service.parse(self.document, "images")
+
+        with patch("labstructanalyzer.services.parser.parse_service.parse_document") as parse_document:
+            second_components = await self.parse_service.parse(self.document, "images")
+        parse_document.assert_not_called()
+
+        first_images = self.find_image_urls(first_components)
+        second_images = self.find_image_urls(second_components)
+        self.assertEqual(1, len(second_images))
+        self.assertNotEqual(first_images, second_images)
+        self.assertEqual(self.image_data, self.read_image(first_images[0]))
+        self.assertEqual(self.image_data, self.read_image(second_images[0]))
+        self.assertEqual(
+            [component for component in first_components if component["type"] != "image"],
+            [component for component in second_components if component["type"] != "image"]
+        )
+
+    async def test_missing_image_invalidates_entry(self):
+        """Если изображение из кеша удалено вместе с шаблоном, документ разбирается заново"""
+        first_components = await self.parse_service.parse(self.document, "images")
+        FileUtils.remove("", urlparse(self.find_image_urls(first_components)[0]).path)
+
+        second_components = await self.parse_service.parse(self.document, "images")
+
+        self.assertEqual(self.image_data, self.read_image(self.find_image_urls(second_components)[0]))
+
+    async def test_cached_stream_inlines_images(self):
+        """Предпросмотр загруженного документа берет результат из кеша, изображения не копируются"""
+        components = await self.parse_service.parse(self.document, "images")
+
+        with patch("labstructanalyzer.services.parser.parse_service.stream_document") as stream_document:
+            lines = [json.loads(line) async for line in self.parse_service.stream(self.document, "images")]
+
+        stream_document.assert_not_called()
+        self.assertEqual(
+            [f"data:image/png;base64,{base64.b64encode(self.image_data).decode()}"], self.find_image_urls(lines)
+        )
+        self.assertEqual(1, len(os.listdir(os.path.join(self.temp_dir.name, "images"))))
+        self.assertEqual(self.image_data, self.read_image(self.find_image_urls(components)[0]))
+
+    async def test_failed_image_write_fails_parse(self):
+        """Если изображение не удалось записать, парсинг завершается ошибкой, записанные файлы удаляются"""
+        document = build_docx(
+            image("rId1") + image("rId2"),
+            relations=relationships({"rId1": "media/image1.png", "rId2": "media/image2.png"}),
+            media={"image1.png": self.image_data, "image2.png": b"broken"}
+        )
+        write = BackgroundFileWriter._write
+
+        def fail_second_image(writer, file_path, file_stream):
+            if file_stream.read(1) == b"b":
+                raise IOError("disk full")
+            file_stream.seek(0)
+            write(writer, file_path, file_stream)
+
+        with patch.object(BackgroundFileWriter, "_write", fail_second_image):
+            with self.assertRaises(IOError):
+                await self.parse_service.parse(document, "images")
+
+        self.assertEqual([], os.listdir(os.path.join(self.temp_dir.name, "images")))
+        self.assertEqual(2, len(self.find_image_urls(await self.parse_service.parse(document, "images"))))
+
+    async def test_changed_structure_misses_cache(self):
+        """Ключ кеша зависит от файла структуры"""
+        fingerprint = self.parse_service.structure.get().fingerprint
+
+        self.assertNotEqual(
+            self.parse_service._get_cache_key(self.document, "images", fingerprint),
+            self.parse_service._get_cache_key(self.document, "images", "changed")
+        )
+
+    async def test_changed_structure_is_applied_without_restart(self):
+        """После изменения файла структуры документ разбирается по новой структуре тем же пулом процессов"""
+        structure_path = os.path.join(self.temp_dir.name, "structure.json")
+        structure = load_structure()
+        with open(structure_path, "w", encoding="utf-8") as file:
+            json.dump(structure, file)
+        init_worker(structure_path)
+        self.parse_service.structure = StructureCache(structure_path, check_interval=0)
+        document = build_docx(paragraph("Ответ: ___"))
+        self.assertEqual("text", (await self.parse_service.parse(document, "images"))[0]["type"])
+
+        structure["answer"]["minRepeatCount"] = 3
+        with open(structure_path, "w", encoding="utf-8") as file:
+            json.dump(structure, file)
+        os.utime(structure_path, ns=(0, os.stat(structure_path).st_mtime_ns + 10 ** 9))
+
+        self.assertEqual("question", (await self.parse_service.parse(document, "images"))[0]["type"])
+
+    async def test_course_structure_is_applied(self):
+        """Документ курса с собственной структурой разбирается по ней, результат кешируется отдельно"""
+        structure = load_structure()
+        structure["answer"]["minRepeatCount"] = 3
+        document = build_docx(paragraph("Ответ: ___"))
+
+        course_components = await self.parse_service.parse(
+            document, "images", course_structure=CourseStructure("course_id", 1, structure)
+        )
+        components = await self.parse_service.parse(document, "images")
+
+        self.assertEqual("question", course_components[0]["type"])
+        self.assertEqual("text", components[0]["type"])
+
+
+if __name__ == '__main__':
+    unittest.main()
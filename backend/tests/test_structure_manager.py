@@ -0,0 +1,240 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from labstructanalyzer.utils.parser.common_elements import CellElement, ImageElement, TextElement
+from labstructanalyzer.utils.parser.structure.structure_cache import StructureCache
+from labstructanalyzer.utils.parser.structure.structure_manager import StructureManager
+from tests.test_docx_parser import load_structure
+
+
+def header(text: str, level: int) -> TextElement:
+    element = TextElement(data=text)
+    element.header_level = level
+    return element
+
+
+class TestCompositeMatcher(unittest.TestCase):
+    """Тестирование сопоставления элементов с составными компонентами структуры"""
+
+    def setUp(self):
+        structure = load_structure()
+        structure["composite"] = [
+            {"type": "first", "data": [
+                {"type": "header", "contentType": "text", "headerLevel": 2},
+                {"type": "image", "contentType": "image"}
+            ]},
+            {"type": "second", "data": [
+                {"type": "header", "contentType": "text", "headerLevel": 2},
+                {"type": "text", "contentType": "text"}
+            ]},
+            {"type": "single", "data": [{"type": "header", "contentType": "text", "headerLevel": 2}]},
+            {"type": "shadowed", "data": [{"type": "header", "contentType": "text", "headerLevel": 2}]},
+        ]
+        self.structure_manager = StructureManager(structure)
+
+    def match(self, *elements):
+        composite = self.structure_manager.composite_matcher.match(elements)
+        return composite.structure_props["type"] if composite else None
+
+    def test_common_prefix_is_shared(self):
+        """Составные компоненты с одинаковым первым условием разделяют один узел дерева"""
+        root_edges = self.structure_manager.composite_matcher.root.edges
+
+        self.assertEqual(["text"], list(root_edges))
+        self.assertEqual(1, len(root_edges["text"]))
+
+    def test_first_matching_composite_wins(self):
+        """Из нескольких совпавших составных компонентов выбирается первый в порядке структуры"""
+        self.assertEqual("first", self.match(header("Топология", 2), ImageElement(data="image.png")))
+        self.assertEqual("second", self.match(header("Цель", 2), TextElement(data="text")))
+        self.assertEqual("single", self.match(header("Цель", 2)))
+
+    def test_no_match(self):
+        """Элементы, не соответствующие ни одному составному компоненту, не сопоставляются"""
+        self.assertIsNone(self.match(header("Цель", 1), TextElement(data="text")))
+        self.assertIsNone(self.match(ImageElement(data="image.png")))
+
+    def test_apply_structure_groups_elements(self):
+        """Совпавшие элементы объединяются в составной компонент"""
+        components = list(self.structure_manager.apply_structure(iter([
+            header("Топология", 2), ImageElement(data="image.png"), TextElement(data="text"), TextElement(data="end")
+        ])))
+
+        self.assertEqual(["first", "text", "text"], [component["type"] for component in components])
+        self.assertEqual(["header", "image"], [child["type"] for child in components[0]["data"]])
+
+
+class TestBaseClassification(unittest.TestCase):
+    """Тестирование определения базовых компонентов элементов"""
+
+    def setUp(self):
+        structure = load_structure()
+        structure["base"] = [
+            {"type": "numbered", "contentType": "text", "hasProperty": "numberingBulletText"},
+            {"type": "header", "contentType": "text", "hasProperty": "headerLevel"},
+            {"type": "styled", "contentType": "text", "hasStyle": "Note", "startsWith": "Примечание"},
+            {"type": "text", "contentType": "text"},
+            {"type": "image", "contentType": "image"},
+            {"type": "unknown", "contentType": "video"},
+        ]
+        self.structure_manager = StructureManager(structure)
+
+    def test_components_with_direct_checker_are_independent(self):
+        """Компоненты с разными ожидаемыми значениями одного прямого чекера проверяют каждый свое значение"""
+        numbered = TextElement(data="Пункт")
+        numbered.numbering_bullet_text = "1."
+
+        self.assertEqual("numbered", self.structure_manager.classify(numbered))
+        self.assertEqual("header", self.structure_manager.classify(header("Цель", 2)))
+
+    def test_all_conditions_are_checked(self):
+        """Элемент соответствует компоненту, только если проходит все его проверки"""
+        self.assertEqual("styled", self.structure_manager.classify(TextElement(data="Примечание: ...", style_id="Note")))
+        self.assertEqual("text", self.structure_manager.classify(TextElement(data="Примечание: ...")))
+        self.assertEqual("text", self.structure_manager.classify(TextElement(data="Текст", style_id="Note")))
+
+    def test_classification_by_content_type(self):
+        """Компоненты проверяются только для элементов своего типа содержимого"""
+        self.assertEqual("image", self.structure_manager.classify(ImageElement(data="Примечание.png")))
+        self.assertIsNone(self.structure_manager.classify(CellElement()))
+
+
+class TestQuestionExtraction(unittest.TestCase):
+    """Тестирование разделения текста с меткой ответа на вопрос и ответ"""
+
+    def setUp(self):
+        self.structure_manager = StructureManager(load_structure())
+
+    def test_question_text_keeps_element_fields(self):
+        """Текст вопроса - новый элемент с полями исходного элемента, исходный элемент не изменяется"""
+        element = TextElement(data="Укажите адрес ______ 192.168.0.1", style_id="Question")
+        element.nesting_level = 2
+        element.numbering_bullet_text = "1."
+        element.structure_type = "question"
+
+        question = self.structure_manager.extract_question_from_text(element)
+        text, answer = question.data
+
+        self.assertIsNot(element, text)
+        self.assertEqual(("Укажите адрес", "Question", 2, "1.", "text"),
+                         (text.data, text.style_id, text.nesting_level, text.numbering_bullet_text,
+                          text.structure_type))
+        self.assertEqual("192.168.0.1", answer.data)
+        self.assertEqual(2, question.nesting_level)
+        self.assertEqual("Укажите адрес ______ 192.168.0.1", element.data)
+
+
+class TestTextMatcher(unittest.TestCase):
+    """Тестирование разбора текста абзацев по меткам ответа и началам текста"""
+
+    def setUp(self):
+        structure = load_structure()
+        structure["answer"] = [{"charDelimiter": "_", "minRepeatCount": 5},
+                               {"charDelimiter": ".", "minRepeatCount": 10}]
+        structure["base"].insert(0, {"type": "note", "contentType": "text", "startsWith": "Примечание"})
+        self.structure_manager = StructureManager(structure)
+        self.text_matcher = self.structure_manager.text_matcher
+
+    def test_all_marks_and_prefixes_are_found(self):
+        """Разбор возвращает совпавшие начала текста и позиции всех меток всех видов"""
+        text = "Примечание: адрес _____ маска .......... шлюз ___"
+
+        match = self.text_matcher.match(text)
+
+        self.assertEqual(("Примечание",), match.prefixes)
+        self.assertEqual([text.index("_____"), text.index("..........")], [start for start, _ in match.marks])
+        self.assertEqual(text.index("..........") + 10, match.marks[-1][1])
+
+    def test_text_without_matches(self):
+        """Для текста без меток и начал возвращается общий пустой результат"""
+        self.assertFalse(self.text_matcher.match("Цель работы ___ ....").marks)
+        self.assertIs(self.text_matcher.match("Цель"), self.text_matcher.match("Задание"))
+
+    def test_every_answer_syntax_is_recognized(self):
+        """Каждый вид метки ответа выделяет вопрос и шаблон ответа"""
+        for text in ("Адрес ______ 10.0.0.1", "Адрес ............ 10.0.0.1"):
+            question = self.structure_manager.extract_question_from_text(TextElement(data=text))
+            self.assertEqual(["Адрес", "10.0.0.1"], [element.data for element in question.data])
+        self.assertTrue(self.structure_manager.is_only_answer_mark(TextElement(data="..........")))
+        self.assertFalse(self.structure_manager.is_only_answer_mark(None))
+
+    def test_changed_text_is_matched_again(self):
+        """После изменения текста элемента результат разбора вычисляется заново"""
+        element = TextElement(data="Примечание")
+        self.assertEqual("note", self.structure_manager.classify(element))
+        self.assertFalse(self.structure_manager.contain_answer_mark(element))
+
+        element.data += " _____"
+        self.assertTrue(self.structure_manager.contain_answer_mark(element))
+        element.data = "Текст"
+        self.assertEqual("text", self.structure_manager.classify(element))
+
+    def test_text_is_matched_once(self):
+        """Все проверки абзаца при применении структуры используют один разбор его текста"""
+        elements = [TextElement(data="Примечание: адрес"), TextElement(data="Цель работы")]
+
+        with patch.object(self.text_matcher, "match", wraps=self.text_matcher.match) as match:
+            components = list(self.structure_manager.apply_structure(iter(elements)))
+
+        self.assertEqual(["note", "text"], [component["type"] for component in components])
+        self.assertEqual(len(elements), match.call_count)
+
+
+class TestStructureCache(unittest.TestCase):
+    """Тестирование перезагрузки скомпилированной структуры при изменении файла"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "structure.json")
+        self.structure = load_structure()
+        self.write(self.structure)
+        self.cache = StructureCache(self.path, check_interval=0)
+
+    def write(self, structure, mtime_shift: int = 0):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(structure if isinstance(structure, str) else json.dumps(structure))
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_shift))
+
+    def test_unchanged_file_keeps_structure(self):
+        """Пока содержимое файла не изменилось, возвращается одна и та же структура"""
+        first = self.cache.get()
+        self.write(self.structure, mtime_shift=10 ** 9)
+
+        self.assertIs(first, self.cache.get())
+
+    def test_changed_file_is_reloaded(self):
+        """Измененный файл компилируется заново, прежняя структура не изменяется"""
+        first = self.cache.get()
+        self.structure["answer"]["minRepeatCount"] = 3
+        self.write(self.structure, mtime_shift=10 ** 9)
+
+        second = self.cache.get()
+        self.assertNotEqual(first.fingerprint, second.fingerprint)
+        self.assertEqual("___", second.structure_manager.answer_delimiter)
+        self.assertEqual("_____", first.structure_manager.answer_delimiter)
+
+    def test_broken_file_keeps_previous_structure(self):
+        """Если измененный файл не удается загрузить, используется прежняя структура"""
+        first = self.cache.get()
+        self.write("{", mtime_shift=10 ** 9)
+
+        self.assertIs(first, self.cache.get())
+
+    def test_check_interval(self):
+        """Файл не проверяется чаще интервала проверки"""
+        cache = StructureCache(self.path, check_interval=3600)
+        first = cache.get()
+        self.structure["answer"]["minRepeatCount"] = 3
+        self.write(self.structure, mtime_shift=10 ** 9)
+
+        self.assertIs(first, cache.get())
+        self.assertNotEqual(first.fingerprint, cache.require("unknown").fingerprint)
+
+
+if __name__ == '__main__':
+    unittest.main()
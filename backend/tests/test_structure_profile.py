@@ -0,0 +1,129 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from labstructanalyzer.core.exceptions import InvalidStructureException
+from labstructanalyzer.services.structure_profile import StructureProfileService
+from labstructanalyzer.utils.parser.structure.structure_cache import CourseStructure, CourseStructureCache
+from tests.test_docx_parser import load_structure
+
+
+class TestStructureProfileService(unittest.IsolatedAsyncioTestCase):
+    """Тестирование хранения структур курсов"""
+
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        self.session = AsyncSession(self.engine, expire_on_commit=False)
+        self.structure_profile_service = StructureProfileService(self.session)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def test_course_without_profile_uses_common_structure(self):
+        """Для курса без профиля структура курса не задана"""
+        self.assertIsNone(await self.structure_profile_service.get_course_structure("course_id"))
+        self.assertIsNone(await self.structure_profile_service.get_course_structure(None))
+
+    async def test_version_is_increased_on_save(self):
+        """Каждое сохранение структуры увеличивает версию профиля"""
+        structure = load_structure()
+        await self.structure_profile_service.save("course_id", "teacher_id", structure)
+        structure["answer"]["minRepeatCount"] = 3
+        await self.structure_profile_service.save("course_id", "teacher_id", structure)
+
+        course_structure = await self.structure_profile_service.get_course_structure("course_id")
+        self.assertEqual(("course_id", 2), (course_structure.course_id, course_structure.version))
+        self.assertEqual(3, course_structure.structure["answer"]["minRepeatCount"])
+        self.assertIsNone(await self.structure_profile_service.get_course_structure("other_course_id"))
+
+    async def test_invalid_structure_is_not_saved(self):
+        """Структура, которую невозможно скомпилировать, не сохраняется"""
+        structure = load_structure()
+        structure["base"].append({"contentType": "text"})
+
+        with self.assertRaises(InvalidStructureException):
+            await self.structure_profile_service.save("course_id", "teacher_id", structure)
+        with self.assertRaises(InvalidStructureException):
+            await self.structure_profile_service.save("course_id", "teacher_id", {"base": []})
+        self.assertIsNone(await self.structure_profile_service.get("course_id"))
+
+    async def test_answer_mark_must_be_non_empty(self):
+        """Структура с пустым символом метки ответа или неположительным количеством повторений не сохраняется:
+        с такой меткой каждый абзац стал бы вопросом"""
+        for answer in (
+                {"charDelimiter": "_", "minRepeatCount": 0},
+                {"charDelimiter": "_", "minRepeatCount": -1},
+                {"charDelimiter": "", "minRepeatCount": 5},
+                [{"charDelimiter": "_", "minRepeatCount": 5}, {"charDelimiter": ".", "minRepeatCount": 0}],
+        ):
+            structure = load_structure()
+            structure["answer"] = answer
+            with self.subTest(answer=answer), self.assertRaises(InvalidStructureException):
+                await self.structure_profile_service.save("course_id", "teacher_id", structure)
+        self.assertIsNone(await self.structure_profile_service.get("course_id"))
+
+
+class TestConcurrentStructureSave(unittest.IsolatedAsyncioTestCase):
+    """Тестирование одновременного сохранения структуры курса из разных запросов"""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.temp_dir.name, 'test.db')}")
+        async with self.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        self.sessions = [AsyncSession(self.engine, expire_on_commit=False) for _ in range(2)]
+
+    async def asyncTearDown(self):
+        for session in self.sessions:
+            await session.close()
+        await self.engine.dispose()
+
+    async def save_concurrently(self, repeat_counts: list[int]) -> list[int]:
+        structures = []
+        for repeat_count in repeat_counts:
+            structure = load_structure()
+            structure["answer"]["minRepeatCount"] = repeat_count
+            structures.append(structure)
+        profiles = await asyncio.gather(*[
+            StructureProfileService(session).save("course_id", "teacher_id", structure)
+            for session, structure in zip(self.sessions, structures)
+        ])
+        return [profile.version for profile in profiles]
+
+    async def test_concurrent_saves_get_different_versions(self):
+        """Одновременные сохранения, в том числе создание профиля, получают разные версии"""
+        self.assertEqual([1, 2], sorted(await self.save_concurrently([3, 4])))
+        versions = await self.save_concurrently([5, 6])
+        self.assertEqual([3, 4], sorted(versions))
+
+        async with AsyncSession(self.engine) as session:
+            course_structure = await StructureProfileService(session).get_course_structure("course_id")
+        self.assertEqual(4, course_structure.version)
+        self.assertEqual([5, 6][versions.index(4)], course_structure.structure["answer"]["minRepeatCount"])
+
+
+class TestCourseStructureCache(unittest.TestCase):
+    """Тестирование кеша скомпилированных структур курсов"""
+
+    def test_profile_is_compiled_once_per_version(self):
+        """Структура курса компилируется один раз для каждой версии профиля"""
+        cache = CourseStructureCache(max_size=2)
+        structure = load_structure()
+        first = CourseStructure("course_id", 1, structure)
+
+        self.assertIs(cache.get(first), cache.get(CourseStructure("course_id", 1, structure)))
+        self.assertIsNot(cache.get(first), cache.get(CourseStructure("course_id", 2, structure)))
+        self.assertEqual(2, cache.compiled_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_another_jwt_auth import AuthJWT
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from labstructanalyzer.core.dependencies import get_parse_service, get_structure_profile_service
+from labstructanalyzer.core.exceptions import InvalidStructureException
+from labstructanalyzer.routers.structure_router import router
+from labstructanalyzer.services.parser.parse_service import ParseService
+from labstructanalyzer.services.structure_profile import StructureProfileService
+from tests.test_parse_service import STRUCTURE_PATH
+from tests.test_docx_parser import load_structure
+
+app = FastAPI()
+app.include_router(router, prefix="/structure")
+client = TestClient(app)
+
+
+class TestStructureRouter(unittest.TestCase):
+    """Тестирование получения и сохранения структуры курса"""
+
+    def setUp(self):
+        self.structure_profile_service = MagicMock()
+        app.dependency_overrides[get_structure_profile_service] = lambda: self.structure_profile_service
+        app.dependency_overrides[get_parse_service] = lambda: ParseService(STRUCTURE_PATH)
+        self.addCleanup(app.dependency_overrides.clear)
+
+        for method, value in (
+                ("jwt_required", None),
+                ("get_raw_jwt", {"sub": "teacher_id", "course_id": "course_id", "roles": ["teacher"]})
+        ):
+            patcher = patch.object(AuthJWT, method, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_course_without_profile_gets_common_structure(self):
+        """Курс без собственной структуры получает общую структуру без версии, уже загруженную сервисом парсинга"""
+        self.structure_profile_service.get = AsyncMock(return_value=None)
+        parse_service = ParseService(STRUCTURE_PATH)
+        parse_service.structure.get()
+        app.dependency_overrides[get_parse_service] = lambda: parse_service
+
+        with patch("builtins.open", side_effect=AssertionError("structure file is read again")):
+            response = client.get("/structure")
+
+        self.assertEqual({"course_id": "course_id", "version": None, "structure": load_structure()}, response.json())
+
+    def test_structure_is_saved_for_course_from_jwt(self):
+        """Структура сохраняется для курса из JWT, некорректная структура отклоняется"""
+        self.structure_profile_service.save = AsyncMock(return_value=MagicMock(version=4))
+
+        response = client.put("/structure", json=load_structure())
+
+        self.assertEqual({"course_id": "course_id", "version": 4}, response.json())
+        self.structure_profile_service.save.assert_awaited_once_with("course_id", "teacher_id", load_structure())
+
+        self.structure_profile_service.save = AsyncMock(side_effect=InvalidStructureException("Wrong JSON structure"))
+        self.assertEqual(400, client.put("/structure", json={"base": []}).status_code)
+
+    def test_empty_answer_mark_is_rejected(self):
+        """Структура с нулевым количеством повторений или пустым символом метки ответа отклоняется"""
+        app.dependency_overrides[get_structure_profile_service] = lambda: StructureProfileService(MagicMock())
+
+        for answer, invalid_key in (
+                ({"charDelimiter": "_", "minRepeatCount": 0}, "minRepeatCount"),
+                ({"charDelimiter": "", "minRepeatCount": 5}, "charDelimiter"),
+        ):
+            structure = load_structure()
+            structure["answer"] = answer
+            response = client.put("/structure", json=structure)
+            self.assertEqual(400, response.status_code)
+            self.assertIn(invalid_key, response.json()["detail"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+import json
+import os
+import unittest
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_another_jwt_auth import AuthJWT
+from sqlalchemy.exc import SQLAlchemyError
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from labstructanalyzer.core.dependencies import get_parse_service, get_structure_profile_service, \
+    get_template_service
+from labstructanalyzer.core.exceptions import InvalidDocumentException
+from labstructanalyzer.routers.template_router import router
+from labstructanalyzer.utils.parser.structure.structure_cache import CourseStructure
+
+app = FastAPI()
+app.include_router(router, prefix="/templates")
+client = TestClient(app)
+
+
+def override_structure_profiles(course_structure=None) -> MagicMock:
+    """Подменяет сервис структур курсов, возвращающий указанную структуру курса"""
+    structure_profile_service = MagicMock()
+    structure_profile_service.get_course_structure = AsyncMock(return_value=course_structure)
+    app.dependency_overrides[get_structure_profile_service] = lambda: structure_profile_service
+    return structure_profile_service
+
+
+class TestBatchTemplateUpload(unittest.TestCase):
+    """Тестирование пакетной загрузки шаблонов"""
+
+    def setUp(self):
+        self.template_service = MagicMock()
+        self.template_service.session.rollback = AsyncMock()
+        self.parse_service = MagicMock()
+        app.dependency_overrides[get_template_service] = lambda: self.template_service
+        app.dependency_overrides[get_parse_service] = lambda: self.parse_service
+        override_structure_profiles()
+        self.addCleanup(app.dependency_overrides.clear)
+
+        for method, value in (
+                ("jwt_required", None),
+                ("get_raw_jwt", {"sub": "teacher_id", "course_id": "course_id", "roles": ["teacher"]})
+        ):
+            patcher = patch.object(AuthJWT, method, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def upload(*file_names: str):
+        return client.post(
+            "/templates/batch",
+            files=[("templates", (file_name, file_name.encode())) for file_name in file_names]
+        )
+
+    def test_each_file_gets_own_status(self):
+        """Ошибки в отдельных файлах не мешают сохранению остальных, порядок файлов сохраняется"""
+        created_id = uuid.uuid4()
+
+        async def parse(document: bytes, images_dir: str, timer=None, course_structure=None):
+            if document == b"broken.docx":
+                raise InvalidDocumentException("File is not a zip file")
+            return [{"type": "text", "data": document.decode()}]
+
+        async def create(user_id, course_id, name, components):
+            if name == "db":
+                raise SQLAlchemyError()
+            return MagicMock(template_id=created_id)
+
+        self.parse_service.parse = AsyncMock(side_effect=parse)
+        self.template_service.create = AsyncMock(side_effect=create)
+
+        response = self.upload("lab1.docx", "lab2.doc", "broken.docx", "db.docx")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            ["created", "unsupported", "parse_error", "db_error"],
+            [result["status"] for result in response.json()["templates"]]
+        )
+        self.assertEqual(str(created_id), response.json()["templates"][0]["template_id"])
+        self.assertEqual(3, self.parse_service.parse.await_count)
+        self.template_service.create.assert_any_await(
+            "teacher_id", "course_id", "lab1", [{"type": "text", "data": "lab1.docx"}]
+        )
+        self.template_service.session.rollback.assert_awaited_once()
+
+    def test_unexpected_parse_error_is_reported(self):
+        """Непредвиденная ошибка разбора выводится с именем файла и не выдается за некорректный документ"""
+        self.parse_service.parse = AsyncMock(side_effect=[RuntimeError("bug"), [{"type": "text", "data": "text"}]])
+        self.template_service.create = AsyncMock(return_value=MagicMock(template_id=uuid.uuid4()))
+
+        with patch("builtins.print") as print_mock, patch("traceback.print_exception"):
+            response = self.upload("lab1.docx", "lab2.docx")
+
+        self.assertEqual(["error", "created"], [result["status"] for result in response.json()["templates"]])
+        self.assertIn("lab1.docx", print_mock.call_args.args[0])
+
+
+class TestTemplatePreview(unittest.TestCase):
+    """Тестирование потокового предпросмотра шаблона"""
+
+    def setUp(self):
+        self.parse_service = MagicMock()
+        app.dependency_overrides[get_parse_service] = lambda: self.parse_service
+        override_structure_profiles()
+        self.addCleanup(app.dependency_overrides.clear)
+
+        for method, value in (
+                ("jwt_required", None),
+                ("get_raw_jwt", {"sub": "teacher_id", "course_id": "course_id", "roles": ["teacher"]})
+        ):
+            patcher = patch.object(AuthJWT, method, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def preview(file_name: str = "lab.docx"):
+        return client.post("/templates/preview", files={"template": (file_name, b"docx")})
+
+    def test_components_are_streamed_as_ndjson(self):
+        """Каждая компонента передается отдельной строкой JSON"""
+        async def stream(document: bytes, images_dir: str, timer, course_structure):
+            for index in range(3):
+                yield json.dumps({"type": "text", "data": f"Абзац {index}"}, ensure_ascii=False)
+
+        self.parse_service.stream = stream
+
+        response = self.preview()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/x-ndjson", response.headers["content-type"])
+        self.assertEqual(
+            ["Абзац 0", "Абзац 1", "Абзац 2"],
+            [json.loads(line)["data"] for line in response.text.splitlines()]
+        )
+
+    def test_parse_error_ends_stream_with_detail(self):
+        """Ошибка обработки после начала передачи завершает поток строкой с описанием ошибки"""
+        async def stream(document: bytes, images_dir: str, timer, course_structure):
+            yield json.dumps({"type": "text", "data": "Абзац"})
+            raise InvalidDocumentException("File is not a zip file")
+
+        self.parse_service.stream = stream
+
+        lines = [json.loads(line) for line in self.preview().text.splitlines()]
+
+        self.assertEqual("text", lines[0]["type"])
+        self.assertEqual("Некорректный docx документ: File is not a zip file", lines[-1]["detail"])
+
+    def test_unsupported_file(self):
+        """Файлы не в формате docx отклоняются до начала передачи"""
+        self.assertEqual(400, self.preview("lab.doc").status_code)
+
+
+class TestTemplateUploadTiming(unittest.TestCase):
+    """Тестирование замеров этапов загрузки шаблона"""
+
+    def setUp(self):
+        self.template_service = MagicMock()
+        self.template_service.create = AsyncMock(return_value=MagicMock(template_id=uuid.uuid4()))
+        self.parse_service = MagicMock()
+        app.dependency_overrides[get_template_service] = lambda: self.template_service
+        app.dependency_overrides[get_parse_service] = lambda: self.parse_service
+        override_structure_profiles()
+        self.addCleanup(app.dependency_overrides.clear)
+
+        async def parse(document: bytes, images_dir: str, timer, course_structure):
+            timer.merge({"stages": {"parse": 12.5}, "counters": {"elements": 3}})
+            return []
+
+        self.parse_service.parse = AsyncMock(side_effect=parse)
+
+        for method, value in (
+                ("jwt_required", None),
+                ("get_raw_jwt", {"sub": "teacher_id", "course_id": "course_id", "roles": ["teacher"]})
+        ):
+            patcher = patch.object(AuthJWT, method, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def upload():
+        return client.post("/templates", files={"template": ("lab.docx", b"docx")})
+
+    def test_server_timing_header_is_opt_in(self):
+        """Заголовок Server-Timing добавляется только при включенной настройке"""
+        with patch.dict(os.environ, {"SERVER_TIMING": ""}):
+            self.assertNotIn("Server-Timing", self.upload().headers)
+
+        with patch.dict(os.environ, {"SERVER_TIMING": "true"}):
+            server_timing = self.upload().headers["Server-Timing"]
+
+        self.assertIn("parse;dur=12.50", server_timing)
+        self.assertIn("db_insert;dur=", server_timing)
+
+    def test_upload_is_logged(self):
+        """Замеры этапов и счетчики записываются в лог одной структурной записью"""
+        with self.assertLogs("labstructanalyzer.timing", level="INFO") as logs:
+            self.upload()
+
+        record = logs.records[0].timing
+        self.assertEqual("template_upload", record["event"])
+        self.assertEqual("lab.docx", record["file_name"])
+        self.assertEqual({"elements": 3}, record["counters"])
+        self.assertEqual({"parse", "db_insert"}, set(record["stages"]))
+
+    def test_course_structure_is_applied(self):
+        """Документ разбирается по структуре курса из JWT"""
+        course_structure = CourseStructure("course_id", 2, {"answer": {}, "base": [], "composite": []})
+        structure_profile_service = override_structure_profiles(course_structure)
+
+        self.upload()
+
+        structure_profile_service.get_course_structure.assert_awaited_once_with("course_id")
+        self.assertIs(course_structure, self.parse_service.parse.await_args.args[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import uuid
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from labstructanalyzer.core.exceptions import TemplateNotFoundException
+from labstructanalyzer.models.dto.template_element import BaseTemplateElementDto
+from labstructanalyzer.models.template_element import TemplateElement
+from labstructanalyzer.services.template import TemplateService
+
+
+def build_components(goal: str, answer_hint: str, tail: list[dict]) -> list[dict]:
+    """Создает компоненты шаблона: раздел с вложенными элементами и элементы первого уровня"""
+    return [
+        {"type": "header", "headerLevel": 1, "data": [{"type": "text", "data": "Цель работы"}]},
+        {"type": "text", "data": goal},
+        {"type": "question", "data": [{"type": "text", "data": answer_hint}, {"type": "answer", "simple": True}]},
+        *tail,
+    ]
+
+
+class TestTemplateReimport(unittest.IsolatedAsyncioTestCase):
+    """Тестирование повторного импорта документа в существующий шаблон"""
+
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        self.session = AsyncSession(self.engine, expire_on_commit=False)
+        self.template_service = TemplateService(self.session)
+
+        template = await self.template_service.create(
+            "teacher_id", "course_id", "lab",
+            build_components("Изучить протокол", "Ответ:", [{"type": "text", "data": "Лишний абзац"}])
+        )
+        self.template_id = template.template_id
+        self.ids = await self.get_ids()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def get_ids(self) -> dict[str, uuid.UUID]:
+        """Возвращает id элементов по их типу и содержимому"""
+        elements = await self.session.exec(
+            select(TemplateElement).where(TemplateElement.template_id == self.template_id)
+        )
+        return {f"{element.element_type}:{element.properties.get('data', '')}": element.element_id
+                for element in elements}
+
+    async def test_unchanged_elements_keep_ids(self):
+        """Исправление опечатки изменяет только один элемент, остальные элементы сохраняют id"""
+        changes = await self.template_service.reimport(
+            self.template_id,
+            build_components("Изучить протоколы", "Ответ:", [{"type": "text", "data": "Новый абзац"}])
+        )
+
+        ids = await self.get_ids()
+        self.assertEqual({"inserted": 0, "updated": 2, "deleted": 0, "unchanged": 5}, changes.to_dict())
+        self.assertEqual(self.ids["text:Изучить протокол"], ids["text:Изучить протоколы"])
+        self.assertEqual(self.ids["answer:"], ids["answer:"])
+        self.assertEqual(self.ids["header:"], ids["header:"])
+
+    async def test_inserted_and_deleted_elements(self):
+        """Добавленные элементы создаются, удаленные - удаляются вместе с вложенными элементами"""
+        components = build_components("Изучить протокол", "Ответ:", [])
+        components.insert(1, {"type": "text", "data": "Оборудование"})
+        del components[3]
+
+        changes = await self.template_service.reimport(self.template_id, components)
+
+        ids = await self.get_ids()
+        self.assertEqual(1, len(changes.inserted))
+        self.assertEqual(4, len(changes.deleted))
+        self.assertNotIn("answer:", ids)
+        self.assertIn("text:Оборудование", ids)
+        self.assertEqual(self.ids["text:Изучить протокол"], ids["text:Изучить протокол"])
+
+        elements = self.template_service.build_hierarchy(
+            (await self.session.exec(
+                select(TemplateElement)
+                .where(TemplateElement.template_id == self.template_id)
+                .order_by(TemplateElement.order)
+            )).all()
+        )
+        self.assertEqual(["header", "text", "text"], [element["element_type"] for element in elements])
+
+    async def test_user_properties_are_kept(self):
+        """Свойства, заданные пользователем после загрузки, сохраняются у сопоставленных элементов"""
+        await self.template_service.elements_service.bulk_update_properties(
+            self.template_id, [BaseTemplateElementDto(element_id=self.ids["answer:"], properties={"weight": 5})]
+        )
+
+        await self.template_service.reimport(
+            self.template_id, build_components("Изучить протокол", "Ответ:", [])
+        )
+
+        answer = await self.session.get(TemplateElement, self.ids["answer:"])
+        self.assertEqual({"type": "answer", "simple": True, "weight": 5}, answer.properties)
+
+    async def test_removed_parser_properties_are_dropped(self):
+        """Свойства, которых нет в новой версии документа, удаляются, свойства пользователя сохраняются"""
+        await self.template_service.elements_service.bulk_update_properties(
+            self.template_id, [BaseTemplateElementDto(element_id=self.ids["answer:"], properties={"weight": 5})]
+        )
+        components = build_components("Изучить протокол", "Ответ:", [])
+        del components[0]["headerLevel"]
+        components[2]["data"][1] = {"type": "answer"}
+
+        await self.template_service.reimport(self.template_id, components)
+
+        header = await self.session.get(TemplateElement, self.ids["header:"])
+        answer = await self.session.get(TemplateElement, self.ids["answer:"])
+        self.assertEqual({"type": "header"}, header.properties)
+        self.assertEqual({"type": "answer", "simple": True, "weight": 5}, answer.properties)
+
+    async def test_missing_template(self):
+        """Повторный импорт в несуществующий шаблон приводит к исключению"""
+        with self.assertRaises(TemplateNotFoundException):
+            await self.template_service.reimport(uuid.uuid4(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()